@@ -6,9 +6,10 @@ def stays_in_area(pos, environment: NuclearWasteModel, color: AgentColor):
     """
     Check if the agent remains within its designated area based on its color.
 
-    Each color (GREEN, YELLOW, RED) has a different right boundary within the grid.
-    - GREEN agents are limited to the first third of the grid width.
-    - YELLOW agents are limited to the first two-thirds.
+    Each color (GREEN, YELLOW, RED) has a different right boundary within the grid,
+    the East side of its zone (see geometry.ZoneGeometry):
+    - GREEN agents are limited to the green zone (the first third of the grid by default).
+    - YELLOW agents are limited to the green and yellow zones.
     - RED agents can move throughout the grid width.
 
     Parameters:
@@ -24,12 +25,7 @@ def stays_in_area(pos, environment: NuclearWasteModel, color: AgentColor):
     within_vertical_limits = 0 <= pos[1] < environment.grid.height
 
     # Horizontal boundaries depend on the agent's color.
-    right_boundaries = {
-        AgentColor.GREEN: environment.grid.width // 3,
-        AgentColor.YELLOW: 2 * environment.grid.width // 3,
-        AgentColor.RED: environment.grid.width,
-    }
-    within_horizontal_limits = 0 <= pos[0] < right_boundaries[color]
+    within_horizontal_limits = 0 <= pos[0] < environment.geometry.x_max(color)
 
     return within_vertical_limits and within_horizontal_limits
 
@@ -38,66 +34,64 @@ def move_agent(agent: CleaningAgent, action: Action, environment: NuclearWasteMo
     last_percept = agent.give_last_percept()
 
     current_surroundings = environment.indicate_surroundings(agent.pos)
-    new_default_percept = last_percept.copy()
-    new_default_percept["surrounding"] = current_surroundings
 
     pos = agent.pos
     if action == Action.LEFT:
         if stays_in_area((pos[0] - 1, pos[1]), environment, agent.color):
-            agent.model.grid.move_agent(agent, (pos[0] - 1, pos[1]))
+            environment.move_robot(agent, (pos[0] - 1, pos[1]))
             return Percept(
                 radiactivity=environment.get_radioactivity(pos),
-                wastes=last_percept["wastes"],
+                wastes=last_percept.wastes,
                 pos=(pos[0] - 1, pos[1]),
                 other_on_pos=environment.others_on_pos(agent),
                 waste_on_pos=environment.is_on_waste(agent.pos),
                 surrounding=current_surroundings,
             )
         else:
-            return new_default_percept
+            return last_percept._replace(surrounding=current_surroundings)
     elif action == Action.RIGHT:
         if stays_in_area((pos[0] + 1, pos[1]), environment, agent.color):
-            agent.model.grid.move_agent(agent, (pos[0] + 1, pos[1]))
+            environment.move_robot(agent, (pos[0] + 1, pos[1]))
             return Percept(
                 radiactivity=environment.get_radioactivity(pos),
-                wastes=last_percept["wastes"],
+                wastes=last_percept.wastes,
                 pos=(pos[0] + 1, pos[1]),
                 other_on_pos=environment.others_on_pos(agent),
                 waste_on_pos=environment.is_on_waste(agent.pos),
                 surrounding=current_surroundings,
             )
         else:
-            return new_default_percept
+            return last_percept._replace(surrounding=current_surroundings)
     elif action == Action.UP:
         if stays_in_area((pos[0], pos[1] + 1), environment, agent.color):
-            agent.model.grid.move_agent(agent, (pos[0], pos[1] + 1))
+            environment.move_robot(agent, (pos[0], pos[1] + 1))
             return Percept(
                 radiactivity=environment.get_radioactivity(pos),
-                wastes=last_percept["wastes"],
+                wastes=last_percept.wastes,
                 pos=(pos[0], pos[1] + 1),
                 other_on_pos=environment.others_on_pos(agent),
                 waste_on_pos=environment.is_on_waste(agent.pos),
                 surrounding=current_surroundings,
             )
         else:
-            return new_default_percept
+            return last_percept._replace(surrounding=current_surroundings)
     elif action == Action.DOWN:
         if stays_in_area((pos[0], pos[1] - 1), environment, agent.color):
-            agent.model.grid.move_agent(agent, (pos[0], pos[1] - 1))
+            environment.move_robot(agent, (pos[0], pos[1] - 1))
             return Percept(
                 radiactivity=environment.get_radioactivity(pos),
-                wastes=last_percept["wastes"],
+                wastes=last_percept.wastes,
                 pos=(pos[0], pos[1] - 1),
                 other_on_pos=environment.others_on_pos(agent),
                 waste_on_pos=environment.is_on_waste(agent.pos),
                 surrounding=current_surroundings,
             )
         else:
-            return new_default_percept
+            return last_percept._replace(surrounding=current_surroundings)
     elif action == Action.STAY:
         return Percept(
             radiactivity=environment.get_radioactivity(pos),
-            wastes=last_percept["wastes"],
+            wastes=last_percept.wastes,
             pos=pos,
             other_on_pos=environment.others_on_pos(agent),
             waste_on_pos=environment.is_on_waste(agent.pos),
@@ -112,8 +106,6 @@ def take(agent: CleaningAgent, environment: NuclearWasteModel):
     last_percept = agent.give_last_percept()
 
     current_surroundings = environment.indicate_surroundings(agent.pos)
-    new_default_percept = last_percept.copy()
-    new_default_percept["surrounding"] = current_surroundings
 
     # Get the waste agent at the agent's position
     cell_content = environment.grid.get_cell_list_contents([agent.pos])
@@ -125,8 +117,7 @@ def take(agent: CleaningAgent, environment: NuclearWasteModel):
             environment.give_waste_agent(
                 waste_agent.unique_id, waste_agent.color, agent.unique_id, agent.pos
             )
-            new_wastes = last_percept["wastes"]
-            new_wastes.append(waste_agent)
+            new_wastes = last_percept.wastes + (waste_agent,)
             return Percept(
                 radiactivity=environment.get_radioactivity(agent.pos),
                 wastes=new_wastes,
@@ -137,9 +128,9 @@ def take(agent: CleaningAgent, environment: NuclearWasteModel):
             )
         except Exception as e:
             print(e)
-            return new_default_percept
+            return last_percept._replace(surrounding=current_surroundings)
     else:
-        return new_default_percept
+        return last_percept._replace(surrounding=current_surroundings)
 
 
 def drop(agent: CleaningAgent, environment: NuclearWasteModel):
@@ -147,18 +138,16 @@ def drop(agent: CleaningAgent, environment: NuclearWasteModel):
     last_percept = agent.give_last_percept()
 
     current_surroundings = environment.indicate_surroundings(agent.pos)
-    new_default_percept = last_percept.copy()
-    new_default_percept["surrounding"] = current_surroundings
 
     try:
-        if len(last_percept["wastes"]) > 0:
-            waste_to_drop = last_percept["wastes"][0].unique_id
+        if len(last_percept.wastes) > 0:
+            waste_to_drop = last_percept.wastes[0].unique_id
             environment.drop_waste(waste_to_drop, agent.pos)
-            remaining_wastes = [
+            remaining_wastes = tuple(
                 waste
-                for waste in last_percept["wastes"]
+                for waste in last_percept.wastes
                 if waste.unique_id != waste_to_drop
-            ]
+            )
             return Percept(
                 radiactivity=environment.get_radioactivity(agent.pos),
                 wastes=remaining_wastes,
@@ -169,8 +158,7 @@ def drop(agent: CleaningAgent, environment: NuclearWasteModel):
             )
     except Exception as e:
         print(e)
-        last_percept["surrounding"] = environment.indicate_surroundings(agent.pos)
-        return new_default_percept
+    return last_percept._replace(surrounding=current_surroundings)
 
 
 def merge(agent: CleaningAgent, environment: NuclearWasteModel):
@@ -178,23 +166,21 @@ def merge(agent: CleaningAgent, environment: NuclearWasteModel):
     last_percept = agent.give_last_percept()
 
     current_surroundings = environment.indicate_surroundings(agent.pos)
-    new_default_percept = last_percept.copy()
-    new_default_percept["surrounding"] = current_surroundings
 
     try:
-        if len(last_percept["wastes"]) < 2:
+        if len(last_percept.wastes) < 2:
             raise Exception("Not enough wastes to merge.")
 
         new_waste = environment.merge_wastes(
-            waste_id1=last_percept["wastes"][0].unique_id,
-            waste_id2=last_percept["wastes"][1].unique_id,
+            waste_id1=last_percept.wastes[0].unique_id,
+            waste_id2=last_percept.wastes[1].unique_id,
             agent_id=agent.unique_id,
             pos=agent.pos,
         )
         # Update the percept with the new waste
         return Percept(
             radiactivity=environment.get_radioactivity(agent.pos),
-            wastes=[new_waste],
+            wastes=(new_waste,),
             pos=agent.pos,
             other_on_pos=environment.others_on_pos(agent),
             waste_on_pos=environment.is_on_waste(agent.pos),
@@ -202,7 +188,7 @@ def merge(agent: CleaningAgent, environment: NuclearWasteModel):
         )
     except Exception as e:
         print(e)
-        return new_default_percept
+        return last_percept._replace(surrounding=current_surroundings)
 
 
 def get_action_handler(action: Action):
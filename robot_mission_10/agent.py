@@ -30,11 +30,11 @@ class CleaningAgent(Agent):
         }
         self.percept_temp = Percept(
             radiactivity=0,
-            wastes=[],
+            wastes=(),
             pos=(0, 0),
             other_on_pos=False,
             waste_on_pos=None,
-            surrounding=[],
+            surrounding=(),
         )
         self.action_temp = Action.STAY
         self.step_count = 0
@@ -44,9 +44,14 @@ class CleaningAgent(Agent):
 
     def step(self):
         update(self.knowledge, self.percept_temp, self.action_temp)
+        tracker = self.model.utilization
+        if tracker is not None:
+            context = tracker.context(self)
         action = self.deliberate()
         self.action_temp = action
         self.percept_temp = self.model.do(self, action)
+        if tracker is not None:
+            tracker.record(self, action, context, self.percept_temp)
         if self.pos == self.knowledge["last_pos"]:
             self.knowledge["go_back"] = False
             self.knowledge["have_saved_last_pos"] = False
@@ -62,13 +67,13 @@ class CleaningAgent(Agent):
         return f"CleaningAgent(id={self.unique_id}, color={self.color}, pos={self.pos})"
 
 
-def add_agents_template(environment, n_green_agents, n_yellow_agents, n_red_agents):
+def add_agents_template(environment, robots):
     """
     Function that add the agent to the environment.
     Must increase the obj_id of the environment at each agent added.
 
     Args:
         environment (NuclearWasteModel): The environment where agents are added.
-        num_agents (int): The number of agents to add.
+        robots (Dict[AgentColor, List[Tuple[int, int]]]): The start positions of the robots of each color.
     """
     pass
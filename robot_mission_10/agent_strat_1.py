@@ -11,7 +11,7 @@ class RandomCleaningAgent(CleaningAgent):
         # If can pick a waste, do it
         if (
             self.model.is_on_waste(self.pos) is not None
-            and len(last_percept["wastes"]) < self.knowledge["max_wastes_handed"]
+            and len(last_percept.wastes) < self.knowledge["max_wastes_handed"]
         ):
             return Action.TAKE
         # Choose randomly an action to move
@@ -32,22 +32,22 @@ class DefaultAgent(CleaningAgent):
         action = movables[self.random.randrange(len(movables))]
         # If the agent is on a waste, not on the top row and has a free spot, take it
         if (
-            (last_percept["wastes"] is not None and len(last_percept["wastes"]) < 2)
+            (last_percept.wastes is not None and len(last_percept.wastes) < 2)
             and self.model.is_on_waste(self.pos) is not None
-            and last_percept["pos"][1] < self.knowledge["grid_height"] - 1
+            and last_percept.pos[1] < self.knowledge["grid_height"] - 1
         ):
             # TODO : Check if the agent is on top without using the height of the grid
             action = Action.TAKE
 
-        if len(last_percept["wastes"]) == 2:
+        if len(last_percept.wastes) == 2:
             if (
-                last_percept["wastes"][0].indicate_color()
-                == last_percept["wastes"][1].indicate_color()
+                last_percept.wastes[0].indicate_color()
+                == last_percept.wastes[1].indicate_color()
             ):
                 action = Action.MERGE
 
         # If the agent has a waste, go up to drop it on the top row
-        if len(last_percept["wastes"]) > 0 and action != Action.MERGE:
+        if len(last_percept.wastes) > 0 and action != Action.MERGE:
             if len(self.knowledge["percepts"]) > 1:
                 # Try to go up first
                 if self.action_temp != Action.UP:
@@ -60,20 +60,20 @@ class DefaultAgent(CleaningAgent):
                     last_two_percepts = self.knowledge["percepts"][-2:]
                     # If can still go up, go up
                     if (
-                        last_two_percepts[0]["pos"][1] < last_two_percepts[1]["pos"][1]
+                        last_two_percepts[0].pos[1] < last_two_percepts[1].pos[1]
                         and self.action_temp == Action.UP
                     ):
                         action = Action.UP
                     else:
                         # If can't go up, drop.
                         # But before dropping, check if there already is a waste on the cell.
-                        if last_percept["waste_on_pos"] is None:
+                        if last_percept.waste_on_pos is None:
                             action = Action.DROP
                         else:
                             # if there is a waste, and the wastes are the same color, pick and merge them
                             if (
-                                last_percept["wastes"][0].indicate_color()
-                                == last_percept["waste_on_pos"]
+                                last_percept.wastes[0].indicate_color()
+                                == last_percept.waste_on_pos
                             ):
                                 action = Action.TAKE
                             else:
@@ -93,7 +93,7 @@ class UpperLineAgent(CleaningAgent):
         action = movables[self.random.randrange(len(movables))]
 
         # If the agent is not on the top row, go up
-        if last_percept["pos"][1] != self.knowledge["grid_height"] - 1:
+        if last_percept.pos[1] != self.knowledge["grid_height"] - 1:
             action = Action.UP
 
         else:
@@ -102,29 +102,29 @@ class UpperLineAgent(CleaningAgent):
                 action = Action.DROP
             else:
                 # If the agent has no waste, move randomly between left and right if possible (not on a side)
-                if len(last_percept["wastes"]) == 0:
+                if len(last_percept.wastes) == 0:
                     movables = [Action.LEFT, Action.RIGHT]
                     action = movables[self.random.randrange(len(movables))]
 
                 # If the agent has only one waste, go right if you can
-                if len(last_percept["wastes"]) == 1:
+                if len(last_percept.wastes) == 1:
                     if self.pos[0] != self.knowledge["x_max"] - 1:
                         action = Action.RIGHT
 
                 # if  the agent cannot move rigth, drop the waste if red waste
                 if (
                     self.pos[0] == self.knowledge["x_max"] - 1
-                    and len(last_percept["wastes"]) == 1
-                    and last_percept["wastes"][0].indicate_color() == AgentColor.RED
+                    and len(last_percept.wastes) == 1
+                    and last_percept.wastes[0].indicate_color() == AgentColor.RED
                 ):
                     action = Action.DROP
 
                 # If the agent has a waste, and is on a waste of the same color, take it if the waste is not red
                 if (
-                    len(last_percept["wastes"]) == 1
-                    and last_percept["wastes"][0].indicate_color()
-                    == last_percept["waste_on_pos"]
-                    and last_percept["waste_on_pos"] != AgentColor.RED
+                    len(last_percept.wastes) == 1
+                    and last_percept.wastes[0].indicate_color()
+                    == last_percept.waste_on_pos
+                    and last_percept.waste_on_pos != AgentColor.RED
                 ):
                     action = Action.TAKE
 
@@ -132,46 +132,32 @@ class UpperLineAgent(CleaningAgent):
 
                 if (
                     self.model.is_on_waste(self.pos) is not None
-                    and len(last_percept["wastes"]) == 0
+                    and len(last_percept.wastes) == 0
                     and self.pos[0] != self.knowledge["x_max"] - 1
                 ):
                     action = Action.TAKE
 
                 # If the agent can merge wastes, merge them
                 if (
-                    len(last_percept["wastes"]) == 2
-                    and last_percept["wastes"][0].indicate_color()
-                    == last_percept["wastes"][1].indicate_color()
+                    len(last_percept.wastes) == 2
+                    and last_percept.wastes[0].indicate_color()
+                    == last_percept.wastes[1].indicate_color()
                 ):
                     action = Action.MERGE
         return action
 
 
-def add_cleaning_agents(environment, num_agents: int, agent_color: AgentColor):
+def add_cleaning_agents(environment, starts, agent_color: AgentColor):
     """
     Adds cleaning agents to the environment.
 
     :param environment: The environment where agents are added.
-    :param num_agents: The number of agents to add.
-    :param agent_color: The specific color for all agents; if None, assigns random colors.
+    :param starts: The start position of each agent to add, in the zone of its color.
+    :param agent_color: The specific color for all agents.
     """
-    for i in range(num_agents):
+    for x, y in starts:
         environment.obj_id += 1
 
-        # Set movement boundaries based on the agent's color.
-        if agent_color == AgentColor.RED:
-            x = environment.random.randrange(
-                2 * environment.grid.width // 3, environment.grid.width
-            )
-        elif agent_color == AgentColor.YELLOW:
-            x = environment.random.randrange(
-                environment.grid.width // 3, 2 * environment.grid.width // 3
-            )
-        else:  # AgentColor.GREEN
-            x = environment.random.randrange(0, environment.grid.width // 3)
-
-        y = environment.random.randrange(environment.grid.height)
-
         # Create and add the agent to the environment.
         agent = DefaultAgent(
             unique_id=environment.obj_id, color=agent_color, x_max=x, model=environment
@@ -180,16 +166,10 @@ def add_cleaning_agents(environment, num_agents: int, agent_color: AgentColor):
         environment.grid.place_agent(agent, (x, y))
 
 
-def add_upper_agents(environment, num_agents: int):
-    for i in range(num_agents):
+def add_upper_agents(environment, starts):
+    for x, y in starts:
         environment.obj_id += 1
 
-        # Set movement boundaries based on the agent's color.
-        x = environment.random.randrange(
-            2 * environment.grid.width // 3, environment.grid.width
-        )
-        y = environment.random.randrange(environment.grid.height)
-
         # Create and add the agent to the environment.
         agent = UpperLineAgent(
             unique_id=environment.obj_id,
@@ -201,12 +181,18 @@ def add_upper_agents(environment, num_agents: int):
         environment.grid.place_agent(agent, (x, y))
 
 
-def add_agents_strat_1(environment, n_green_agents, n_yellow_agents, n_red_agents):
+def add_agents_strat_1(environment, robots):
     """
     Add agents to the environment.
+    A proportion of the red agents (upper_agent_proportion of the model, rounded down)
+    are upper line agents.
+
+    :param robots: The start positions of the robots of each color (see World.robots).
     """
-    add_cleaning_agents(environment, n_green_agents, AgentColor.GREEN)
-    add_cleaning_agents(environment, n_yellow_agents, AgentColor.YELLOW)
-    red_upper_agents = n_red_agents // 2
-    add_cleaning_agents(environment, n_red_agents - red_upper_agents, AgentColor.RED)
-    add_upper_agents(environment, red_upper_agents)
+    add_cleaning_agents(environment, robots[AgentColor.GREEN], AgentColor.GREEN)
+    add_cleaning_agents(environment, robots[AgentColor.YELLOW], AgentColor.YELLOW)
+    red_starts = robots[AgentColor.RED]
+    red_upper_agents = int(len(red_starts) * environment.upper_agent_proportion)
+    n_red_default_agents = len(red_starts) - red_upper_agents
+    add_cleaning_agents(environment, red_starts[:n_red_default_agents], AgentColor.RED)
+    add_upper_agents(environment, red_starts[n_red_default_agents:])
@@ -2,6 +2,7 @@ from mesa import Agent
 
 from action import Action
 from agent import CleaningAgent
+from geometry import nearest_deposit, nearest_row
 from types_1 import AgentColor
 
 
@@ -9,11 +10,88 @@ def define_step_between_checking(grid_height, grid_width):
     return grid_height * (grid_width // 3) // 3
 
 
+def move_to_row(y, row):
+    """
+    Return the vertical move to reach the row, or None if already on it.
+    """
+    if y < row:
+        return Action.UP
+    if y > row:
+        return Action.DOWN
+    return None
+
+
 def get_random_default_move(env):
     movables = [Action.UP, Action.DOWN, Action.LEFT, Action.RIGHT]
     return movables[env.random.randrange(len(movables))]
 
 
+def deposit_is_free(agent, pos):
+    """
+    Whether no other robot is on the deposit cell.
+    """
+    if pos == agent.pos:
+        return not agent.model.occupancy.others_at(pos)
+    return agent.model.occupancy.robots_at(pos) == 0
+
+
+def poll_row(self, merged: bool) -> int:
+    """
+    The row of the deposit of the previous zone polled by the agent, chosen when the poll
+    starts and kept until it ends (see end_poll). The hand-off rows are polled in turn.
+
+    :param merged: Poll the merged-waste cell, under the hand-off row. Otherwise, the
+        hand-off cell, or the merged-waste cell if the agent comes from above the row
+        (so it passes by the merged wastes on its way).
+    """
+    if self.knowledge["poll_row"] is None:
+        rows = self.knowledge["deposit_rows"]
+        row = rows[self.knowledge["polls"] % len(rows)]
+        if merged or self.pos[1] > row:
+            row -= 1
+        self.knowledge["poll_row"] = row
+    return self.knowledge["poll_row"]
+
+
+def end_poll(self):
+    self.knowledge["poll_row"] = None
+    self.knowledge["polls"] += 1
+
+
+def handoff_row(self, has_empty_hands: bool, merged: bool):
+    """
+    The row of the deposit of the previous zone the agent goes to, or None to go on with
+    its work. With the hand-off notifications of the model, the row of a waste waiting
+    there that the agent claimed; otherwise, the polled row every step_between_checking
+    patrol steps (see poll_row).
+    """
+    board = self.model.handoffs
+    if board is None:
+        if (
+            self.step_count >= self.knowledge["step_between_checking"]
+            and has_empty_hands
+        ):
+            return poll_row(self, merged)
+        return None
+    if not has_empty_hands:
+        # It took a waste on its way, the claimed one is left to another agent
+        board.release(self)
+        return None
+    cell = board.claim(self)
+    return None if cell is None else cell[1]
+
+
+def end_handoff(self):
+    """
+    The agent reached the deposit of the previous zone.
+    """
+    self.step_count = 0
+    if self.model.handoffs is None:
+        end_poll(self)
+    else:
+        self.model.handoffs.release(self)
+
+
 def save_last_pos(self):
     if self.knowledge["have_saved_last_pos"] is False:
         self.knowledge["last_pos"] = self.pos
@@ -75,7 +153,7 @@ class GreenCleaningAgent(CleaningAgent):
     def deliberate(self) -> Action:
         """
         The strategy of the green agent is to move randomly and take a waste if it find one.
-        Then, it brings the waste to the top row, at its rightmost position allowed (x_max), and drops it.
+        Then, it brings the waste to the nearest hand-off row, at its rightmost position allowed (x_max), and drops it.
         But if at this place, there already is a green waste, it takes it and merges it with the waste it is carrying, then drops it.
         """
         last_percept = self.give_last_percept()
@@ -88,30 +166,30 @@ class GreenCleaningAgent(CleaningAgent):
             self.knowledge["last_pos"],
         )
 
+        # The rows are far enough apart for the row below a hand-off row to be closer to it
+        deposit_row = nearest_row(last_percept.pos[1], self.knowledge["deposit_rows"])
         is_on_green_deposit = (
-            last_percept["pos"][1] == self.knowledge["grid_height"] - 1
+            last_percept.pos[1] == deposit_row
             and self.pos[0] == self.knowledge["x_max"] - 1
         )
         is_on_yellow_deposit = (
-            last_percept["pos"][1] == self.knowledge["grid_height"] - 2
+            last_percept.pos[1] == deposit_row - 1
             and self.pos[0] == self.knowledge["x_max"] - 1
         )
 
         waste_on_pos = self.model.is_on_waste(self.pos)
         first_waste_in_hand = (
-            last_percept["wastes"][0] if len(last_percept["wastes"]) > 0 else None
+            last_percept.wastes[0] if len(last_percept.wastes) > 0 else None
         )
         second_waste_in_hand = (
-            last_percept["wastes"][1] if len(last_percept["wastes"]) > 1 else None
-        )
-        has_free_spot = (
-            len(last_percept["wastes"]) < self.knowledge["max_wastes_handed"]
+            last_percept.wastes[1] if len(last_percept.wastes) > 1 else None
         )
+        has_free_spot = len(last_percept.wastes) < self.knowledge["max_wastes_handed"]
 
         # If Agent is on the "deposit green" cell, so the top and rightmost green corner
         if is_on_green_deposit:
             # If he has a waste, and there is a waste on the cell of the same color, and has free spot, take it
-            if len(last_percept["wastes"]) == 1 and waste_on_pos == AgentColor.GREEN:
+            if len(last_percept.wastes) == 1 and waste_on_pos == AgentColor.GREEN:
                 action = Action.TAKE
             else:
                 # If he has a waste, and there is a waste on the cell, drop it
@@ -148,13 +226,15 @@ class GreenCleaningAgent(CleaningAgent):
         ):
             action = Action.TAKE
 
-        # If carrying a waste, move to top row at the rightmost allowed position
+        # If carrying a waste, move to the deposit row at the rightmost allowed position
         if first_waste_in_hand is not None:
             if first_waste_in_hand.indicate_color() == AgentColor.GREEN:
-                if (
-                    self.pos[1] < self.knowledge["grid_height"] - 1
-                ):  # if not at the top row, move up
-                    action = Action.UP
+                vertical_move = move_to_row(
+                    self.pos[1],
+                    nearest_row(self.pos[1], self.knowledge["deposit_rows"]),
+                )
+                if vertical_move is not None:  # if not on the deposit row, reach it
+                    action = vertical_move
                     # Save the last position to go back to it
                     save_last_pos(self)
                 elif (
@@ -166,8 +246,8 @@ class GreenCleaningAgent(CleaningAgent):
         # If the agent has two wastes, merge them  --  last condition so can override other actions
         if second_waste_in_hand is not None:
             if (
-                last_percept["wastes"][0].indicate_color()
-                == last_percept["wastes"][1].indicate_color()
+                last_percept.wastes[0].indicate_color()
+                == last_percept.wastes[1].indicate_color()
             ):
                 action = Action.MERGE
 
@@ -178,11 +258,9 @@ class YellowCleaningAgent(CleaningAgent):
     def deliberate(self) -> Action:
 
         last_percept = self.give_last_percept()
-        x_green_zone = self.knowledge["grid_width"] // 3
-
-        time_between_checking = define_step_between_checking(
-            self.knowledge["grid_height"], self.knowledge["grid_width"]
-        )
+        x_green_zone = self.knowledge["x_min"]
+        deposit_rows = self.knowledge["deposit_rows"]
+        deposit_row = nearest_row(self.pos[1], deposit_rows)
 
         action = None
         # This is the default action if no other action is taken
@@ -195,50 +273,48 @@ class YellowCleaningAgent(CleaningAgent):
             self.knowledge["last_pos"],
         )
 
-        is_on_green_deposit = (
-            self.pos[1] == self.knowledge["grid_height"] - 1
-            and self.pos[0] == x_green_zone - 1
-        )
-
         is_on_yellow_deposit = (
-            self.pos[1] == self.knowledge["grid_height"] - 1
-            and self.pos[0] == self.knowledge["x_max"] - 1
+            self.pos[1] == deposit_row and self.pos[0] == self.knowledge["x_max"] - 1
         )
 
         is_on_red_deposit = (
-            self.pos[1] == self.knowledge["grid_height"] - 2
+            self.pos[1] == deposit_row - 1
             and self.pos[0] == self.knowledge["x_max"] - 1
         )
 
-        has_empty_hands = len(last_percept["wastes"]) == 0
-        has_free_spot = (
-            len(last_percept["wastes"]) < self.knowledge["max_wastes_handed"]
-        )
+        has_empty_hands = len(last_percept.wastes) == 0
+        has_free_spot = len(last_percept.wastes) < self.knowledge["max_wastes_handed"]
         waste_on_pos = self.model.is_on_waste(self.pos)
 
         first_waste_in_hand = (
-            last_percept["wastes"][0] if len(last_percept["wastes"]) > 0 else None
+            last_percept.wastes[0] if len(last_percept.wastes) > 0 else None
         )
         second_waste_in_hand = (
-            last_percept["wastes"][1] if len(last_percept["wastes"]) > 1 else None
+            last_percept.wastes[1] if len(last_percept.wastes) > 1 else None
         )
 
         # If the agent is on the green zone, move to the yellow one to work on it
         if self.pos[0] < x_green_zone:
             action = Action.RIGHT
 
-        # Every time_between_checking steps, the agent moves to the green deposit if empty hands
-        if self.step_count >= time_between_checking and has_empty_hands:
+        # Every time_between_checking steps (or when notified of a waste there), the agent
+        # moves to the green deposit if empty hands
+        green_deposit_row = handoff_row(self, has_empty_hands, merged=False)
+        if green_deposit_row is not None:
+            is_on_green_deposit = (
+                self.pos[1] == green_deposit_row and self.pos[0] == x_green_zone - 1
+            )
             if not is_on_green_deposit:
+                vertical_move = move_to_row(self.pos[1], green_deposit_row)
                 if self.pos[0] >= x_green_zone:
                     action = Action.LEFT
                     save_last_pos(self)
-                elif self.pos[1] < self.knowledge["grid_height"] - 1:
-                    action = Action.UP
+                elif vertical_move is not None:
+                    action = vertical_move
                     save_last_pos(self)
             # If is on the green deposit, and there is a waste, take it
             if is_on_green_deposit:
-                self.step_count = 0
+                end_handoff(self)
                 return_to_last_pos(self)
                 if waste_on_pos == AgentColor.YELLOW:
                     action = Action.TAKE
@@ -246,20 +322,21 @@ class YellowCleaningAgent(CleaningAgent):
                 #     action = Action.STAY
 
         # If the agent has a waste
-        if len(last_percept["wastes"]) > 0:
+        if len(last_percept.wastes) > 0:
             # Go to the yellow deposit
             if not is_on_yellow_deposit:
+                vertical_move = move_to_row(self.pos[1], deposit_row)
                 if self.pos[0] < self.knowledge["x_max"] - 1:
                     action = Action.RIGHT
                     save_last_pos(self)
-                if self.pos[1] < self.knowledge["grid_height"] - 1:
-                    action = Action.UP
+                if vertical_move is not None:
+                    action = vertical_move
                     save_last_pos(self)
         else:  # If the agent has no waste
             # If the agent is on a waste, take it
             if (
                 self.model.is_on_waste(self.pos) is AgentColor.YELLOW
-                # and len(last_percept["wastes"]) < self.knowledge["max_wastes_handed"] # not necessary
+                # and len(last_percept.wastes) < self.knowledge["max_wastes_handed"] # not necessary
                 and not is_on_yellow_deposit
             ):
                 action = Action.TAKE
@@ -303,8 +380,8 @@ class YellowCleaningAgent(CleaningAgent):
         # If the agent has two wastes, merge them  --  last condition so can override other actions
         if second_waste_in_hand is not None:
             if (
-                last_percept["wastes"][0].indicate_color()
-                == last_percept["wastes"][1].indicate_color()
+                last_percept.wastes[0].indicate_color()
+                == last_percept.wastes[1].indicate_color()
             ):
                 action = Action.MERGE
 
@@ -319,11 +396,7 @@ class RedCleaningAgent(CleaningAgent):
     def deliberate(self) -> Action:
 
         last_percept = self.give_last_percept()
-        x_yellow_zone = 2 * self.knowledge["grid_width"] // 3
-
-        time_between_checking = define_step_between_checking(
-            self.knowledge["grid_height"], self.knowledge["grid_width"]
-        )
+        x_yellow_zone = self.knowledge["x_min"]
 
         action = None
         # This is the default action if no other action is taken
@@ -336,35 +409,34 @@ class RedCleaningAgent(CleaningAgent):
             self.knowledge["last_pos"],
         )
 
-        is_on_red_deposit = (
-            self.pos[1] == self.knowledge["grid_height"] - 1
-            and self.pos[0] == self.knowledge["x_max"] - 1
-        )
-
-        is_on_yellow_deposit = (
-            self.pos[1] == self.knowledge["grid_height"] - 2
-            and self.pos[0] == x_yellow_zone - 1
-        )
+        is_on_red_deposit = self.model.geometry.is_deposit(self.pos)
 
-        has_empty_hands = len(last_percept["wastes"]) == 0
+        has_empty_hands = len(last_percept.wastes) == 0
         waste_on_pos = self.model.is_on_waste(self.pos)
 
         # If the agent is on the yellow zone, move to the yellow one to work on it
         if self.pos[0] < x_yellow_zone:
             action = Action.RIGHT
 
-        # Every time_between_checking steps, the agent moves to the yellow deposit if empty hands
-        if self.step_count >= time_between_checking and has_empty_hands:
+        # Every time_between_checking steps (or when notified of a waste there), the agent
+        # moves to the yellow deposit if empty hands
+        # The merged wastes are dropped one row below the hand-off row
+        yellow_deposit_row = handoff_row(self, has_empty_hands, merged=True)
+        if yellow_deposit_row is not None:
+            is_on_yellow_deposit = (
+                self.pos[1] == yellow_deposit_row and self.pos[0] == x_yellow_zone - 1
+            )
             if not is_on_yellow_deposit:
+                vertical_move = move_to_row(self.pos[1], yellow_deposit_row)
                 if self.pos[0] >= x_yellow_zone:
                     action = Action.LEFT
                     save_last_pos(self)
-                if self.pos[1] < self.knowledge["grid_height"] - 2:
-                    action = Action.UP
+                if vertical_move is not None:
+                    action = vertical_move
                     save_last_pos(self)
             # If is on the yellow deposit, and there is a waste, take it
             if is_on_yellow_deposit:
-                self.step_count = 0
+                end_handoff(self)
                 return_to_last_pos(self)
                 if waste_on_pos == AgentColor.RED:
                     action = Action.TAKE
@@ -372,20 +444,29 @@ class RedCleaningAgent(CleaningAgent):
                 #     action = Action.STAY
 
         # If the agent has a waste
-        if len(last_percept["wastes"]) > 0:
-            # Go to the red deposit
+        if len(last_percept.wastes) > 0:
+            # Go to the nearest red deposit with no robot on it
             if not is_on_red_deposit:
-                if self.pos[0] < self.knowledge["x_max"] - 1:
+                target_x, target_y = nearest_deposit(
+                    self.pos,
+                    self.model.geometry.deposits,
+                    is_free=lambda pos: deposit_is_free(self, pos),
+                )
+                if self.pos[0] < target_x:
                     action = Action.RIGHT
                     save_last_pos(self)
-                if self.pos[1] < self.knowledge["grid_height"] - 1:
-                    action = Action.UP
+                elif self.pos[0] > target_x:
+                    action = Action.LEFT
+                    save_last_pos(self)
+                vertical_move = move_to_row(self.pos[1], target_y)
+                if vertical_move is not None:
+                    action = vertical_move
                     save_last_pos(self)
         else:  # If the agent has no waste
             # If the agent is on a waste, take it if not already carrying the maximum waste allowed
             if (
                 self.model.is_on_waste(self.pos) is AgentColor.RED
-                and len(last_percept["wastes"]) < self.knowledge["max_wastes_handed"]
+                and len(last_percept.wastes) < self.knowledge["max_wastes_handed"]
                 and not is_on_red_deposit
             ):
                 action = Action.TAKE
@@ -394,13 +475,13 @@ class RedCleaningAgent(CleaningAgent):
         if is_on_red_deposit:
             # If he has a waste, and there is a waste on the cell of the same color, and has free spot, take it
             if (
-                len(last_percept["wastes"]) < self.knowledge["max_wastes_handed"]
+                len(last_percept.wastes) < self.knowledge["max_wastes_handed"]
                 and waste_on_pos == AgentColor.RED
             ):
                 action = Action.TAKE
             else:
                 # If he has a waste, and there is a waste on the cell, drop it
-                if len(last_percept["wastes"]) > 0:
+                if len(last_percept.wastes) > 0:
                     action = Action.DROP
                     return_to_last_pos(self)
 
@@ -411,24 +492,32 @@ class RedCleaningAgent(CleaningAgent):
         return action
 
 
-def add_cleaning_agents(environment, num_agents: int, agent_color: AgentColor):
+def add_cleaning_agents(environment, starts, agent_color: AgentColor):
     """
     Adds cleaning agents to the environment.
 
     :param environment: The environment where agents are added.
-    :param num_agents: The number of agents to add.
-    :param agent_color: The specific color for all agents; if None, assigns random colors.
+    :param starts: The start position of each agent to add, in the zone of its color.
+    :param agent_color: The specific color for all agents.
     """
-    for i in range(num_agents):
+    # Set movement boundaries based on the agent's color.
+    geometry = environment.geometry
+    x_max_green = geometry.x_max(AgentColor.GREEN)
+    x_max_yellow = geometry.x_max(AgentColor.YELLOW)
+    x_max_red = geometry.x_max(AgentColor.RED)
+
+    # Tuning knobs of the model, with the default values of the strategy if not set
+    # (the deposit_row of the model is its only hand-off row)
+    deposit_rows = list(geometry.handoff_rows)
+    step_between_checking = environment.step_between_checking
+    if step_between_checking is None:
+        step_between_checking = define_step_between_checking(
+            environment.grid.height, environment.grid.width
+        )
+    for x, y in starts:
         environment.obj_id += 1
 
-        y = environment.random.randrange(environment.grid.height)
-        # Set movement boundaries based on the agent's color.
-        x_max_green = environment.grid.width // 3
-        x_max_yellow = 2 * environment.grid.width // 3
-        x_max_red = environment.grid.width
         if agent_color == AgentColor.GREEN:
-            x = environment.random.randrange(x_max_green)
             agent = GreenCleaningAgent(
                 unique_id=environment.obj_id,
                 color=agent_color,
@@ -436,7 +525,6 @@ def add_cleaning_agents(environment, num_agents: int, agent_color: AgentColor):
                 model=environment,
             )
         elif agent_color == AgentColor.YELLOW:
-            x = environment.random.randrange(x_max_green, x_max_yellow)
             agent = YellowCleaningAgent(
                 unique_id=environment.obj_id,
                 color=agent_color,
@@ -444,22 +532,36 @@ def add_cleaning_agents(environment, num_agents: int, agent_color: AgentColor):
                 model=environment,
             )
         else:  # AgentColor.RED
-            x = environment.random.randrange(x_max_yellow, x_max_red)
             agent = RedCleaningAgent(
                 unique_id=environment.obj_id,
                 color=agent_color,
                 x_max=x_max_red,
                 model=environment,
             )
+        agent.knowledge["x_min"] = geometry.bounds[agent_color][0]
+        agent.knowledge["deposit_rows"] = deposit_rows
+        agent.knowledge["poll_row"] = None
+        agent.knowledge["polls"] = 0
+        agent.knowledge["step_between_checking"] = step_between_checking
+        if environment.handoffs is not None and agent_color != AgentColor.GREEN:
+            # The hand-off cell and the merged-waste cell under it, at the right of the
+            # previous zone, for the wastes of the color of the agent
+            for row in deposit_rows:
+                for y in (row, row - 1):
+                    environment.handoffs.subscribe(
+                        agent, (agent.knowledge["x_min"] - 1, y), agent_color
+                    )
 
         environment.schedule.add(agent)
         environment.grid.place_agent(agent, (x, y))
 
 
-def add_agents_strat_3(environment, n_green_agents, n_yellow_agents, n_red_agents):
+def add_agents_strat_3(environment, robots):
     """
     Add agents to the environment.
+
+    :param robots: The start positions of the robots of each color (see World.robots).
     """
-    add_cleaning_agents(environment, n_green_agents, AgentColor.GREEN)
-    add_cleaning_agents(environment, n_yellow_agents, AgentColor.YELLOW)
-    add_cleaning_agents(environment, n_red_agents, AgentColor.RED)
+    add_cleaning_agents(environment, robots[AgentColor.GREEN], AgentColor.GREEN)
+    add_cleaning_agents(environment, robots[AgentColor.YELLOW], AgentColor.YELLOW)
+    add_cleaning_agents(environment, robots[AgentColor.RED], AgentColor.RED)
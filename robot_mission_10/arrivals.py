@@ -0,0 +1,228 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from results_store import MISSING
+from types_1 import AgentColor
+from world import zone_bounds
+
+# The number of green wastes a waste of each color stands for: 2 green -> 1 yellow,
+# 2 yellow -> 1 red. The arrivals and the deposits are compared in these units.
+WASTE_UNITS = {AgentColor.GREEN: 1, AgentColor.YELLOW: 2, AgentColor.RED: 4}
+
+ARRIVAL_PROCESSES = ("poisson", "periodic")
+
+# The metrics of ThroughputMonitor.steady_state, besides the warm-up and the steps
+STEADY_STATE_METRICS = (
+    "deposits_per_100_steps",
+    "arrival_units_per_100_steps",
+    "deposit_units_per_100_steps",
+    "backlog_mean",
+    "backlog_slope_per_100_steps",
+    "age_mean",
+    "age_p90",
+)
+
+
+class ArrivalProcess:
+    """
+    New wastes arriving in each zone during the run, in addition to the wastes of the world.
+
+    The wastes of a color arrive in the zone of that color (like in generate_world), on a
+    cell drawn uniformly, at a mean rate of `rates[color]` wastes per step:
+    - "poisson": the number of wastes of a step is drawn from a Poisson distribution.
+    - "periodic": one waste every 1 / rate steps (the fractions are carried over).
+
+    Parameters:
+    - width (int), height (int): The size of the grid.
+    - rates (Dict[AgentColor, float]): The mean number of wastes per step of each color.
+    - process (str): "poisson" or "periodic".
+    - seed (int): The seed of the generator of the arrivals.
+    - bounds (Dict[AgentColor, Tuple[int, int]]): The columns of each zone. If None, the
+        zones of world.zone_bounds.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        rates: Dict[AgentColor, float],
+        process: str = "poisson",
+        seed: Optional[int] = None,
+        bounds: Optional[Dict[AgentColor, Tuple[int, int]]] = None,
+    ):
+        if process not in ARRIVAL_PROCESSES:
+            raise ValueError(
+                f"Unknown arrival process {process}, use one of {ARRIVAL_PROCESSES}."
+            )
+        if any(rate < 0 for rate in rates.values()):
+            raise ValueError("The arrival rates must be positive.")
+        self.height = height
+        self.bounds = zone_bounds(width) if bounds is None else dict(bounds)
+        self.rates = dict(rates)
+        self.process = process
+        self.rng = np.random.default_rng(seed)
+        self._fractions = {color: 0.0 for color in self.rates}
+
+    def draw(self) -> List[Tuple[Tuple[int, int], AgentColor]]:
+        """
+        The position and color of the wastes arriving at this step.
+        """
+        arrivals = []
+        for color, rate in self.rates.items():
+            if self.process == "poisson":
+                n_wastes = int(self.rng.poisson(rate))
+            else:
+                self._fractions[color] += rate
+                n_wastes = int(self._fractions[color])
+                self._fractions[color] -= n_wastes
+            x_min, x_max = self.bounds[color]
+            for _ in range(n_wastes):
+                x = int(self.rng.integers(x_min, x_max))
+                y = int(self.rng.integers(self.height))
+                arrivals.append(((x, y), color))
+        return arrivals
+
+    @property
+    def unit_rate(self) -> float:
+        """
+        The mean arrival rate in green wastes per step (see WASTE_UNITS).
+        """
+        return sum(rate * WASTE_UNITS[color] for color, rate in self.rates.items())
+
+
+def mser_truncation(values: Sequence[float], batch_size: int = 5) -> int:
+    """
+    The number of first values to drop as warm-up, by the MSER-5 rule: the values are
+    averaged by batches of batch_size, and the truncation keeps the batches after the
+    point that minimizes the standard error of the mean of the rest. Only the first half
+    of the series is considered, a longer warm-up means the run is too short.
+    """
+    n_batches = len(values) // batch_size
+    if n_batches < 2:
+        return 0
+    batches = (
+        np.asarray(values[: n_batches * batch_size], dtype=float)
+        .reshape(n_batches, batch_size)
+        .mean(axis=1)
+    )
+    best_d, best_score = 0, float("inf")
+    for d in range(n_batches // 2 + 1):
+        rest = batches[d:]
+        score = rest.var() / len(rest)
+        if score < best_score:
+            best_d, best_score = d, score
+    return best_d * batch_size
+
+
+class ThroughputMonitor:
+    """
+    The steady-state metrics of a run with waste arrivals.
+
+    At each step, the backlog (wastes on the ground or carried) and the cumulated
+    arrivals and deposits are recorded. Each waste remembers the step it arrived at,
+    a merged waste the step of the oldest of the two, so the age of a deposited waste
+    is the time from the arrival of its oldest part to the deposit.
+
+    The steps are counted from 1, as the number of steps done at the end of the step
+    (0 for the wastes of the initial world): the row i of the backlog is observed after
+    the step i + 1.
+    """
+
+    def __init__(self):
+        self.backlog: List[int] = []
+        self.deposited: List[int] = []
+        self.arrived_units: List[int] = []
+        self.deposited_units: List[int] = []
+        # (deposit step, age) of each deposited waste
+        self.ages: List[Tuple[int, int]] = []
+        self._arrival_step: Dict[int, int] = {}
+        self._arrived_units = 0
+
+    def arrive(self, waste_id: int, color: AgentColor, step: int):
+        self._arrival_step[waste_id] = step
+        self._arrived_units += WASTE_UNITS[color]
+
+    def merge(self, waste_id1: int, waste_id2: int, merged_id: int):
+        self._arrival_step[merged_id] = min(
+            self._arrival_step.pop(waste_id1), self._arrival_step.pop(waste_id2)
+        )
+
+    def deposit(self, waste_id: int, step: int):
+        self.ages.append((step, step - self._arrival_step.pop(waste_id)))
+
+    def observe(self, model):
+        self.backlog.append(model.wastes.total_remaining)
+        self.deposited.append(model.wastes.deposited)
+        self.arrived_units.append(self._arrived_units)
+        self.deposited_units.append(
+            model.wastes.deposited * WASTE_UNITS[AgentColor.RED]
+        )
+
+    def tables(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        The tables of the results store:
+        - throughput: the backlog, the deposits and the arrived and deposited units after
+            each step.
+        - steady_state: one row, the metrics of steady_state with the detected warm-up.
+        - deposit_ages: the step and the age of each deposited waste.
+        """
+        ages = np.asarray(self.ages, dtype=np.int32).reshape(-1, 2)
+        return {
+            "throughput": {
+                "backlog": np.asarray(self.backlog, dtype=np.int32),
+                "deposited": np.asarray(self.deposited, dtype=np.int32),
+                "arrived_units": np.asarray(self.arrived_units, dtype=np.int32),
+                "deposited_units": np.asarray(self.deposited_units, dtype=np.int32),
+            },
+            "steady_state": {
+                name: np.array([value], dtype=np.float64)
+                for name, value in self.steady_state().items()
+            },
+            "deposit_ages": {"step": ages[:, 0], "age": ages[:, 1]},
+        }
+
+    def steady_state(self, warmup: Optional[int] = None) -> Dict[str, float]:
+        """
+        The metrics after the warm-up (detected on the backlog by mser_truncation if None):
+        - warmup: the number of steps dropped.
+        - deposits_per_100_steps: the red wastes deposited per 100 steps.
+        - arrival_units_per_100_steps, deposit_units_per_100_steps: in green wastes per
+            100 steps, the deposits keep up with the arrivals when they are equal.
+        - backlog_mean, backlog_slope_per_100_steps: a backlog still growing after the
+            warm-up means the robots cannot keep up with the arrivals.
+        - age_mean, age_p90: the age of the wastes deposited after the warm-up.
+        The metrics are MISSING while fewer than 2 steps are left after the warm-up.
+        """
+        n_steps = len(self.backlog)
+        if warmup is None:
+            warmup = mser_truncation(self.backlog)
+        if n_steps - warmup < 2:
+            # The warm-up is not over: the metrics are missing
+            return {
+                "warmup": warmup,
+                "steps": max(n_steps - 1 - warmup, 0),
+                **{name: MISSING for name in STEADY_STATE_METRICS},
+            }
+        steps = n_steps - 1 - warmup
+        backlog = np.asarray(self.backlog[warmup:], dtype=float)
+        slope = np.polyfit(np.arange(len(backlog)), backlog, 1)[0]
+        # The rates count the steps after the first row kept, the step warmup + 1
+        ages = [age for step, age in self.ages if step > warmup + 1]
+        return {
+            "warmup": warmup,
+            "steps": steps,
+            "deposits_per_100_steps": 100
+            * (self.deposited[-1] - self.deposited[warmup])
+            / steps,
+            "arrival_units_per_100_steps": 100
+            * (self.arrived_units[-1] - self.arrived_units[warmup])
+            / steps,
+            "deposit_units_per_100_steps": 100
+            * (self.deposited_units[-1] - self.deposited_units[warmup])
+            / steps,
+            "backlog_mean": float(backlog.mean()),
+            "backlog_slope_per_100_steps": float(100 * slope),
+            "age_mean": float(np.mean(ages)) if ages else float("nan"),
+            "age_p90": float(np.percentile(ages, 90)) if ages else float("nan"),
+        }
@@ -0,0 +1,123 @@
+"""
+Measure the cold start of the headless simulation path, as paid by each new sweep worker.
+
+Each measure runs a fresh interpreter with `python -X importtime`. The script reports
+the time to import the module, the part of it spent in Mesa (which imports pandas,
+networkx and its visualization server from its own __init__), the part spent in our
+modules, and fails if a heavy module that the simulation does not need is loaded, or
+one of the parts of the model that are only imported when a model enables them.
+
+Usage: python benchmark_import.py [--repeat 5] [--budget-ms 50]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# The modules imported by a simulation worker.
+HEADLESS_MODULES = ["model", "sweep"]
+
+# The modules that must not be imported by a simulation worker.
+FORBIDDEN_MODULES = ["matplotlib", "run", "server"]
+
+# The parts of the model imported when a model enables them, not by the import.
+LAZY_MODULES = [
+    "memory",
+    "utilization",
+    "heatmaps",
+    "arrivals",
+    "sparse_grid",
+    "scenario",
+    "stagnation",
+    "handoffs",
+]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_importtime(stderr: str):
+    """
+    Return {module: (self_us, cumulative_us)} from the output of -X importtime.
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure(module: str):
+    """
+    Import the module in a fresh interpreter.
+    Return the import times and the list of the modules loaded by this import.
+    """
+    code = (
+        f"import sys; import {module}; "
+        "sys.stdout.write('\\n'.join(sorted(sys.modules)))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(completed.stderr), completed.stdout.split("\n")
+
+
+def is_ours(name: str) -> bool:
+    return os.path.isfile(os.path.join(HERE, name.split(".")[0] + ".py"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=50,
+        help="Maximum import time of our own modules, Mesa excluded.",
+    )
+    args = parser.parse_args()
+
+    failed = False
+    for module in HEADLESS_MODULES:
+        totals, mesa_times, own_times = [], [], []
+        loaded = []
+        for _ in range(args.repeat):
+            times, loaded = measure(module)
+            totals.append(times[module][1])
+            mesa_times.append(times.get("mesa", (0, 0))[1])
+            own_times.append(
+                sum(self_us for name, (self_us, _) in times.items() if is_ours(name))
+            )
+
+        total_ms = statistics.median(totals) / 1000
+        mesa_ms = statistics.median(mesa_times) / 1000
+        own_ms = statistics.median(own_times) / 1000
+        print(
+            f"import {module}: {total_ms:.1f} ms "
+            f"(mesa and its dependencies: {mesa_ms:.1f} ms, our modules: {own_ms:.1f} ms)"
+        )
+
+        forbidden = [name for name in FORBIDDEN_MODULES if name in loaded]
+        if forbidden:
+            print(f"  FAIL: import {module} loads {forbidden}")
+            failed = True
+        eager = [name for name in LAZY_MODULES if name in loaded]
+        if eager:
+            print(f"  FAIL: import {module} loads {eager}")
+            failed = True
+        if own_ms > args.budget_ms:
+            print(f"  FAIL: our modules take more than {args.budget_ms} ms")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Measure the neighbor index on the calls of real runs.
+
+Each run records the calls made to its NeighborIndex (the robots and wastes placed and
+removed, the surroundings queried), then replays them on a new index: as it is, and
+without the entries kept per cell (each query classifies the objects again). The script
+reports the time of each replay, the share of the cells whose entries were kept, and the
+memory of the index at the end of the run.
+
+Usage: python benchmark_neighbors.py [--steps 2000] [--repeat 5]
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from memory import deep_size
+from model import NuclearWasteModel
+from neighbors import NeighborIndex
+
+# (strategy, width, height, robots per zone, wastes, sparse)
+RUNS = [
+    (1, 30, 20, 8, 80, False),
+    (3, 30, 20, 8, 80, False),
+    (1, 60, 50, 8, 80, False),
+    (3, 60, 50, 8, 80, False),
+    (3, 10000, 10000, 5, 50, True),
+]
+
+
+class RecordingIndex(NeighborIndex):
+    """
+    A NeighborIndex that logs the calls to place, remove and surroundings.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+        self.hits = self.misses = 0
+
+    def place(self, obj, pos):
+        self.calls.append(("place", (obj, pos)))
+        super().place(obj, pos)
+
+    def remove(self, obj, pos):
+        self.calls.append(("remove", (obj, pos)))
+        super().remove(obj, pos)
+
+    def surroundings(self, pos, radius=1):
+        self.calls.append(("surroundings", (pos, radius)))
+        return super().surroundings(pos, radius)
+
+    def _classify(self, cell):
+        if cell in self._entries:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return super()._classify(cell)
+
+
+class UncachedIndex(NeighborIndex):
+    """
+    A NeighborIndex that classifies the objects of a cell at each query.
+    """
+
+    def _classify(self, cell):
+        self._entries.pop(cell, None)
+        return super()._classify(cell)
+
+
+def record(strategy, width, height, n_agents, n_wastes, sparse, steps):
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = NuclearWasteModel(
+            n_agents,
+            n_agents,
+            n_agents,
+            n_wastes,
+            width,
+            height,
+            strategy=strategy,
+            seed=0,
+            sparse=sparse,
+            scheduler="zones",
+            collect_agents=False,
+        )
+        index = model.neighbors
+        model.neighbors = RecordingIndex(index.width, index.height, index.torus)
+        model.neighbors.deposits.update(index.deposits)
+        for pos, objects in index.cells.items():
+            for obj in objects:
+                model.neighbors.place(obj, pos)
+        for _ in range(steps):
+            model.step()
+    return model.neighbors
+
+
+def replay(cls, recorded, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        index = cls(recorded.width, recorded.height, recorded.torus, recorded.deposits)
+        calls = [(getattr(index, name), args) for name, args in recorded.calls]
+        start = time.perf_counter()
+        for call, args in calls:
+            call(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for strategy, width, height, n_agents, n_wastes, sparse in RUNS:
+        recorded = record(
+            strategy, width, height, n_agents, n_wastes, sparse, args.steps
+        )
+        queries = sum(1 for name, _ in recorded.calls if name == "surroundings")
+        kept = recorded.hits / max(1, recorded.hits + recorded.misses)
+        cached = replay(NeighborIndex, recorded, args.repeat)
+        uncached = replay(UncachedIndex, recorded, args.repeat)
+        size = deep_size([recorded.cells, recorded._buckets, recorded._entries])[0]
+        print(
+            f"strategy {strategy} {width}x{height}: {len(recorded.calls) - queries} changes, "
+            f"{queries} queries, entries kept {kept:.0%}: {cached * 1000:.0f} ms, "
+            f"{uncached * 1000:.0f} ms without them; index {size / 1024:.0f} KB"
+        )
+
+
+if __name__ == "__main__":
+    main()
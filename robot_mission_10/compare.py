@@ -0,0 +1,146 @@
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Sequence
+
+from geometry import ZoneGeometry
+from model import NuclearWasteModel
+from sweep import completion_step, confidence_interval
+from world import generate_world
+
+
+def run_on_world(params: Dict[str, Any], strategy, seed, world, max_steps: int):
+    """
+    Run one strategy on the given world until its accessible wastes are cleaned or
+    max_steps, and return its metrics.
+    The throughput is the number of accessible wastes cleaned per 100 steps.
+    """
+    model = NuclearWasteModel(
+        **{"collect_agents": False, **params},
+        strategy=strategy,
+        seed=seed,
+        world=world,
+    )
+    initial_accessible_wastes = model.accessible_remaining_wastes
+    while model.running and model.schedule.steps < max_steps:
+        model.step()
+        if model.is_finished > 0:
+            break
+    steps = completion_step(model, max_steps)
+    cleaned = initial_accessible_wastes - model.accessible_remaining_wastes
+    return {
+        "strategy": strategy,
+        "seed": seed,
+        "completion_step": steps,
+        "finished": model.is_finished > 0,
+        "throughput": 100 * cleaned / steps if steps > 0 else 0.0,
+    }
+
+
+def _run_on_world(task):
+    return run_on_world(*task)
+
+
+def paired_differences(
+    results: List[Dict[str, Any]],
+    baseline,
+    metrics: Sequence[str] = ("completion_step", "throughput"),
+    confidence: float = 0.95,
+) -> Dict[Any, Dict[str, Dict[str, float]]]:
+    """
+    For each strategy, the mean and confidence interval of (strategy - baseline),
+    computed seed by seed on the same world.
+    """
+    by_seed: Dict[Any, Dict[Any, Dict[str, Any]]] = {}
+    for result in results:
+        by_seed.setdefault(result["seed"], {})[result["strategy"]] = result
+
+    strategies = {result["strategy"] for result in results} - {baseline}
+    report = {}
+    for strategy in sorted(strategies):
+        report[strategy] = {}
+        for metric in metrics:
+            differences = [
+                runs[strategy][metric] - runs[baseline][metric]
+                for runs in by_seed.values()
+                if strategy in runs and baseline in runs
+            ]
+            mean, half_width = confidence_interval(differences, confidence)
+            report[strategy][metric] = {
+                "n_pairs": len(differences),
+                "mean_difference": mean,
+                "ci_low": mean - half_width,
+                "ci_high": mean + half_width,
+                "std_difference": (
+                    statistics.stdev(differences) if len(differences) > 1 else 0.0
+                ),
+            }
+    return report
+
+
+def compare_strategies(
+    params: Dict[str, Any],
+    strategies: Sequence = (1, 3),
+    seeds: Iterable[int] = range(10),
+    max_steps: int = 1500,
+    number_processes: int = 1,
+    confidence: float = 0.95,
+):
+    """
+    Compare strategies with common random numbers: for each seed, one world is drawn
+    (terrain, wastes and robot starts) and every strategy runs on that same world.
+    The differences are then paired by seed, which removes the variance coming from
+    the layout, so far fewer seeds are needed to see a difference between strategies.
+
+    :param params: The model parameters, without strategy nor seed. The worlds are drawn
+        with their zones and deposits, and sparse if the models are.
+    :param strategies: The strategies to compare; the first one is the baseline.
+    :return: (results, report) with one result per (seed, strategy), and the paired
+        differences of each strategy against the baseline.
+    """
+    geometry = ZoneGeometry(
+        params["width"],
+        params["height"],
+        params.get("zone_widths"),
+        params.get("deposits"),
+    )
+    tasks = []
+    for seed in seeds:
+        world = generate_world(
+            params["width"],
+            params["height"],
+            params["n_green_agents"],
+            params["n_yellow_agents"],
+            params["n_red_agents"],
+            params["n_wastes"],
+            random.Random(seed),
+            geometry,
+            sparse=params.get("sparse", False),
+        )
+        for strategy in strategies:
+            tasks.append((params, strategy, seed, world, max_steps))
+
+    if number_processes == 1:
+        results = [_run_on_world(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=number_processes) as executor:
+            results = list(executor.map(_run_on_world, tasks))
+
+    report = paired_differences(results, strategies[0], confidence=confidence)
+    return results, report
+
+
+if __name__ == "__main__":
+    params = {
+        "width": 12,
+        "height": 10,
+        "n_green_agents": 1,
+        "n_yellow_agents": 1,
+        "n_red_agents": 1,
+        "n_wastes": 10,
+        "max_wastes_handed": 2,
+    }
+    _, report = compare_strategies(params, strategies=(1, 3), number_processes=4)
+    for strategy, metrics in report.items():
+        for metric, difference in metrics.items():
+            print(f"Strategy {strategy} - baseline, {metric}: {difference}")
@@ -0,0 +1,775 @@
+"""
+Run many small worlds of strategy 3 at once, with their state stacked in arrays.
+
+Each world keeps the semantics of a NuclearWasteModel run with the same parameters and
+seed: the world is drawn with the same random generator, the robots act one after the
+other in the order drawn by the RandomActivation scheduler, and they follow the rules of
+agent_strat_3. The completion steps are the same as with sweep.run_single.
+
+The worlds advance in lockstep: at each step, the k-th robot to act in every world acts
+at the same time, with array operations over the worlds. A world stops as soon as all
+its accessible wastes are cleaned.
+"""
+
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from agent_strat_3 import define_step_between_checking
+from types_1 import Action, AgentColor
+from world import World, generate_world
+
+# Colors are stored as the value of AgentColor, -1 for no color.
+NO_COLOR = -1
+RED = AgentColor.RED.value
+YELLOW = AgentColor.YELLOW.value
+GREEN = AgentColor.GREEN.value
+
+# States of a waste
+UNUSED, ON_GROUND, CARRIED, DEPOSITED, MERGED = range(5)
+
+# Actions are stored as the value of Action, -1 for no action decided yet.
+NO_ACTION = -1
+LEFT = Action.LEFT.value
+RIGHT = Action.RIGHT.value
+UP = Action.UP.value
+DOWN = Action.DOWN.value
+TAKE = Action.TAKE.value
+DROP = Action.DROP.value
+MERGE = Action.MERGE.value
+STAY = Action.STAY.value
+
+MOVES = {LEFT: (-1, 0), RIGHT: (1, 0), UP: (0, 1), DOWN: (0, -1)}
+
+# The outputs read at once for one draw of a shuffle. A draw is rejected with a
+# probability below 1/2, so a window without any accepted output almost never happens.
+REDRAW_WINDOW = 16
+
+
+def move_to_row(y: np.ndarray, row) -> np.ndarray:
+    """
+    The vertical move to reach the row, NO_ACTION if already on it (see agent_strat_3).
+    """
+    return np.where(y < row, UP, np.where(y > row, DOWN, NO_ACTION))
+
+
+def default_move(x, y, x_min, x_max, height, go_back, last_x, last_y) -> np.ndarray:
+    """
+    agent_strat_3.get_default_move on arrays.
+    """
+    odd_col = x % 2 == 1
+    action = np.full(x.shape, STAY)
+    action = np.where(odd_col & (y == height - 2) & (x != x_max - 1), RIGHT, action)
+    action = np.where(
+        odd_col & ((y < height - 2) | ((y == height - 2) & (x == x_max - 1))),
+        UP,
+        action,
+    )
+    action = np.where(~odd_col, np.where(y > 0, DOWN, RIGHT), action)
+    action = np.where(y == height - 1, np.where(x == x_min, DOWN, LEFT), action)
+
+    # Going back to the last position comes first
+    back = np.where(
+        x < last_x,
+        RIGHT,
+        np.where(
+            x > last_x,
+            LEFT,
+            np.where(y < last_y, UP, np.where(y > last_y, DOWN, NO_ACTION)),
+        ),
+    )
+    return np.where(go_back & (back != NO_ACTION), back, action)
+
+
+def unaccessible_wastes(n_green: np.ndarray, n_yellow: np.ndarray) -> np.ndarray:
+    """
+    waste_accounting.calculate_unaccessible_accessible_wastes on arrays.
+    """
+    unaccessible_yellow = n_yellow % 2
+    completes_yellow = (unaccessible_yellow == 1) & (n_green >= 2)
+    unaccessible_yellow = np.where(completes_yellow, 0, unaccessible_yellow)
+    n_green = np.where(completes_yellow, n_green - 2, n_green)
+    unaccessible_green = n_green % 4
+    leftover_pair = unaccessible_green >= 2
+    unaccessible_green = np.where(
+        leftover_pair, unaccessible_green - 2, unaccessible_green
+    )
+    unaccessible_yellow = unaccessible_yellow + leftover_pair
+    return unaccessible_yellow + unaccessible_green
+
+
+# The parameters that can differ from one world to another of an ensemble.
+TUNING_KNOBS = ("deposit_row", "step_between_checking")
+# The parameters of geometry.ZoneGeometry, only the defaults are implemented
+GEOMETRY_PARAMS = ("zone_widths", "deposits", "handoff_rows")
+
+
+def _knob(params, configuration, name, default):
+    value = configuration.get(name, params.get(name))
+    return default if value is None else value
+
+
+class ScheduleShuffler:
+    """
+    The in-place shuffles of the schedules of several worlds, as random.Random.shuffle
+    would do them with the generator of each world, but for all the worlds at once.
+
+    random.Random and numpy's MT19937 are the same Mersenne Twister, so the state of each
+    generator is moved to numpy and its 32 bits outputs are drawn in blocks.
+    shuffle swaps x[i] with x[randbelow(i + 1)] for i from n - 1 down to 1, and
+    randbelow(m) takes the k = m.bit_length() high bits of an output, drawing again while
+    the value is not below m. The bounds are the same for every world, so each i is one
+    array operation over the worlds (plus a few for the rare redraws).
+
+    Parameters:
+    - rngs (Sequence[random.Random]): The generator of each world. They must not be used after.
+    - size (int): The length of the schedules.
+    """
+
+    def __init__(self, rngs: Sequence[random.Random], size: int):
+        self.size = size
+        self.generators = []
+        for rng in rngs:
+            _, internal_state, _ = rng.getstate()
+            generator = np.random.MT19937()
+            generator.state = {
+                "bit_generator": "MT19937",
+                "state": {
+                    "key": np.array(internal_state[:-1], dtype=np.uint32),
+                    "pos": internal_state[-1],
+                },
+            }
+            self.generators.append(generator)
+        # A block of outputs of each generator, and the next one to use
+        self.block_size = 4 * size + REDRAW_WINDOW
+        self.outputs = np.stack(
+            [generator.random_raw(self.block_size) for generator in self.generators]
+        ).astype(np.int64)
+        self.next_output = np.zeros(len(self.generators), dtype=np.int64)
+        self.orders = np.tile(
+            np.arange(size, dtype=np.int64), (len(self.generators), 1)
+        )
+
+    def _refill(self, worlds: np.ndarray):
+        """
+        Keep the unused outputs of the worlds and draw new ones after them.
+        """
+        for k in worlds:
+            unused = self.outputs[k, self.next_output[k] :]
+            new = self.generators[k].random_raw(self.block_size - len(unused))
+            self.outputs[k, : len(unused)] = unused
+            self.outputs[k, len(unused) :] = new
+            self.next_output[k] = 0
+
+    def _randbelow(self, k: int, bound: int, shift: int) -> int:
+        """
+        One draw below the bound for the world k, from its next output (the slow path).
+        """
+        while True:
+            if self.next_output[k] == self.block_size:
+                self._refill([k])
+            draw = int(self.outputs[k, self.next_output[k]]) >> shift
+            self.next_output[k] += 1
+            if draw < bound:
+                return draw
+
+    def shuffle(self, worlds: np.ndarray) -> np.ndarray:
+        """
+        Shuffle the schedules of the given worlds and return them.
+        """
+        window = np.arange(REDRAW_WINDOW)
+        orders = self.orders[worlds]
+        rows = np.arange(len(worlds))
+        for i in range(self.size - 1, 0, -1):
+            bound = i + 1
+            shift = 32 - bound.bit_length()
+            next_output = self.next_output[worlds]
+            if next_output.max() > self.block_size - REDRAW_WINDOW:
+                self._refill(worlds[next_output > self.block_size - REDRAW_WINDOW])
+                next_output = self.next_output[worlds]
+            # The next outputs of each world, the draw is the first one below the bound
+            candidates = (
+                self.outputs[worlds[:, None], next_output[:, None] + window] >> shift
+            )
+            accepted = candidates < bound
+            first = accepted.argmax(axis=1)
+            draw = candidates[rows, first]
+            self.next_output[worlds] = next_output + first + 1
+            for row in np.flatnonzero(~accepted[rows, first]):
+                # Very unlikely: no output of the window is below the bound
+                self.next_output[worlds[row]] = next_output[row] + REDRAW_WINDOW
+                draw[row] = self._randbelow(worlds[row], bound, shift)
+            swapped = orders[rows, draw]
+            orders[rows, draw] = orders[:, i]
+            orders[:, i] = swapped
+        self.orders[worlds] = orders
+        return orders
+
+
+class Ensemble:
+    """
+    K worlds of strategy 3, one per seed. The worlds share the size of the grid, the
+    number of robots and wastes, and max_wastes_handed; the tuning knobs of the strategy
+    can differ from one world to another.
+
+    Parameters:
+    - params (dict): The model parameters (as for NuclearWasteModel), with strategy 3.
+    - seeds (Sequence[int]): The seed of each world.
+    - worlds (Sequence[World]): The initial layouts, if they are not drawn from the seeds.
+    - configurations (Sequence[dict]): The tuning knobs of each world (TUNING_KNOBS),
+        overriding the ones of params.
+    """
+
+    def __init__(
+        self,
+        params: Dict[str, Any],
+        seeds: Sequence[int],
+        worlds: Optional[Sequence[World]] = None,
+        configurations: Optional[Sequence[Dict[str, Any]]] = None,
+    ):
+        if params.get("strategy", 1) != 3:
+            raise ValueError("The ensemble engine only implements strategy 3.")
+        geometry = [name for name in GEOMETRY_PARAMS if params.get(name) is not None]
+        if params.get("sparse"):
+            raise ValueError("The ensemble engine only implements dense worlds.")
+        if params.get("scheduler", "random") != "random":
+            raise ValueError(
+                "The ensemble engine only implements the order of RandomActivation."
+            )
+        if params.get("handoff_notifications"):
+            raise ValueError(
+                "The ensemble engine only implements the polling of the deposits."
+            )
+        if geometry:
+            raise ValueError(
+                f"The ensemble engine only implements the default zones and deposits, not {geometry}."
+            )
+        if configurations is None:
+            configurations = [{}] * len(seeds)
+        unknown = {name for c in configurations for name in c} - set(TUNING_KNOBS)
+        if unknown:
+            raise ValueError(
+                f"The ensemble engine cannot vary {sorted(unknown)} between worlds."
+            )
+
+        self.width = params.get("width", 10)
+        self.height = params.get("height", 10)
+        n_green = params.get("n_green_agents", 5)
+        n_yellow = params.get("n_yellow_agents", 5)
+        n_red = params.get("n_red_agents", 5)
+        n_wastes = params.get("n_wastes", 3)
+        self.max_wastes_handed = params.get("max_wastes_handed", 2)
+        # The tuning knobs of each world, with the defaults of the strategy if not set
+        self.deposit_row = np.array(
+            [
+                _knob(params, configuration, "deposit_row", self.height - 1)
+                for configuration in configurations
+            ]
+        )
+        self.step_between_checking = np.array(
+            [
+                _knob(
+                    params,
+                    configuration,
+                    "step_between_checking",
+                    define_step_between_checking(self.height, self.width),
+                )
+                for configuration in configurations
+            ]
+        )
+
+        self.seeds = list(seeds)
+        n_worlds = len(self.seeds)
+        # The random generator of each world, as the one of the model (mesa seeds it)
+        self.rngs = [random.Random(seed) for seed in self.seeds]
+        if worlds is None:
+            worlds = [
+                generate_world(
+                    self.width,
+                    self.height,
+                    n_green,
+                    n_yellow,
+                    n_red,
+                    n_wastes,
+                    rng,
+                )
+                for rng in self.rngs
+            ]
+
+        # Robots, in the order the strategy adds them to the schedule
+        self.robot_colors = np.array(
+            [GREEN] * n_green + [YELLOW] * n_yellow + [RED] * n_red
+        )
+        n_robots = len(self.robot_colors)
+        zone_width = {
+            GREEN: self.width // 3,
+            YELLOW: 2 * self.width // 3,
+            RED: self.width,
+        }
+        self.x_max = np.array([zone_width[color] for color in self.robot_colors])
+
+        # The schedule of each world: one radioactivity agent per cell, then the robots.
+        # Only the robots act, but the whole list is shuffled at each step.
+        self.n_terrain = self.width * self.height
+        self.shuffler = ScheduleShuffler(self.rngs, self.n_terrain + n_robots)
+
+        shape = (n_worlds, n_robots)
+        self.x = np.zeros(shape, dtype=np.int64)
+        self.y = np.zeros(shape, dtype=np.int64)
+        for k, world in enumerate(worlds):
+            starts = [
+                *world.robots[AgentColor.GREEN],
+                *world.robots[AgentColor.YELLOW],
+                *world.robots[AgentColor.RED],
+            ]
+            for r, (x, y) in enumerate(starts):
+                self.x[k, r] = x
+                self.y[k, r] = y
+        # The row of the position of the last percept, which a failed action keeps
+        self.percept_y = np.zeros(shape, dtype=np.int64)
+        self.hand = np.full(shape + (self.max_wastes_handed,), -1, dtype=np.int64)
+        self.hand_len = np.zeros(shape, dtype=np.int64)
+        self.n_carried = np.zeros(shape, dtype=np.int64)
+        self.go_back = np.zeros(shape, dtype=bool)
+        self.have_saved_last_pos = np.zeros(shape, dtype=bool)
+        self.last_x = np.zeros(shape, dtype=np.int64)
+        self.last_y = np.zeros(shape, dtype=np.int64)
+        self.step_count = np.zeros(shape, dtype=np.int64)
+
+        # Wastes: the initial ones, then room for the merged ones
+        capacity = max(1, 2 * n_wastes)
+        waste_shape = (n_worlds, capacity)
+        self.waste_state = np.full(waste_shape, UNUSED, dtype=np.int64)
+        self.waste_x = np.zeros(waste_shape, dtype=np.int64)
+        self.waste_y = np.zeros(waste_shape, dtype=np.int64)
+        self.waste_color = np.full(waste_shape, NO_COLOR, dtype=np.int64)
+        # The order of arrival on the cell, the first waste of a cell is the one seen and taken
+        self.waste_stamp = np.zeros(waste_shape, dtype=np.int64)
+        self.n_created = np.zeros(n_worlds, dtype=np.int64)
+        self.stamp = np.zeros(n_worlds, dtype=np.int64)
+        # Wastes on the ground or carried, by color value
+        self.remaining = np.zeros((n_worlds, len(AgentColor)), dtype=np.int64)
+        for k, world in enumerate(worlds):
+            for i, ((x, y), color) in enumerate(world.wastes):
+                self.waste_state[k, i] = ON_GROUND
+                self.waste_x[k, i] = x
+                self.waste_y[k, i] = y
+                self.waste_color[k, i] = color.value
+                self.waste_stamp[k, i] = i
+                self.remaining[k, color.value] += 1
+            self.n_created[k] = len(world.wastes)
+            self.stamp[k] = len(world.wastes)
+
+        self.steps = 0
+        self.completion_steps = np.zeros(n_worlds, dtype=np.int64)
+        self.active = np.ones(n_worlds, dtype=bool)
+
+    @property
+    def accessible_remaining_wastes(self) -> np.ndarray:
+        total = self.remaining.sum(axis=1)
+        return total - unaccessible_wastes(
+            self.remaining[:, GREEN], self.remaining[:, YELLOW]
+        )
+
+    def _first_waste_on_pos(self, k, x, y):
+        """
+        The index and color of the first waste on the ground at (x, y) of each world k,
+        -1 and NO_COLOR if there is none.
+        """
+        on_pos = (
+            (self.waste_state[k] == ON_GROUND)
+            & (self.waste_x[k] == x[:, None])
+            & (self.waste_y[k] == y[:, None])
+        )
+        stamps = np.where(on_pos, self.waste_stamp[k], np.iinfo(np.int64).max)
+        first = stamps.argmin(axis=1)
+        found = on_pos[np.arange(len(k)), first]
+        return (
+            np.where(found, first, -1),
+            np.where(found, self.waste_color[k, first], NO_COLOR),
+        )
+
+    def step(self):
+        """
+        One step of every world that is not finished.
+        """
+        worlds = np.flatnonzero(self.active)
+        if len(worlds) == 0:
+            return
+        orders = self.shuffler.shuffle(worlds)
+        # The robots in the order they act (row by row, the order is kept)
+        robot_orders = (orders[orders >= self.n_terrain] - self.n_terrain).reshape(
+            len(worlds), len(self.robot_colors)
+        )
+
+        for slot in range(robot_orders.shape[1]):
+            self._act(worlds, robot_orders[:, slot])
+
+        self.steps += 1
+        finished = worlds[self.accessible_remaining_wastes[worlds] == 0]
+        self.completion_steps[finished] = self.steps
+        self.active[finished] = False
+
+    def run(self, max_steps: int) -> np.ndarray:
+        """
+        Run until every world is finished or max_steps, and return the completion step of
+        each world (max_steps if it did not finish, as sweep.completion_step).
+        """
+        while self.steps < max_steps and self.active.any():
+            self.step()
+        return np.where(self.active, max_steps, self.completion_steps)
+
+    def _act(self, k: np.ndarray, r: np.ndarray):
+        """
+        The robot r of each world k deliberates and acts (CleaningAgent.step).
+        """
+        x, y = self.x[k, r], self.y[k, r]
+        color = self.robot_colors[r]
+        x_max = self.x_max[r]
+        hand_len = self.hand_len[k, r]
+        first_in_hand = np.where(
+            hand_len > 0, self.waste_color[k, self.hand[k, r, 0]], NO_COLOR
+        )
+        if self.max_wastes_handed > 1:
+            second_in_hand = np.where(
+                hand_len > 1, self.waste_color[k, self.hand[k, r, 1]], NO_COLOR
+            )
+        else:
+            second_in_hand = np.full(len(k), NO_COLOR)
+        _, waste_on_pos = self._first_waste_on_pos(k, x, y)
+
+        decision = _Decision(self, k, r, x, y, x_max, hand_len)
+        is_green, is_yellow, is_red = color == GREEN, color == YELLOW, color == RED
+        if is_green.any():
+            decision.green(is_green, first_in_hand, second_in_hand, waste_on_pos)
+        if is_yellow.any():
+            decision.yellow(is_yellow, first_in_hand, second_in_hand, waste_on_pos)
+        if is_red.any():
+            decision.red(is_red, waste_on_pos)
+        decision.apply()
+
+        self._do(k, r, decision.action, x, y, color, hand_len)
+
+        # The last position is reached
+        x, y = self.x[k, r], self.y[k, r]
+        reached = (x == self.last_x[k, r]) & (y == self.last_y[k, r])
+        self.go_back[k, r] &= ~reached
+        self.have_saved_last_pos[k, r] &= ~reached
+
+    def _do(self, k, r, action, x, y, color, hand_len):
+        """
+        The environment performs the actions (action.handle_action). A failed action
+        leaves the percept of the robot unchanged.
+        """
+        done = np.zeros(len(k), dtype=bool)
+
+        # Moves, allowed if the robot stays in its area
+        for move, (dx, dy) in MOVES.items():
+            moving = action == move
+            if not moving.any():
+                continue
+            new_x, new_y = x + dx, y + dy
+            allowed = (
+                moving
+                & (0 <= new_y)
+                & (new_y < self.height)
+                & (0 <= new_x)
+                & (new_x < self.x_max[r])
+            )
+            self.x[k[allowed], r[allowed]] = new_x[allowed]
+            self.y[k[allowed], r[allowed]] = new_y[allowed]
+            done |= allowed
+        done |= action == STAY
+
+        taking = action == TAKE
+        if taking.any():
+            waste, _ = self._first_waste_on_pos(k, x, y)
+            taking &= (waste >= 0) & (self.n_carried[k, r] < self.max_wastes_handed)
+            kt, rt, wt = k[taking], r[taking], waste[taking]
+            self.waste_state[kt, wt] = CARRIED
+            self.hand[kt, rt, hand_len[taking]] = wt
+            self.hand_len[kt, rt] += 1
+            self.n_carried[kt, rt] += 1
+            done |= taking
+
+        dropping = (action == DROP) & (hand_len > 0)
+        if dropping.any():
+            waste = self.hand[k, r, 0]
+            on_deposit = (x == self.width - 1) & (y == self.height - 1)
+            waste_color = self.waste_color[k, waste]
+            # Only a red waste can be dropped on the deposit, where it disappears
+            depositing = dropping & on_deposit & (waste_color == RED)
+            dropping &= ~on_deposit
+            kd, wd = k[depositing], waste[depositing]
+            self.waste_state[kd, wd] = DEPOSITED
+            np.subtract.at(self.remaining, (kd, waste_color[depositing]), 1)
+            kd, wd = k[dropping], waste[dropping]
+            self.waste_state[kd, wd] = ON_GROUND
+            self.waste_x[kd, wd] = x[dropping]
+            self.waste_y[kd, wd] = y[dropping]
+            self.waste_stamp[kd, wd] = self.stamp[kd]
+            self.stamp[kd] += 1
+            released = dropping | depositing
+            kr, rr = k[released], r[released]
+            self.hand[kr, rr, :-1] = self.hand[kr, rr, 1:]
+            self.hand[kr, rr, -1] = -1
+            self.hand_len[kr, rr] -= 1
+            self.n_carried[kr, rr] -= 1
+            done |= released
+
+        merging = (action == MERGE) & (hand_len >= 2)
+        if merging.any():
+            km, rm = k[merging], r[merging]
+            first, second = self.hand[km, rm, 0], self.hand[km, rm, 1]
+            first_color = self.waste_color[km, first]
+            valid = (first_color == self.waste_color[km, second]) & (first_color != RED)
+            km, rm = km[valid], rm[valid]
+            first, second, first_color = first[valid], second[valid], first_color[valid]
+            self.waste_state[km, first] = MERGED
+            self.waste_state[km, second] = MERGED
+            new_waste = self.n_created[km]
+            self.n_created[km] += 1
+            # Green -> yellow -> red are consecutive values of AgentColor
+            merged_color = first_color - 1
+            self.waste_state[km, new_waste] = CARRIED
+            self.waste_color[km, new_waste] = merged_color
+            np.subtract.at(self.remaining, (km, first_color), 2)
+            np.add.at(self.remaining, (km, merged_color), 1)
+            self.hand[km, rm] = -1
+            self.hand[km, rm, 0] = new_waste
+            self.hand_len[km, rm] = 1
+            self.n_carried[km, rm] -= 1
+            merged = np.zeros(len(k), dtype=bool)
+            merged[np.flatnonzero(merging)[valid]] = True
+            done |= merged
+
+        # The new percept has the position of the robot
+        self.percept_y[k[done], r[done]] = self.y[k[done], r[done]]
+
+
+class _Decision:
+    """
+    The deliberation of the robots acting in one slot of a step, on arrays
+    (the deliberate methods of agent_strat_3, one per color, applied on a mask).
+    The side effects on the knowledge are collected and applied at the end.
+    """
+
+    def __init__(self, ensemble: Ensemble, k, r, x, y, x_max, hand_len):
+        self.ensemble = ensemble
+        self.k, self.r = k, r
+        self.x, self.y = x, y
+        self.x_max = x_max
+        self.hand_len = hand_len
+        self.go_back = ensemble.go_back[k, r].copy()
+        self.last_x = ensemble.last_x[k, r]
+        self.last_y = ensemble.last_y[k, r]
+        self.step_count = ensemble.step_count[k, r].copy()
+        self.action = np.full(len(k), NO_ACTION)
+        self.save = np.zeros(len(k), dtype=bool)
+
+    def _set(self, mask, action):
+        self.action = np.where(mask, action, self.action)
+
+    def green(self, mask, first_in_hand, second_in_hand, waste_on_pos):
+        e = self.ensemble
+        x, y, x_max = self.x, self.y, self.x_max
+        deposit_row = e.deposit_row[self.k]
+        percept_y = e.percept_y[self.k, self.r]
+        default = default_move(
+            x, y, 0, x_max, e.height, self.go_back, self.last_x, self.last_y
+        )
+        self._set(mask, default)
+
+        is_on_green_deposit = mask & (percept_y == deposit_row) & (x == x_max - 1)
+        is_on_yellow_deposit = mask & (percept_y == deposit_row - 1) & (x == x_max - 1)
+        has_free_spot = self.hand_len < e.max_wastes_handed
+
+        take_pair = (self.hand_len == 1) & (waste_on_pos == GREEN)
+        self._set(is_on_green_deposit & take_pair, TAKE)
+        drop = is_on_green_deposit & ~take_pair & (first_in_hand == GREEN)
+        self._set(drop, DROP)
+        self.go_back |= drop
+        self._set(is_on_green_deposit & ~take_pair & (first_in_hand == YELLOW), DOWN)
+
+        drop = is_on_yellow_deposit & (first_in_hand == YELLOW)
+        self._set(drop, DROP)
+        self.go_back |= drop
+        self._set(is_on_yellow_deposit & (first_in_hand == GREEN), UP)
+
+        self._set(
+            mask & (waste_on_pos == GREEN) & has_free_spot & ~is_on_green_deposit,
+            TAKE,
+        )
+
+        carrying_green = mask & (first_in_hand == GREEN)
+        vertical_move = move_to_row(y, deposit_row)
+        to_row = carrying_green & (vertical_move != NO_ACTION)
+        self._set(to_row, vertical_move)
+        to_right = carrying_green & ~to_row & (x < x_max - 1)
+        self._set(to_right, RIGHT)
+        self.save |= to_row | to_right
+
+        self._set(
+            mask & (second_in_hand != NO_COLOR) & (first_in_hand == second_in_hand),
+            MERGE,
+        )
+
+    def yellow(self, mask, first_in_hand, second_in_hand, waste_on_pos):
+        e = self.ensemble
+        x, y, x_max = self.x, self.y, self.x_max
+        deposit_row = e.deposit_row[self.k]
+        x_green_zone = e.width // 3
+        default = default_move(
+            x, y, x_green_zone, x_max, e.height, self.go_back, self.last_x, self.last_y
+        )
+
+        is_on_green_deposit = (y == deposit_row) & (x == x_green_zone - 1)
+        is_on_yellow_deposit = (y == deposit_row) & (x == x_max - 1)
+        is_on_red_deposit = (y == deposit_row - 1) & (x == x_max - 1)
+        has_empty_hands = self.hand_len == 0
+        has_free_spot = self.hand_len < e.max_wastes_handed
+
+        self._set(mask & (x < x_green_zone), RIGHT)
+
+        checking = (
+            mask
+            & (self.step_count >= e.step_between_checking[self.k])
+            & has_empty_hands
+        )
+        going = checking & ~is_on_green_deposit
+        vertical_move = move_to_row(y, deposit_row)
+        to_left = going & (x >= x_green_zone)
+        self._set(to_left, LEFT)
+        to_row = going & ~to_left & (vertical_move != NO_ACTION)
+        self._set(to_row, vertical_move)
+        self.save |= to_left | to_row
+        arrived = checking & is_on_green_deposit
+        self.step_count = np.where(arrived, 0, self.step_count)
+        self.go_back |= arrived
+        self._set(arrived & (waste_on_pos == YELLOW), TAKE)
+
+        carrying = mask & (self.hand_len > 0) & ~is_on_yellow_deposit
+        to_right = carrying & (x < x_max - 1)
+        self._set(to_right, RIGHT)
+        to_row = carrying & (vertical_move != NO_ACTION)
+        self._set(to_row, vertical_move)
+        self.save |= to_right | to_row
+        self._set(
+            mask & has_empty_hands & (waste_on_pos == YELLOW) & ~is_on_yellow_deposit,
+            TAKE,
+        )
+
+        on_yellow_deposit = mask & is_on_yellow_deposit
+        take_pair = (
+            has_free_spot & (first_in_hand != NO_COLOR) & (waste_on_pos == YELLOW)
+        )
+        self._set(on_yellow_deposit & take_pair, TAKE)
+        drop = on_yellow_deposit & ~take_pair & (first_in_hand == YELLOW)
+        self._set(drop, DROP)
+        self.go_back |= drop
+        self._set(on_yellow_deposit & ~take_pair & (first_in_hand == RED), DOWN)
+
+        on_red_deposit = mask & is_on_red_deposit
+        drop = on_red_deposit & (first_in_hand == RED)
+        self._set(drop, DROP)
+        self.go_back |= drop
+        self._set(on_red_deposit & (first_in_hand == YELLOW), UP)
+
+        self._set(
+            mask & (second_in_hand != NO_COLOR) & (first_in_hand == second_in_hand),
+            MERGE,
+        )
+        self._default(mask, default)
+
+    def red(self, mask, waste_on_pos):
+        e = self.ensemble
+        x, y, x_max = self.x, self.y, self.x_max
+        deposit_row = e.deposit_row[self.k]
+        x_yellow_zone = 2 * e.width // 3
+        default = default_move(
+            x, y, x_yellow_zone, x_max, e.height, self.go_back, self.last_x, self.last_y
+        )
+
+        is_on_red_deposit = (y == e.height - 1) & (x == x_max - 1)
+        is_on_yellow_deposit = (y == deposit_row - 1) & (x == x_yellow_zone - 1)
+        has_empty_hands = self.hand_len == 0
+        has_free_spot = self.hand_len < e.max_wastes_handed
+
+        self._set(mask & (x < x_yellow_zone), RIGHT)
+
+        checking = (
+            mask
+            & (self.step_count >= e.step_between_checking[self.k])
+            & has_empty_hands
+        )
+        going = checking & ~is_on_yellow_deposit
+        to_left = going & (x >= x_yellow_zone)
+        self._set(to_left, LEFT)
+        vertical_move = move_to_row(y, deposit_row - 1)
+        to_row = going & (vertical_move != NO_ACTION)
+        self._set(to_row, vertical_move)
+        self.save |= to_left | to_row
+        arrived = checking & is_on_yellow_deposit
+        self.step_count = np.where(arrived, 0, self.step_count)
+        self.go_back |= arrived
+        self._set(arrived & (waste_on_pos == RED), TAKE)
+
+        carrying = mask & ~has_empty_hands & ~is_on_red_deposit
+        to_right = carrying & (x < x_max - 1)
+        self._set(to_right, RIGHT)
+        up = carrying & (y < e.height - 1)
+        self._set(up, UP)
+        self.save |= to_right | up
+        self._set(
+            mask
+            & has_empty_hands
+            & (waste_on_pos == RED)
+            & has_free_spot
+            & ~is_on_red_deposit,
+            TAKE,
+        )
+
+        on_red_deposit = mask & is_on_red_deposit
+        take = has_free_spot & (waste_on_pos == RED)
+        self._set(on_red_deposit & take, TAKE)
+        drop = on_red_deposit & ~take & ~has_empty_hands
+        self._set(drop, DROP)
+        self.go_back |= drop
+
+        self._default(mask, default)
+
+    def _default(self, mask, default):
+        """
+        No action decided: the default move, counted if the robot is not going back.
+        """
+        undecided = mask & (self.action == NO_ACTION)
+        self._set(undecided, default)
+        self.step_count = np.where(
+            undecided & ~self.go_back, self.step_count + 1, self.step_count
+        )
+
+    def apply(self):
+        e, k, r = self.ensemble, self.k, self.r
+        save = self.save & ~e.have_saved_last_pos[k, r]
+        e.last_x[k[save], r[save]] = self.x[save]
+        e.last_y[k[save], r[save]] = self.y[save]
+        e.have_saved_last_pos[k, r] |= self.save
+        e.go_back[k, r] = self.go_back
+        e.step_count[k, r] = self.step_count
+
+
+def run_ensemble(
+    params: Dict[str, Any],
+    seeds: Sequence[int],
+    max_steps: int = 1500,
+    configurations: Optional[Sequence[Dict[str, Any]]] = None,
+    worlds: Optional[Sequence[World]] = None,
+) -> List[int]:
+    """
+    The completion step of each seed, as sweep.completion_step of
+    sweep.run_single({**params, **configuration}, seed, max_steps, stop_when_finished=True).
+    With worlds (e.g. of scenario.load_scenario), each seed runs on its world.
+    """
+    ensemble = Ensemble(params, seeds, worlds=worlds, configurations=configurations)
+    return ensemble.run(max_steps).tolist()
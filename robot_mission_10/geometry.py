@@ -0,0 +1,169 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from types_1 import DEPOSIT_RADIOACTIVITY, AgentColor
+from world import ZONE_RADIOACTIVITY, TerrainField, terrain_columns
+
+# The zones from West to East.
+ZONE_ORDER = (AgentColor.GREEN, AgentColor.YELLOW, AgentColor.RED)
+
+# Two hand-off rows must leave a row between the merged-waste cell of one (the row below
+# it) and the other, so a robot always knows which hand-off it is on.
+MIN_HANDOFF_SPACING = 3
+
+
+class ZoneGeometry:
+    """
+    The zones of the grid and the cells where the wastes change hands.
+
+    - The zones are bands of columns, from West to East: green, yellow, then red. The
+        zone of each column is computed once (column_zone).
+    - The deposits are the cells of the red zone where the red wastes are disposed of.
+    - The hand-off rows are the rows of the hand-off cells of strategy 3, on the last
+        column of the green and yellow zones: the wastes of the zone are dropped on the
+        hand-off row, the merged ones on the row below it, for the next zone to take.
+
+    Parameters:
+    - width (int), height (int): The size of the grid.
+    - zone_widths (Tuple[int, int]): The widths of the green and yellow zones, the red zone
+        takes the rest. If None, each zone is a third of the grid (width // 3 columns).
+    - deposits (Sequence[Tuple[int, int]]): The deposit cells, in the red zone.
+        If None, the top right cell.
+    - handoff_rows (Sequence[int]): The hand-off rows. If None, the top row.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        zone_widths: Optional[Tuple[int, int]] = None,
+        deposits: Optional[Sequence[Tuple[int, int]]] = None,
+        handoff_rows: Optional[Sequence[int]] = None,
+    ):
+        self.width = width
+        self.height = height
+        if zone_widths is None:
+            zone_widths = (width // 3, 2 * width // 3 - width // 3)
+        green_width, yellow_width = zone_widths
+        assert (
+            green_width >= 1
+            and yellow_width >= 1
+            and green_width + yellow_width < width
+        ), f"Invalid zone widths {zone_widths} for a grid of width {width}."
+        self.bounds: Dict[AgentColor, Tuple[int, int]] = {
+            AgentColor.GREEN: (0, green_width),
+            AgentColor.YELLOW: (green_width, green_width + yellow_width),
+            AgentColor.RED: (green_width + yellow_width, width),
+        }
+        self.column_zone: List[AgentColor] = [
+            color
+            for color in ZONE_ORDER
+            for _ in range(self.bounds[color][0], self.bounds[color][1])
+        ]
+
+        if deposits is None:
+            deposits = [(width - 1, height - 1)]
+        self.deposits: List[Tuple[int, int]] = [tuple(cell) for cell in deposits]
+        assert self.deposits, "There must be at least one deposit."
+        for x, y in self.deposits:
+            assert (
+                0 <= y < height and self.zone_of((x, y)) == AgentColor.RED
+            ), f"The deposit {(x, y)} is not in the red zone."
+        self.deposit_set = frozenset(self.deposits)
+
+        if handoff_rows is None:
+            handoff_rows = [height - 1]
+        self.handoff_rows: List[int] = sorted(handoff_rows)
+        assert self.handoff_rows, "There must be at least one hand-off row."
+        for row, next_row in zip(self.handoff_rows, self.handoff_rows[1:]):
+            assert (
+                next_row - row >= MIN_HANDOFF_SPACING
+            ), f"The hand-off rows must be at least {MIN_HANDOFF_SPACING} rows apart."
+        assert all(
+            1 <= row < height for row in self.handoff_rows
+        ), "The hand-off rows must leave a row below them for the merged wastes."
+
+    def zone_of(self, pos: Tuple[int, int]) -> Optional[AgentColor]:
+        """
+        The zone of the cell, None if it is out of the grid.
+        """
+        x = pos[0]
+        if 0 <= x < self.width:
+            return self.column_zone[x]
+        return None
+
+    def x_max(self, color: AgentColor) -> int:
+        """
+        The first column East of the zone, the robots of the color stay West of it.
+        """
+        return self.bounds[color][1]
+
+    def is_deposit(self, pos: Tuple[int, int]) -> bool:
+        return pos in self.deposit_set
+
+    def check_world(self, world):
+        """
+        Raise a ValueError if the world was not drawn with these zones and deposits: a
+        robot or a waste out of the zone of its color, or a terrain with other zones or
+        deposit cells.
+        """
+        if (world.width, world.height) != (self.width, self.height):
+            raise ValueError(
+                f"The world is {world.width}x{world.height}, not {self.width}x{self.height}."
+            )
+        for color, starts in world.robots.items():
+            for pos in starts:
+                if self.zone_of(pos) != color:
+                    raise ValueError(
+                        f"The {color.name.lower()} robot starting at {pos} is out of its zone {self.bounds[color]}."
+                    )
+        for pos, color in world.wastes:
+            if self.zone_of(pos) != color:
+                raise ValueError(
+                    f"The {color.name.lower()} waste at {pos} is out of its zone {self.bounds[color]}."
+                )
+
+        terrain = world.radioactivity
+        if isinstance(terrain, TerrainField):
+            if terrain.bounds != self.bounds or terrain.deposits != self.deposit_set:
+                raise ValueError(
+                    "The terrain of the world has other zones or deposits."
+                )
+            return
+        deposit_rows: Dict[int, List[int]] = {}
+        for x, y in self.deposits:
+            deposit_rows.setdefault(x, []).append(y)
+        for x, column in enumerate(terrain_columns(terrain)):
+            rows = deposit_rows.get(x, ())
+            if any(column[y] != DEPOSIT_RADIOACTIVITY for y in rows):
+                raise ValueError(f"A deposit of column {x} is not in the world.")
+            values = [value for y, value in enumerate(column) if y not in rows]
+            low, high = ZONE_RADIOACTIVITY[self.column_zone[x]]
+            if values and not low <= min(values) <= max(values) <= high:
+                raise ValueError(
+                    f"The radioactivity of column {x} is not the one of the {self.column_zone[x].name.lower()} zone."
+                )
+
+
+def nearest_row(y: int, rows: Sequence[int], offset: int = 0) -> int:
+    """
+    The row of `rows` whose cell `row + offset` is the closest to y (the first one if tied).
+    """
+    return min(rows, key=lambda row: abs(y - (row + offset)))
+
+
+def nearest_deposit(
+    pos: Tuple[int, int],
+    deposits: Sequence[Tuple[int, int]],
+    is_free=None,
+) -> Tuple[int, int]:
+    """
+    The deposit the closest to pos (Manhattan distance), among the free ones if any.
+
+    :param is_free: A function telling if a deposit can be used now (no other robot on
+        it); if None or if no deposit is free, all the deposits are considered.
+    """
+    candidates = deposits
+    if is_free is not None:
+        candidates = [cell for cell in deposits if is_free(cell)] or deposits
+    x, y = pos
+    return min(candidates, key=lambda cell: abs(cell[0] - x) + abs(cell[1] - y))
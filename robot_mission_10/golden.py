@@ -0,0 +1,224 @@
+import gzip
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from agent import CleaningAgent
+from model import NuclearWasteModel
+from results_store import params_key
+from types_1 import AgentColor
+from waste_store import WasteState
+
+GOLDEN_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+# The recorded cases: strategies 1 and 3 on a few sizes, with a few seeds each
+GOLDEN_CASES: List[Dict[str, Any]] = [
+    {
+        "strategy": strategy,
+        "width": width,
+        "height": height,
+        "n_green_agents": n_agents,
+        "n_yellow_agents": n_agents,
+        "n_red_agents": n_agents,
+        "n_wastes": n_wastes,
+    }
+    for strategy in (1, 3)
+    for width, height, n_agents, n_wastes in (
+        (12, 10, 1, 10),
+        (31, 17, 3, 25),
+        (60, 50, 5, 50),
+    )
+]
+GOLDEN_SEEDS = (0, 1)
+GOLDEN_STEPS = 300
+
+Snapshot = Dict[str, Dict[str, Any]]
+
+
+def snapshot(model) -> Snapshot:
+    """
+    The state of the model after a step, as plain JSON values (string keys, lists),
+    so a snapshot read back from a golden file compares equal to a fresh one:
+    - robots: the position of each robot, by robot id.
+    - carried: the ids of the wastes carried by each robot, by robot id.
+    - wastes: the position and color of each waste on the ground, by waste id.
+    - counters: the waste counters by color, the deposited wastes, the last object id
+        and the finished counter.
+    """
+    store = model.waste_store
+    robots = {}
+    carried = {}
+    for agent in model.schedule.agents:
+        if isinstance(agent, CleaningAgent):
+            robots[str(agent.unique_id)] = list(agent.pos)
+            carried[str(agent.unique_id)] = []
+    for waste_id, picked_waste in sorted(store.picked.items()):
+        carried[str(picked_waste.agentId)].append(waste_id)
+
+    wastes = {}
+    for waste_id, state in sorted(store.states.items()):
+        if state == WasteState.ON_GROUND:
+            waste = store.wastes[waste_id]
+            wastes[str(waste_id)] = [waste.pos[0], waste.pos[1], waste.color.name]
+
+    counters = {"deposited": model.wastes.deposited}
+    for color in AgentColor:
+        counters[f"{color.name.lower()}_on_ground"] = model.wastes.on_ground[color]
+        counters[f"{color.name.lower()}_carried"] = model.wastes.carried[color]
+    counters["obj_id"] = model.obj_id
+    counters["is_finished"] = model.is_finished
+    return {
+        "robots": robots,
+        "carried": carried,
+        "wastes": wastes,
+        "counters": counters,
+    }
+
+
+def record(model, steps: int) -> List[Snapshot]:
+    """
+    Step the model and return its snapshot after each step (the first one is the start).
+    """
+    trajectory = [snapshot(model)]
+    for _ in range(steps):
+        model.step()
+        trajectory.append(snapshot(model))
+    return trajectory
+
+
+def diff_snapshots(reference: Snapshot, candidate: Snapshot) -> Dict[str, Dict]:
+    """
+    The entries that differ between two snapshots, as {part: {key: (reference, candidate)}}.
+    A key missing on one side is shown as None.
+    """
+    diff = {}
+    for part in reference.keys() | candidate.keys():
+        expected = reference.get(part, {})
+        actual = candidate.get(part, {})
+        part_diff = {
+            key: (expected.get(key), actual.get(key))
+            for key in expected.keys() | actual.keys()
+            if expected.get(key) != actual.get(key)
+        }
+        if part_diff:
+            diff[part] = dict(sorted(part_diff.items()))
+    return diff
+
+
+def first_divergence(
+    reference: List[Snapshot], candidate: List[Snapshot]
+) -> Optional[Tuple[int, Dict[str, Dict]]]:
+    """
+    Return (step, diff) for the first step where the two trajectories differ, or None.
+    A trajectory shorter than the other diverges at its end.
+    """
+    for step, (expected, actual) in enumerate(zip(reference, candidate)):
+        diff = diff_snapshots(expected, actual)
+        if diff:
+            return step, diff
+    if len(reference) != len(candidate):
+        return min(len(reference), len(candidate)), {
+            "length": {"steps": (len(reference), len(candidate))}
+        }
+    return None
+
+
+ModelFactory = Callable[[Dict[str, Any], int], Any]
+
+
+def make_factory(candidate: Union[None, Dict[str, Any], ModelFactory]) -> ModelFactory:
+    """
+    Build the function creating a model from (params, seed):
+    - None: the reference NuclearWasteModel.
+    - a dict: NuclearWasteModel with these parameters replacing the ones of the case,
+        e.g. {"scheduler": "zones"}.
+    - a callable: used as is, it must return an object with step() that snapshot() can read.
+    """
+    if candidate is None:
+        return lambda params, seed: NuclearWasteModel(**params, seed=seed)
+    if isinstance(candidate, dict):
+        return lambda params, seed: NuclearWasteModel(
+            **{**params, **candidate}, seed=seed
+        )
+    return candidate
+
+
+def compare_runs(
+    params: Dict[str, Any],
+    seed: int,
+    steps: int,
+    candidate: Union[Dict[str, Any], ModelFactory],
+    reference: Union[None, Dict[str, Any], ModelFactory] = None,
+) -> Optional[Tuple[int, Dict[str, Dict]]]:
+    """
+    Run the reference and the candidate from the same seed, step by step, and return the
+    first divergence (see first_divergence), or None if the two runs are identical.
+    """
+    reference_model = make_factory(reference)(params, seed)
+    candidate_model = make_factory(candidate)(params, seed)
+    for step in range(steps + 1):
+        if step > 0:
+            reference_model.step()
+            candidate_model.step()
+        diff = diff_snapshots(snapshot(reference_model), snapshot(candidate_model))
+        if diff:
+            return step, diff
+    return None
+
+
+def golden_path(params: Dict[str, Any], seed: int, directory: str) -> str:
+    return os.path.join(directory, f"{params_key(params)},seed={seed}.json.gz")
+
+
+def record_golden(directory: str = GOLDEN_DIRECTORY, steps: int = GOLDEN_STEPS):
+    """
+    Record the trajectory of the reference model on every golden case.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for params in GOLDEN_CASES:
+        for seed in GOLDEN_SEEDS:
+            trajectory = record(NuclearWasteModel(**params, seed=seed), steps)
+            path = golden_path(params, seed, directory)
+            # mtime=0 so the same trajectory always gives the same file
+            with gzip.GzipFile(path, "wb", mtime=0) as file:
+                file.write(json.dumps(trajectory, separators=(",", ":")).encode())
+            print(f"Golden trajectory {params} (seed={seed}) saved at {path}")
+
+
+def load_golden(params: Dict[str, Any], seed: int, directory: str = GOLDEN_DIRECTORY):
+    with gzip.open(golden_path(params, seed, directory), "rb") as file:
+        return json.loads(file.read())
+
+
+def check_golden(
+    candidate: Union[None, Dict[str, Any], ModelFactory] = None,
+    directory: str = GOLDEN_DIRECTORY,
+) -> Dict[Tuple[str, int], Optional[Tuple[int, Dict[str, Dict]]]]:
+    """
+    Replay every golden case with the candidate (the current NuclearWasteModel by
+    default) and return the first divergence of each case, None when it is identical.
+    """
+    factory = make_factory(candidate)
+    report = {}
+    for params in GOLDEN_CASES:
+        for seed in GOLDEN_SEEDS:
+            golden = load_golden(params, seed, directory)
+            trajectory = record(factory(params, seed), len(golden) - 1)
+            report[(params_key(params), seed)] = first_divergence(golden, trajectory)
+    return report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "record":
+        record_golden()
+    else:
+        failures = 0
+        for (case, seed), divergence in check_golden().items():
+            if divergence is None:
+                print(f"OK {case} (seed={seed})")
+            else:
+                failures += 1
+                step, diff = divergence
+                print(f"DIVERGED {case} (seed={seed}) at step {step}: {diff}")
+        sys.exit(1 if failures else 0)
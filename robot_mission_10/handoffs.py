@@ -0,0 +1,111 @@
+from typing import Dict, List, Optional, Tuple
+
+from object import WasteAgent
+from types_1 import AgentColor
+
+Key = Tuple[Tuple[int, int], AgentColor]
+
+
+class HandoffBoard:
+    """
+    The wastes waiting on the hand-off cells, for the robots that subscribed to them.
+
+    A robot subscribes to a cell for the wastes of a color (a yellow robot to the yellow
+    wastes dropped by the green robots at the right of the green zone). The model tells
+    the board when a waste lands on the ground or is taken from it, so the subscribers
+    are notified of the wastes waiting on their cells without going to look. Each waste
+    is claimed by a single robot, the one sent to take it: a robot travels to a hand-off
+    cell only when there is a waste there that no other robot is fetching.
+
+    The board only counts the wastes of the subscribed cells and colors, the other waste
+    events are ignored.
+    """
+
+    def __init__(self):
+        # The subscribed (cell, color) of each robot, by unique_id
+        self.subscriptions: Dict[int, List[Key]] = {}
+        # The wastes on the ground and the robots sent to take them, by subscribed (cell, color)
+        self.waiting: Dict[Key, int] = {}
+        self.claimed: Dict[Key, int] = {}
+        # The (cell, color) claimed by each robot, by unique_id
+        self.claims: Dict[int, Key] = {}
+        self.notifications = 0
+        self.trips = 0
+
+    def subscribe(self, robot, pos: Tuple[int, int], color: AgentColor):
+        key = (pos, color)
+        self.subscriptions.setdefault(robot.unique_id, []).append(key)
+        self.waiting.setdefault(key, 0)
+        self.claimed.setdefault(key, 0)
+
+    def scan(self, cells: Dict[Tuple[int, int], List]):
+        """
+        Count the wastes already on the subscribed cells (the cells of the NeighborIndex).
+        """
+        for pos, color in self.waiting:
+            self.waiting[(pos, color)] = sum(
+                1
+                for obj in cells.get(pos, ())
+                if isinstance(obj, WasteAgent) and obj.indicate_color() == color
+            )
+
+    def land(self, pos: Tuple[int, int], color: AgentColor):
+        """
+        A waste of the color was dropped or has arrived on the cell.
+        """
+        key = (pos, color)
+        if key in self.waiting:
+            self.waiting[key] += 1
+            self.notifications += 1
+
+    def take(self, pos: Tuple[int, int], color: AgentColor):
+        """
+        A waste of the color was taken from the cell.
+        """
+        key = (pos, color)
+        if key in self.waiting:
+            self.waiting[key] -= 1
+
+    def _unclaimed(self, robot) -> Optional[Key]:
+        """
+        The nearest of the subscribed cells of the robot with a waste no robot is sent to.
+        """
+        x, y = robot.pos
+        best = None
+        for key in self.subscriptions.get(robot.unique_id, ()):
+            if self.waiting[key] > self.claimed[key]:
+                (cx, cy), _ = key
+                distance = abs(cx - x) + abs(cy - y)
+                if best is None or distance < best[0]:
+                    best = (distance, key)
+        return None if best is None else best[1]
+
+    def has_work(self, robot) -> bool:
+        """
+        Whether the robot is sent to a cell, or would be at its next claim.
+        """
+        return robot.unique_id in self.claims or self._unclaimed(robot) is not None
+
+    def claim(self, robot) -> Optional[Tuple[int, int]]:
+        """
+        The cell the robot is sent to: the one it already claimed, else the nearest of
+        its subscribed cells with a waste no robot is sent to (claimed for it), else None.
+        """
+        key = self.claims.get(robot.unique_id)
+        if key is not None:
+            return key[0]
+        key = self._unclaimed(robot)
+        if key is None:
+            return None
+        self.claimed[key] += 1
+        self.claims[robot.unique_id] = key
+        self.trips += 1
+        return key[0]
+
+    def release(self, robot):
+        """
+        The robot reached its cell, or gave up on it: its claim ends.
+        """
+        key = self.claims.pop(robot.unique_id, None)
+        if key is not None:
+            self.claimed[key] -= 1
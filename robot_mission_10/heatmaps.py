@@ -0,0 +1,105 @@
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+
+class CellTimer:
+    """
+    The time spent on each cell by a changing number of items (robots or wastes).
+
+    The total of a cell is only brought up to date when its count changes: the count
+    times the steps elapsed since the last change is added then. So an item standing
+    still costs nothing, and the totals are exact at any step (see totals).
+    """
+
+    def __init__(self, width: int, height: int):
+        # [x, y], like the radioactivity of the World
+        self.count = np.zeros((width, height), dtype=np.int64)
+        self.total = np.zeros((width, height), dtype=np.int64)
+        self.since = np.zeros((width, height), dtype=np.int64)
+
+    def change(self, pos: Tuple[int, int], delta: int, step: int):
+        self.total[pos] += self.count[pos] * (step - self.since[pos])
+        self.since[pos] = step
+        self.count[pos] += delta
+
+    def totals(self, step: int) -> np.ndarray:
+        """
+        The time spent on each cell up to the given step.
+        """
+        return self.total + self.count * (step - self.since)
+
+
+class HeatmapAccumulator:
+    """
+    Per-cell heatmaps of a run, updated by the model when a robot moves and when a
+    waste is taken or dropped:
+    - visits: the number of times a robot entered the cell.
+    - dwell: the robot-steps spent on the cell (a queue of robots on a deposit cell
+        shows up as a high dwell for few visits).
+    - waste_wait: the waste-steps spent on the cell before being taken.
+
+    Only the arrays of the grid size are kept, never the positions at each step.
+
+    Parameters:
+    - width (int), height (int): The size of the grid.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.visits = np.zeros((width, height), dtype=np.int64)
+        self.dwell = CellTimer(width, height)
+        self.waste_wait = CellTimer(width, height)
+
+    def place_robot(self, pos: Tuple[int, int], step: int):
+        self.dwell.change(pos, 1, step)
+
+    def move_robot(self, old_pos: Tuple[int, int], new_pos: Tuple[int, int], step: int):
+        self.dwell.change(old_pos, -1, step)
+        self.dwell.change(new_pos, 1, step)
+        self.visits[new_pos] += 1
+
+    def place_waste(self, pos: Tuple[int, int], step: int):
+        self.waste_wait.change(pos, 1, step)
+
+    def remove_waste(self, pos: Tuple[int, int], step: int):
+        self.waste_wait.change(pos, -1, step)
+
+    def arrays(self, step: int) -> Dict[str, np.ndarray]:
+        """
+        The heatmaps up to the given step, as [x, y] arrays.
+        """
+        return {
+            "visits": self.visits.copy(),
+            "dwell": self.dwell.totals(step),
+            "waste_wait": self.waste_wait.totals(step),
+        }
+
+
+def merge_heatmaps(heatmaps: Iterable[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Sum the heatmaps of several runs of the same grid size (e.g. the "heatmaps" table of
+    the runs of a sweep, see results_store.load_runs).
+    """
+    merged: Dict[str, np.ndarray] = {}
+    for arrays in heatmaps:
+        for name, values in arrays.items():
+            if name in merged:
+                if merged[name].shape != values.shape:
+                    raise ValueError(
+                        f"Cannot merge heatmaps of shapes {merged[name].shape} and {values.shape}."
+                    )
+                merged[name] = merged[name] + values
+            else:
+                merged[name] = np.array(values, dtype=np.int64)
+    return merged
+
+
+def top_cells(values: np.ndarray, n: int = 5):
+    """
+    The n cells with the highest values, as ((x, y), value), highest first.
+    """
+    order = np.argsort(values, axis=None)[::-1][:n]
+    return [
+        ((int(x), int(y)), int(values[x, y]))
+        for x, y in zip(*np.unravel_index(order, values.shape))
+    ]
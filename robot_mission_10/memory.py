@@ -0,0 +1,239 @@
+import enum
+import sys
+import types
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from mesa import Agent, Model
+
+from agent import CleaningAgent
+
+# The parts of the model measured by the memory report, in the order of the report.
+SUBSYSTEMS = ("grid", "schedule", "collector", "knowledge", "registries")
+
+# Shared by every model, never counted.
+_NOT_COUNTED = (
+    bool,
+    enum.Enum,
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.MethodType,
+)
+
+
+def deep_size(roots: Iterable, seen: Optional[set] = None) -> Tuple[int, int]:
+    """
+    Return (bytes, objects) of the roots and everything they contain.
+
+    The agents and the model are counted when they are a root, but not followed when
+    they are reached from another object, so the grid does not count the agents on its
+    cells, nor a robot the model it points to. An object already in `seen` is not
+    counted again, so a tuple shared by several robots is counted once.
+    The sizes are the ones of sys.getsizeof: the memory allocated by the objects
+    themselves, without the allocator overhead.
+    """
+    seen = set() if seen is None else seen
+    getsizeof = sys.getsizeof
+    size = count = 0
+    stack = []
+    for root in roots:
+        if isinstance(root, (Agent, Model)):
+            # An agent root is counted here and its attributes walked below
+            if id(root) not in seen:
+                seen.add(id(root))
+                size += getsizeof(root)
+                count += 1
+                stack.append(root.__dict__)
+        else:
+            stack.append(root)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or obj is None or isinstance(obj, _NOT_COUNTED):
+            continue
+        seen.add(id(obj))
+        size += getsizeof(obj)
+        count += 1
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, (Agent, Model)):
+            continue
+        elif hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+    return size, count
+
+
+def subsystem_roots(model) -> Dict[str, Callable[[], List]]:
+    """
+    The objects of each subsystem, built on demand:
+    - grid: the cells of the grid (not the agents on them) and its set of empty cells, or
+        the occupied cells and the terrain field of a sparse model.
+    - schedule: the scheduler and its agents, without the knowledge of the robots.
+    - collector: the tables of the data collector (the agent records are measured apart,
+        see memory_report).
+    - knowledge: the knowledge of the robots (their past percepts and actions).
+    - registries: the wastes (in the waste store, not in the schedule), the waste
+        accounting, the occupancy and the neighbor index.
+    """
+    return {
+        "grid": lambda: [
+            getattr(model.grid, "_grid", None),
+            getattr(model.grid, "_empties", None),
+            getattr(model.grid, "cells", None),
+            model.terrain,
+        ],
+        "schedule": lambda: [model.schedule] + list(model.schedule.agents),
+        "collector": lambda: [
+            model.datacollector.model_vars,
+            model.datacollector.tables,
+        ],
+        "knowledge": lambda: [
+            agent.knowledge
+            for agent in model.schedule.agents
+            if isinstance(agent, CleaningAgent)
+        ],
+        "registries": lambda: [
+            model.waste_store,
+            *model.waste_store.wastes.values(),
+            model.wastes,
+            model.occupancy,
+            model.neighbors,
+        ],
+    }
+
+
+# The knowledge is measured before the schedule, so it is not counted with the robots
+_MEASURE_ORDER = ("knowledge", "collector", "registries", "grid", "schedule")
+
+
+def memory_report(
+    model, record_sizes: Optional[Dict[int, Tuple[int, int]]] = None
+) -> Dict[str, Tuple[int, int]]:
+    """
+    The (bytes, objects) of each subsystem of the model (see subsystem_roots).
+    An object reached by several subsystems is counted once.
+
+    The agent records of the data collector are most of the objects of a long run, and
+    the records of a past step never change: their sizes are kept in record_sizes
+    (by step) between two reports, so each step is walked once. An object shared by
+    the records of steps walked in different reports (the position of a robot that
+    did not move) is then counted once per report, a few bytes per robot.
+
+    This walks every other object of the model: call it every few hundred steps, not at
+    each step.
+    """
+    seen = set()
+    roots = subsystem_roots(model)
+    report = {name: deep_size(roots[name](), seen) for name in _MEASURE_ORDER}
+
+    record_sizes = {} if record_sizes is None else record_sizes
+    records = model.datacollector._agent_records
+    size, count = deep_size([records], seen={id(value) for value in records.values()})
+    for step, step_records in records.items():
+        if step not in record_sizes:
+            record_sizes[step] = deep_size([step_records], seen)
+        size += record_sizes[step][0]
+        count += record_sizes[step][1]
+    collector_size, collector_count = report["collector"]
+    report["collector"] = (collector_size + size, collector_count + count)
+    return {name: report[name] for name in SUBSYSTEMS}
+
+
+class MemoryMonitor:
+    """
+    Sample the memory report of a model every `every` steps.
+
+    It is called by the data collector of the model at each step (as the reporters of
+    the "memory_*" columns), but only walks the model every `every` steps: in between,
+    the reporters repeat the last sample, so the columns give the growth curve of each
+    subsystem at the resolution of the sampling.
+
+    Parameters:
+    - every (int): The number of steps between two samples.
+    - budgets (Dict[str, int]): The maximum number of bytes of some subsystems. A warning
+        is printed the first time a sample goes over one of them.
+    """
+
+    def __init__(self, every: int = 100, budgets: Optional[Dict[str, int]] = None):
+        self.every = every
+        self.budgets = budgets or {}
+        self.samples: List[Tuple[int, Dict[str, Tuple[int, int]]]] = []
+        self._over_budget = set()
+        self._record_sizes: Dict[int, Tuple[int, int]] = {}
+
+    def observe(self, model) -> Dict[str, Tuple[int, int]]:
+        """
+        Take a sample if it is due, and return the last sample.
+        """
+        step = model.schedule.steps
+        if not self.samples or (step != self.samples[-1][0] and step % self.every == 0):
+            self.samples.append((step, memory_report(model, self._record_sizes)))
+            self._check_budgets(step)
+        return self.samples[-1][1]
+
+    def _check_budgets(self, step: int):
+        report = self.samples[-1][1]
+        for name, budget in self.budgets.items():
+            if name in self._over_budget:
+                continue
+            if report[name][0] > budget:
+                self._over_budget.add(name)
+                print(
+                    f"Memory of {name} over budget at step {step}: {report[name][0]} > {budget} bytes"
+                )
+
+    def reporters(self) -> Dict[str, Callable]:
+        """
+        The model reporters of the data collector: the bytes of each subsystem, and the total.
+        """
+        reporters = {
+            f"memory_{name}": (lambda m, name=name: self.observe(m)[name][0])
+            for name in SUBSYSTEMS
+        }
+        reporters["memory_total"] = lambda m: sum(
+            size for size, _ in self.observe(m).values()
+        )
+        return reporters
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        For each subsystem: the bytes and objects at the first and last samples, the peak
+        bytes, and the growth in bytes per step between the first and last samples.
+        """
+        if not self.samples:
+            return {}
+        first_step, first = self.samples[0]
+        last_step, last = self.samples[-1]
+        steps = last_step - first_step
+        summary = {}
+        for name in SUBSYSTEMS:
+            summary[name] = {
+                "bytes_start": first[name][0],
+                "bytes_end": last[name][0],
+                "bytes_peak": max(report[name][0] for _, report in self.samples),
+                "objects_start": first[name][1],
+                "objects_end": last[name][1],
+                "bytes_per_step": (
+                    (last[name][0] - first[name][0]) / steps if steps > 0 else 0.0
+                ),
+            }
+        return summary
+
+
+def format_summary(summary: Dict[str, Dict[str, float]]) -> str:
+    """
+    The summary of a MemoryMonitor as a table, one line per subsystem.
+    """
+    lines = [
+        f"{'subsystem':<12}{'start (KB)':>12}{'end (KB)':>12}{'peak (KB)':>12}"
+        f"{'objects':>10}{'B/step':>10}"
+    ]
+    for name, values in summary.items():
+        lines.append(
+            f"{name:<12}{values['bytes_start'] / 1024:>12.1f}"
+            f"{values['bytes_end'] / 1024:>12.1f}{values['bytes_peak'] / 1024:>12.1f}"
+            f"{values['objects_end']:>10}{values['bytes_per_step']:>10.1f}"
+        )
+    return "\n".join(lines)
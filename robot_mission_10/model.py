@@ -10,14 +10,22 @@ from types_1 import (
     AgentColor,
     PickedWastes,
     DEPOSIT_RADIOACTIVITY,
-    Neighboring,
-    NeighboringType,
 )
 from agent import CleaningAgent
 from typing import List
-from utils import init_agents, find_picked_waste_by_id
+from utils import init_agents, spawn_waste
+from strategies import get_strategy
+from waste_accounting import WasteAccounting
+from waste_store import WasteStore
+from occupancy import Occupancy, SparseOccupancy
+from neighbors import NeighborhoodMask, NeighborIndex
+from zone_scheduler import ZonePartitionedActivation
+from world import TerrainField
+from geometry import ZoneGeometry
 
-import pandas as pd
+# The optional parts of the model (memory, utilization, heatmaps, arrivals, sparse grid,
+# stagnation, hand-offs, scenarios) are imported where they are enabled, so a headless
+# worker only loads the ones its runs use.
 
 
 def objects_to_strings(objects):
@@ -36,6 +44,52 @@ class NuclearWasteModel(Model):
     - width (int): The width of the grid representing the environment.
     - height (int): The height of the grid representing the environment.
     - max_wastes_handed (int): The maximum number of wastes that an agent can carry at a time.
+    - upper_agent_proportion (float): Strategy 1, the proportion of red agents that are upper line agents.
+    - strategy (int): The strategy of the cleaning agents, registered in strategies.py.
+    - step_between_checking (int): Strategy 3, the number of patrol steps between two visits of
+        the yellow and red agents to the deposit of the previous zone. If None, height * (width // 3) // 3.
+    - deposit_row (int): Strategy 3, the row of the deposit cells at the right of each zone
+        (the merged wastes are dropped one row below). If None, the top row.
+    - zone_widths (Tuple[int, int]): The widths of the green and yellow zones, the red zone takes the
+        rest. If None, each zone is a third of the grid.
+    - deposits (List[Tuple[int, int]]): The deposit cells of the red wastes, in the red zone. If None,
+        the top right cell. With strategy 3, each red robot goes to the nearest deposit with no robot on it.
+    - handoff_rows (List[int]): Strategy 3, the rows of the deposit cells at the right of the green and
+        yellow zones, at least 3 rows apart; each robot uses the nearest one. Replaces deposit_row.
+    - seed (int): The seed of the random generator of the model (used by mesa), to reproduce a run.
+    - world (World): The initial layout to start from. If None, a random one is drawn from the seed.
+    - scheduler (str): "random" to step all the agents in a random order at each step (RandomActivation),
+        "zones" to step the robots zone by zone (ZonePartitionedActivation, for very large worlds).
+        The two do not give the same runs for a given seed.
+    - memory_every (int): If set, the memory of the grid, schedule, data collector, robots' knowledge
+        and registries is measured every memory_every steps, and reported in the "memory_*" columns
+        (see memory.MemoryMonitor). If None, the memory is not measured.
+    - memory_budgets (Dict[str, int]): The maximum number of bytes of some of these subsystems,
+        a warning is printed when a sample goes over one of them.
+    - heatmaps (bool): If True, the visits, the robot-steps and the waste-steps of each cell are
+        accumulated in model.heatmaps (see heatmaps.HeatmapAccumulator).
+    - arrival_rates (Dict[AgentColor, float]): If set, new wastes of each color arrive in the zone of
+        their color during the run, at these mean rates (wastes per step), and the steady-state metrics
+        are measured in model.throughput (see arrivals.ThroughputMonitor). If None, all the wastes are
+        there from the start.
+    - arrival_process (str): "poisson" or "periodic" arrivals (see arrivals.ArrivalProcess).
+    - sparse (bool): If True, only the robots and the wastes are stored, by position (SparseGrid,
+        SparseOccupancy), and the radioactivity of a cell is computed when read (world.TerrainField),
+        so the memory and the build time grow with the number of entities, not the area, for huge
+        and mostly empty maps. A sparse world is not drawn like a dense one of the same seed.
+    - stagnation_window (int): If set, the runs without merge nor deposit during this number of steps
+        are detected, with the reason (livelock, idle robots or stall), in model.stagnation
+        (see stagnation.StagnationDetector). If None, they are not detected.
+    - stop_on_stagnation (bool): Stop the run (model.running = False) when a stagnation is detected.
+    - track_utilization (bool): Count the steps of each robot by state, its blocked moves and its
+        rejected actions in model.utilization (see utilization.UtilizationTracker). If False,
+        model.utilization is None.
+    - collect_agents (bool): Collect the type, color, position and wastes of every agent at each
+        step in the data collector. The headless runs (sweeps, comparisons) record the robots
+        themselves and do not collect them.
+    - handoff_notifications (bool): Strategy 3, the yellow and red agents are notified of the wastes
+        dropped on the deposit cells of the previous zone (see handoffs.HandoffBoard), and only go
+        there to take one, instead of checking them every step_between_checking steps.
     """
 
     def __init__(
@@ -49,50 +103,140 @@ class NuclearWasteModel(Model):
         max_wastes_handed=2,
         upper_agent_proportion=0.5,
         strategy=1,
+        step_between_checking=None,
+        deposit_row=None,
+        zone_widths=None,
+        deposits=None,
+        handoff_rows=None,
+        seed=None,
+        world=None,
+        scheduler="random",
+        memory_every=None,
+        memory_budgets=None,
+        heatmaps=False,
+        arrival_rates=None,
+        arrival_process="poisson",
+        sparse=False,
+        stagnation_window=None,
+        stop_on_stagnation=False,
+        handoff_notifications=False,
+        collect_agents=True,
+        track_utilization=False,
     ):
         super().__init__()
+        # Reject an unknown strategy before building anything
+        strategy_spec = get_strategy(strategy)
 
-        self.grid = MultiGrid(width, height, True)
+        self.sparse = sparse
+        if sparse:
+            from sparse_grid import SparseGrid
+
+            self.grid = SparseGrid(width, height, True)
+        else:
+            self.grid = MultiGrid(width, height, True)
+        # The radioactivity of a sparse world, set by init_agents
+        self.terrain = None
         self.num_agents = n_green_agents + n_yellow_agents + n_red_agents
         self.num_green_agents = n_green_agents
         self.num_yellow_agents = n_yellow_agents
         self.num_red_agents = n_red_agents
         self.num_wastes = n_wastes
-        self.waste_remaining = n_wastes
         self.running = True
         self.height = height
         self.obj_id = 0
         self.max_wastes_handed = max_wastes_handed
         self.upper_agent_proportion = upper_agent_proportion
         self.strategy = strategy
-        self.red_wastes_remaining = 0
-        self.yellow_wastes_remaining = 0
-        self.green_wastes_remaining = 0
-        self.accessible_remaining_wastes = n_wastes
+        self.step_between_checking = step_between_checking
+        self.deposit_row = deposit_row
+        self.wastes = WasteAccounting()
         self.is_finished = 0
+        # Set once the robots are added (the robots do not record their steps before)
+        self.utilization = None
+        # The robots subscribe to the hand-off cells when they are added
+        self.handoffs = None
+        if handoff_notifications:
+            from handoffs import HandoffBoard
+
+            self.handoffs = HandoffBoard()
 
         assert self.grid is not None, "Grid is not initialized."
         assert self.num_agents > 0, "Invalid number of agents."
         assert self.num_wastes >= 0, "Invalid number of wastes."
-
+        assert world is None or (world.width, world.height) == (
+            width,
+            height,
+        ), "The world does not have the size of the grid."
+        assert (
+            deposit_row is None or 1 <= deposit_row < height
+        ), "The deposit row must leave a row below it for the merged wastes."
+        assert (
+            deposit_row is None or handoff_rows is None
+        ), "Set either deposit_row or handoff_rows."
+        assert world is None or isinstance(world.radioactivity, TerrainField) == bool(
+            sparse
+        ), "A sparse model needs a sparse world, and a dense model a dense one."
+        assert not (
+            sparse and heatmaps
+        ), "The heatmaps are arrays of the size of the grid, not for a sparse model."
+        assert scheduler in ("random", "zones"), f"Unknown scheduler {scheduler}."
+
+        # The zones, the deposits and the hand-off rows, used by the world and the strategies
+        self.geometry = ZoneGeometry(
+            width,
+            height,
+            zone_widths,
+            deposits,
+            [deposit_row] if deposit_row is not None else handoff_rows,
+        )
+        default_geometry = ZoneGeometry(width, height)
+        custom_geometry = [
+            name
+            for name, custom in (
+                ("zone_widths", self.geometry.bounds != default_geometry.bounds),
+                ("deposits", self.geometry.deposits != default_geometry.deposits),
+            )
+            if custom and name not in strategy_spec.parameters
+        ]
+        if custom_geometry:
+            raise ValueError(
+                f"Strategy {strategy} only runs on the default zones and deposits, not with {custom_geometry}."
+            )
+        if world is not None:
+            self.geometry.check_world(world)
         self.max_wastes_handed = max_wastes_handed
-        self.picked_wastes_list: List[PickedWastes] = []
-        self.schedule = RandomActivation(self)
+        self.waste_store = WasteStore()
+        self.occupancy = (
+            SparseOccupancy(width, height) if sparse else Occupancy(width, height)
+        )
+        if scheduler == "zones":
+            self.schedule = ZonePartitionedActivation(self)
+        else:
+            self.schedule = RandomActivation(self)
+        self.memory = None
+        if memory_every is not None:
+            from memory import MemoryMonitor
+
+            self.memory = MemoryMonitor(memory_every, memory_budgets)
 
         # Create the data collector
         self.datacollector = DataCollector(
-            agent_reporters={
-                "Type": lambda a: type(a).__name__,
-                "Color": "color",
-                "Pos": "pos",
-                "PickedWastes": (
-                    lambda a: (
-                        objects_to_strings(a.percept_temp["wastes"])
-                        if hasattr(a, "percept_temp")
-                        else []
-                    )
-                ),
-            },
+            agent_reporters=(
+                {
+                    "Type": lambda a: type(a).__name__,
+                    "Color": "color",
+                    "Pos": "pos",
+                    "PickedWastes": (
+                        lambda a: (
+                            objects_to_strings(a.percept_temp.wastes)
+                            if hasattr(a, "percept_temp")
+                            else []
+                        )
+                    ),
+                }
+                if collect_agents
+                else {}
+            ),
             model_reporters={
                 "strategy": "strategy",
                 # "picked_wastes": (lambda m: objects_to_strings(m.picked_wastes_list)),
@@ -101,21 +245,135 @@ class NuclearWasteModel(Model):
                 "yellow_wastes_remaining": "yellow_wastes_remaining",
                 "green_wastes_remaining": "green_wastes_remaining",
                 "accessible_remaining_wastes": "accessible_remaining_wastes",
+                "green_wastes_on_ground": (
+                    lambda m: m.wastes.on_ground[AgentColor.GREEN]
+                ),
+                "yellow_wastes_on_ground": (
+                    lambda m: m.wastes.on_ground[AgentColor.YELLOW]
+                ),
+                "red_wastes_on_ground": (lambda m: m.wastes.on_ground[AgentColor.RED]),
+                "green_wastes_carried": (lambda m: m.wastes.carried[AgentColor.GREEN]),
+                "yellow_wastes_carried": (
+                    lambda m: m.wastes.carried[AgentColor.YELLOW]
+                ),
+                "red_wastes_carried": (lambda m: m.wastes.carried[AgentColor.RED]),
+                "deposited_wastes": (lambda m: m.wastes.deposited),
                 "is_finished": "is_finished",
+                **(self.memory.reporters() if self.memory is not None else {}),
             },
         )
 
         init_agents(
-            self, n_green_agents, n_yellow_agents, n_red_agents, n_wastes, strategy
+            self,
+            n_green_agents,
+            n_yellow_agents,
+            n_red_agents,
+            n_wastes,
+            strategy,
+            world,
         )
+        # The strategies place their robots on the grid, count them once they are all placed
+        robots = [
+            agent for agent in self.schedule.agents if isinstance(agent, CleaningAgent)
+        ]
+        for agent in robots:
+            self.occupancy.place(agent.pos, agent.color)
+        # The steps of each robot by state, its blocked moves and its rejected actions
+        if track_utilization:
+            from utilization import UtilizationTracker
+
+            self.utilization = UtilizationTracker(robots)
+        self.stagnation = None
+        if stagnation_window is not None:
+            from stagnation import StagnationDetector
+
+            self.stagnation = StagnationDetector(robots, stagnation_window)
+        self.stop_on_stagnation = stop_on_stagnation
+        self.neighbors = self.build_neighbor_index()
+        if self.handoffs is not None:
+            self.handoffs.scan(self.neighbors.cells)
+        self.heatmaps = None
+        if heatmaps:
+            from heatmaps import HeatmapAccumulator
+
+            self.heatmaps = HeatmapAccumulator(width, height)
+            for agent in robots:
+                self.heatmaps.place_robot(agent.pos, 0)
+            for pos, objects in self.neighbors.cells.items():
+                for obj in objects:
+                    if isinstance(obj, WasteAgent):
+                        self.heatmaps.place_waste(pos, 0)
+        self.arrivals = None
+        self.throughput = None
+        if arrival_rates is not None:
+            from arrivals import ArrivalProcess, ThroughputMonitor
+
+            # Drawn once the world is built, so the world does not depend on the arrivals
+            self.arrivals = ArrivalProcess(
+                width,
+                height,
+                arrival_rates,
+                arrival_process,
+                seed=self.random.getrandbits(64),
+                bounds=self.geometry.bounds,
+            )
+            self.throughput = ThroughputMonitor()
+            for waste_id, waste in self.waste_store.wastes.items():
+                self.throughput.arrive(waste_id, waste.color, 0)
+
+    @classmethod
+    def from_scenario(cls, path: str, **params):
+        """
+        Build the model on the world of a scenario (see scenario.py), with its size, fleet,
+        wastes, zones and deposits. The other parameters (strategy, seed...) are given.
+        """
+        from scenario import load_scenario, scenario_params
+
+        return cls(**{**scenario_params(path), **params}, world=load_scenario(path))
 
     def step(self):
         self.datacollector.collect(self)
+        if self.arrivals is not None:
+            for pos, waste_color in self.arrivals.draw():
+                self.add_waste(pos, waste_color)
         self.schedule.step()
-        if self.accessible_remaining_wastes == 0:
+        if self.throughput is not None:
+            # New wastes keep arriving, the run never finishes
+            self.throughput.observe(self)
+        elif self.accessible_remaining_wastes == 0:
             self.is_finished += 1
             if self.is_finished == 1:
                 print("All accessible wastes are cleaned.")
+        if self.stagnation is not None:
+            stagnation = self.stagnation.observe(self)
+            if stagnation is not None:
+                print(f"No progress: {stagnation.describe()}.")
+                if self.stop_on_stagnation:
+                    self.running = False
+
+    @property
+    def picked_wastes_list(self) -> List[PickedWastes]:
+        return list(self.waste_store.picked.values())
+
+    @property
+    def waste_remaining(self) -> int:
+        return self.wastes.total_remaining
+
+    @property
+    def green_wastes_remaining(self) -> int:
+        return self.wastes.remaining(AgentColor.GREEN)
+
+    @property
+    def yellow_wastes_remaining(self) -> int:
+        return self.wastes.remaining(AgentColor.YELLOW)
+
+    @property
+    def red_wastes_remaining(self) -> int:
+        return self.wastes.remaining(AgentColor.RED)
+
+    @property
+    def accessible_remaining_wastes(self) -> int:
+        return self.wastes.accessible_remaining
 
     def do(self, agent, action):
         return handle_action(agent=agent, action=action, environment=self)
@@ -128,28 +386,61 @@ class NuclearWasteModel(Model):
         agent = [obj for obj in self.schedule.agents if obj.unique_id == agent_id]
         return agent[0].pos
 
+    def build_neighbor_index(self) -> NeighborIndex:
+        """
+        Index the robots, the wastes and the deposits, in the order of the cells of the grid.
+        """
+        neighbors = NeighborIndex(self.grid.width, self.grid.height, self.grid.torus)
+        for cell_content, pos in self.grid.coord_iter():
+            for obj in cell_content:
+                if isinstance(obj, RadioactivityAgent):
+                    if obj.indicate_radioactivity() == DEPOSIT_RADIOACTIVITY:
+                        neighbors.deposits.add(pos)
+                else:
+                    neighbors.place(obj, pos)
+        if self.terrain is not None:
+            neighbors.deposits.update(self.terrain.deposits)
+        return neighbors
+
+    def move_robot(self, agent: CleaningAgent, pos):
+        """
+        Move the robot on the grid and update the occupancy of the cells.
+        """
+        self.occupancy.move(agent.pos, pos, agent.color)
+        self.neighbors.move(agent, agent.pos, pos)
+        if self.heatmaps is not None:
+            self.heatmaps.move_robot(agent.pos, pos, self.schedule.steps)
+        self.grid.move_agent(agent, pos)
+
     def others_on_pos(self, agent: CleaningAgent):
         """
-        Check if there are other agents on the same position as the given agent.
-        In the cell, there are at least 2 agents (the agent and the grid agent).
+        Check if there are other robots on the same position as the given agent.
         """
-        return len(self.grid.get_cell_list_contents([agent.pos])) > 2
+        return self.occupancy.others_at(agent.pos)
+
+    def robots_around(self, pos, radius=1, color=None) -> int:
+        """
+        The number of robots in the square of the given radius around the position
+        (the position included), of the given color if any.
+        """
+        return self.occupancy.robots_around(pos, radius, color)
 
     def is_on_waste(self, pos):
         """
         If there is a waste at this pos, return the waste's color.
         Else return None.
         """
-        cell_content = self.grid.get_cell_list_contents([pos])
-        waste_agents = [obj for obj in cell_content if isinstance(obj, WasteAgent)]
-        if waste_agents != []:
-            return waste_agents[0].indicate_color()
+        waste = self.neighbors.waste_at(pos)
+        if waste is not None:
+            return waste.indicate_color()
         return None
 
     def get_radioactivity(self, pos):
         """
         Get the radioactivity at the given position.
         """
+        if self.terrain is not None:
+            return self.terrain.at(pos)
         cell_content = self.grid.get_cell_list_contents([pos])
         radioactivity = [
             obj for obj in cell_content if isinstance(obj, RadioactivityAgent)
@@ -158,12 +449,29 @@ class NuclearWasteModel(Model):
             return radioactivity[0].indicate_radioactivity()
         return 0
 
+    def add_waste(self, pos, waste_color) -> WasteAgent:
+        """
+        A new waste arrives on the ground at the given position.
+        """
+        waste = spawn_waste(self, pos, waste_color)
+        self.neighbors.place(waste, pos)
+        if self.heatmaps is not None:
+            self.heatmaps.place_waste(pos, self.schedule.steps)
+        if self.handoffs is not None:
+            self.handoffs.land(pos, waste_color)
+        if self.throughput is not None:
+            # Counted from 1: the waste arrives during the step schedule.steps + 1
+            self.throughput.arrive(
+                waste.unique_id, waste_color, self.schedule.steps + 1
+            )
+        return waste
+
     def get_who_picked_waste(self, waste_id: int) -> int:
         """
         Get the agent who picked the waste.
         Return -1 if the waste is not picked.
         """
-        picked_waste = find_picked_waste_by_id(waste_id, self.picked_wastes_list)
+        picked_waste = self.waste_store.carried(waste_id)
         if picked_waste is None:
             return -1
         return picked_waste.agentId
@@ -175,57 +483,44 @@ class NuclearWasteModel(Model):
         Give the waste to the agent.
         """
         # Check if the waste is already picked
-        picked_waste = find_picked_waste_by_id(waste_id, self.picked_wastes_list)
-        if picked_waste is not None:
+        if self.waste_store.carried(waste_id) is not None:
             raise Exception("Waste already picked.")
         # Check if the agent is already carrying two wastes
-        if (
-            len(
-                [
-                    waste
-                    for waste in self.picked_wastes_list
-                    if waste.agentId == agent_id
-                ]
-            )
-            >= self.max_wastes_handed
-        ):
+        if self.waste_store.n_carried[agent_id] >= self.max_wastes_handed:
             raise Exception(
                 f"Agent {agent_id} cannot carry more than {self.max_wastes_handed} wastes."
             )
 
-        # Add the waste to the picked wastes list of the environment
-        self.picked_wastes_list.append(
-            PickedWastes(agentId=agent_id, wasteId=waste_id, wasteColor=waste_color)
-        )
-        # Get all the agents on the position
-        waste = self.grid.get_cell_list_contents([pos])
-        if waste == []:
+        waste = self.waste_store.get(waste_id)
+        if waste is None or waste.pos != pos:
             raise Exception("Error while removing picked waste from the grid.")
-        # Filter to get the waste agent and remove it
-        waste = [obj for obj in waste if isinstance(obj, WasteAgent)]
-        waste = waste[0]
+        # Remove the waste from the grid, and add it to the picked wastes of the environment
         self.grid.remove_agent(waste)
-        self.schedule.remove(waste)
+        self.neighbors.remove(waste, pos)
+        self.waste_store.pick(waste_id, agent_id)
+        self.wastes.pick(waste_color)
+        if self.heatmaps is not None:
+            self.heatmaps.remove_waste(pos, self.schedule.steps)
+        if self.handoffs is not None:
+            self.handoffs.take(pos, waste_color)
 
     def drop_waste(self, waste_id: int, pos: tuple[int, int]):
         """
         Drop the waste from the agent.
         """
-        waste = find_picked_waste_by_id(waste_id, self.picked_wastes_list)
+        waste = self.waste_store.carried(waste_id)
         # If no waste, raise an exception
         if waste is None:
             raise Exception("No waste to drop.")
 
         # If a waste is dropped on the deposit zone,
-        if pos == (
-            self.grid.width - 1,
-            self.grid.height - 1,
-        ):
+        if self.geometry.is_deposit(pos):
             # If the waste is red, it disappears
             if waste.wasteColor == AgentColor.RED:
-                self.picked_wastes_list.remove(waste)
-                self.waste_remaining -= 1
-                self.accessible_remaining_wastes -= 1
+                self.waste_store.deposit(waste_id)
+                self.wastes.deposit(waste.wasteColor)
+                if self.throughput is not None:
+                    self.throughput.deposit(waste_id, self.schedule.steps + 1)
                 print(
                     f"Waste {waste_id} dropped on the deposit zone. Remaining wastes: {self.waste_remaining}"
                 )
@@ -234,12 +529,15 @@ class NuclearWasteModel(Model):
                 # If the waste is not red, it cannot be dropped on the deposit zone
                 raise Exception("Cannot drop untransformed waste on the deposit zone.")
 
-        # Add the waste to the grid
-        waste_agent = WasteAgent(waste.wasteId, waste.wasteColor, self)
+        # Put the same waste agent back on the grid
+        waste_agent = self.waste_store.drop(waste_id)
         self.grid.place_agent(waste_agent, pos)
-        self.schedule.add(waste_agent)
-        # Remove the waste of the picked wastes list of the environment
-        self.picked_wastes_list.remove(waste)
+        self.neighbors.place(waste_agent, pos)
+        self.wastes.drop(waste.wasteColor)
+        if self.heatmaps is not None:
+            self.heatmaps.place_waste(pos, self.schedule.steps)
+        if self.handoffs is not None:
+            self.handoffs.land(pos, waste.wasteColor)
 
     def merge_wastes(
         self, waste_id1: int, waste_id2: int, agent_id: int, pos: tuple[int, int]
@@ -250,8 +548,8 @@ class NuclearWasteModel(Model):
         2 green -> 1 yellow
         2 yellow -> 1 red
         """
-        waste1 = find_picked_waste_by_id(waste_id1, self.picked_wastes_list)
-        waste2 = find_picked_waste_by_id(waste_id2, self.picked_wastes_list)
+        waste1 = self.waste_store.carried(waste_id1)
+        waste2 = self.waste_store.carried(waste_id2)
         # Check if the two wastes are the same color, and the color is not red
         if (
             waste1.wasteColor != waste2.wasteColor
@@ -270,61 +568,31 @@ class NuclearWasteModel(Model):
                 "Cannot merge wastes of different colors or with red waste."
             )
 
-        # Remove the two wastes from the picked wastes list of the environment
-        self.picked_wastes_list.remove(waste1)
-        self.picked_wastes_list.remove(waste2)
-
         new_id = self.obj_id + 1
         self.obj_id = new_id
-        waste_merged = PickedWastes(
-            agentId=agent_id, wasteId=new_id, wasteColor=waste_color
-        )
-        self.picked_wastes_list.append(waste_merged)
-
-        self.waste_remaining -= 1
-        self.accessible_remaining_wastes -= 1
-
+        # The merged waste is created once, it will be placed on the grid when dropped
         new_waste = WasteAgent(new_id, waste_color, self)
-        # self.grid.place_agent(new_waste, self.get_agent_pos(agent_id))
+
+        # Replace the two wastes by the merged one in the picked wastes of the environment
+        self.waste_store.merge(waste_id1, waste_id2, new_waste, agent_id)
+        self.wastes.merge(waste1.wasteColor)
+        if self.throughput is not None:
+            self.throughput.merge(waste_id1, waste_id2, new_id)
         return new_waste
 
-    def indicate_surroundings(self, pos):
+    def indicate_surroundings(self, pos, radius=1):
         """
-        Indicate the surroundings of the agent at the given position.
+        Indicate the surroundings of the agent at the given position: the robots, wastes
+        and deposits in the square of the given radius around it.
 
         Note : this function gives the surroundings of the agent at the given position, at a givent time.
         But the agent can move, so the surroundings can change. And in one step, all agents move, but not at the same time.
         So all agents can have different surroundings at the same time.
         """
-        surrounding_agent = self.grid.get_neighbors(
-            pos, moore=True, include_center=False
-        )
-        surrounding_objects: List[Neighboring] = []
-
-        for agent in surrounding_agent:
-            if isinstance(agent, CleaningAgent):
-                surrounding_objects.append(
-                    Neighboring(
-                        type=NeighboringType.AGENT,
-                        agentColor=agent.indicate_color(),
-                        pos=agent.pos,
-                    )
-                )
-            elif isinstance(agent, WasteAgent):
-                surrounding_objects.append(
-                    Neighboring(
-                        type=NeighboringType.WASTE,
-                        agentColor=agent.indicate_color(),
-                        pos=agent.pos,
-                    )
-                )
-            elif isinstance(agent, RadioactivityAgent):
-                if agent.indicate_radioactivity() == DEPOSIT_RADIOACTIVITY:
-                    surrounding_objects.append(
-                        Neighboring(
-                            type=NeighboringType.DEPOSIT,
-                            agentColor=None,
-                            pos=agent.pos,
-                        )
-                    )
-        return surrounding_objects
+        return self.neighbors.surroundings(pos, radius)
+
+    def neighborhood_mask(self, pos) -> NeighborhoodMask:
+        """
+        The robots, wastes and deposits of the Moore neighborhood of pos, as bitmasks.
+        """
+        return self.neighbors.mask(pos)
@@ -0,0 +1,262 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from object import WasteAgent
+from types_1 import Neighboring, NeighboringType
+
+
+class NeighborhoodMask(NamedTuple):
+    """
+    The Moore neighborhood of a cell as bitmasks: the bit (dx + 1) * 3 + (dy + 1) is set
+    if the cell at (x + dx, y + dy) holds a robot, a waste or the deposit.
+    The bit 4 (the center) is never set.
+    """
+
+    robots: int
+    wastes: int
+    deposit: int
+
+
+def offset_bit(dx: int, dy: int) -> int:
+    return 1 << ((dx + 1) * 3 + (dy + 1))
+
+
+# The side of the squares of cells in which the occupied cells are bucketed.
+BUCKET_SIZE = 16
+
+
+class NeighborIndex:
+    """
+    The robots and the wastes on the ground, by cell, and the position of the deposits.
+
+    The terrain never changes, so it is not indexed: only the cells holding a robot or
+    a waste have an entry, and the deposits are a fixed set of positions. A neighborhood
+    query reads these entries instead of the content of the cells of the grid, which
+    holds a radioactivity agent on every cell.
+    The objects of a cell are kept in the order they arrived, like in the grid, so the
+    surroundings are listed in the same order as with grid.get_neighbors.
+
+    The occupied cells are also bucketed by squares of BUCKET_SIZE cells, so a query
+    whose square is much larger than the number of occupied cells only reads the
+    buckets it overlaps.
+
+    The surroundings are read at each query, but the entries of a cell in them are kept
+    until the cell changes (a robot moves in or out, a waste is taken or dropped): a
+    change forgets the entries of its own cell only, and the wastes and the robots that
+    wait are not classified again at each query.
+
+    Parameters:
+    - width (int), height (int): The size of the grid.
+    - torus (bool): Whether the neighborhoods wrap around the borders, like the grid.
+    - deposits (Iterable): The positions of the deposits.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        torus: bool,
+        deposits: Iterable[Tuple[int, int]] = (),
+    ):
+        self.width = width
+        self.height = height
+        self.torus = torus
+        self.deposits: Set[Tuple[int, int]] = set(deposits)
+        self.cells: Dict[Tuple[int, int], List] = {}
+        # The occupied cells, by bucket (x // BUCKET_SIZE, y // BUCKET_SIZE)
+        self._buckets: Dict[Tuple[int, int], Set[Tuple[int, int]]] = {}
+        # The entries of each occupied cell or deposit in the surroundings, until it changes
+        self._entries: Dict[Tuple[int, int], Tuple[Neighboring, ...]] = {}
+
+    def place(self, obj, pos: Tuple[int, int]):
+        cell = self.cells.get(pos)
+        if cell is None:
+            cell = self.cells[pos] = []
+            bucket = (pos[0] // BUCKET_SIZE, pos[1] // BUCKET_SIZE)
+            self._buckets.setdefault(bucket, set()).add(pos)
+        cell.append(obj)
+        self._entries.pop(pos, None)
+
+    def remove(self, obj, pos: Tuple[int, int]):
+        cell = self.cells[pos]
+        cell.remove(obj)
+        if not cell:
+            del self.cells[pos]
+            bucket = (pos[0] // BUCKET_SIZE, pos[1] // BUCKET_SIZE)
+            cells = self._buckets[bucket]
+            cells.discard(pos)
+            if not cells:
+                del self._buckets[bucket]
+        self._entries.pop(pos, None)
+
+    def move(self, obj, old_pos: Tuple[int, int], new_pos: Tuple[int, int]):
+        self.remove(obj, old_pos)
+        self.place(obj, new_pos)
+
+    def waste_at(self, pos: Tuple[int, int]) -> Optional[WasteAgent]:
+        """
+        The first waste on the cell, or None.
+        """
+        for obj in self.cells.get(pos, ()):
+            if isinstance(obj, WasteAgent):
+                return obj
+        return None
+
+    def _offsets(self, pos: Tuple[int, int], radius: int):
+        """
+        The (dx, dy, cell) of the neighborhood of pos, center excluded, in the order of
+        grid.get_neighborhood. A cell reached twice through the borders is listed once.
+        """
+        x, y = pos
+        seen = set()
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                new_x, new_y = x + dx, y + dy
+                if self.torus:
+                    new_x %= self.width
+                    new_y %= self.height
+                elif not (0 <= new_x < self.width and 0 <= new_y < self.height):
+                    continue
+                cell = (new_x, new_y)
+                if cell == pos or cell in seen:
+                    continue
+                seen.add(cell)
+                yield dx, dy, cell
+
+    def neighborhood(self, pos: Tuple[int, int], radius: int = 1) -> List:
+        """
+        The cells of the square of the given radius around pos, center excluded,
+        in the order of grid.get_neighborhood. Computed from the rows and columns of the
+        square, unless it wraps onto itself.
+        """
+        x, y = pos
+        if self.torus:
+            side = 2 * radius + 1
+            if side > self.width or side > self.height:
+                return [cell for _, _, cell in self._offsets(pos, radius)]
+            xs = [(x + dx) % self.width for dx in range(-radius, radius + 1)]
+            ys = [(y + dy) % self.height for dy in range(-radius, radius + 1)]
+        else:
+            xs = range(max(x - radius, 0), min(x + radius + 1, self.width))
+            ys = range(max(y - radius, 0), min(y + radius + 1, self.height))
+        return [(i, j) for i in xs for j in ys if i != x or j != y]
+
+    def _classify(self, cell: Tuple[int, int]) -> Tuple[Neighboring, ...]:
+        """
+        The entries of the cell in the surroundings: the deposit, then the objects in the
+        order they arrived. Kept until the cell changes.
+        """
+        entries = self._entries.get(cell)
+        if entries is not None:
+            return entries
+        entries = []
+        if cell in self.deposits:
+            entries.append(
+                Neighboring(pos=cell, type=NeighboringType.DEPOSIT, agentColor=None)
+            )
+        for obj in self.cells.get(cell, ()):
+            entries.append(
+                Neighboring(
+                    pos=cell,
+                    type=(
+                        NeighboringType.WASTE
+                        if isinstance(obj, WasteAgent)
+                        else NeighboringType.AGENT
+                    ),
+                    agentColor=obj.color,
+                )
+            )
+        entries = self._entries[cell] = tuple(entries)
+        return entries
+
+    def surroundings(
+        self, pos: Tuple[int, int], radius: int = 1
+    ) -> Tuple[Neighboring, ...]:
+        """
+        The robots, wastes and deposits in the square of the given radius around pos,
+        center excluded.
+        When the square has many more cells than there are occupied cells, the occupied
+        cells are read instead of the square, so a large sensing radius costs the number
+        of robots and wastes, not the area.
+        """
+        surrounding: List[Neighboring] = []
+        side = 2 * radius + 1
+        # Reading an occupied cell costs about 4 times a cell of the square
+        if side * side <= 4 * (len(self.cells) + len(self.deposits)):
+            cells = self.cells
+            deposits = self.deposits
+            for cell in self.neighborhood(pos, radius):
+                if cell in cells or cell in deposits:
+                    surrounding.extend(self._classify(cell))
+            return tuple(surrounding)
+
+        # Sparse case: keep the occupied cells in range, in the order of the square
+        xs = self._bucket_span(pos[0], radius, self.width)
+        ys = self._bucket_span(pos[1], radius, self.height)
+        if len(xs) * len(ys) <= len(self._buckets):
+            buckets = [self._buckets.get((bx, by), ()) for bx in xs for by in ys]
+        else:
+            buckets = self._buckets.values()
+        order = {}
+        for cells in (self.deposits, *buckets):
+            for cell in cells:
+                offset = self._offset_to(pos, cell, radius)
+                if offset is not None:
+                    order[cell] = offset
+        for cell in sorted(order, key=order.get):
+            surrounding.extend(self._classify(cell))
+        return tuple(surrounding)
+
+    def _bucket_span(self, center: int, radius: int, size: int) -> Set[int]:
+        """
+        The buckets, on an axis of the given size, of the coordinates within the radius
+        of center.
+        """
+        low, high = center - radius, center + radius
+        if not self.torus:
+            low, high = max(low, 0), min(high, size - 1)
+            return set(range(low // BUCKET_SIZE, high // BUCKET_SIZE + 1))
+        if high - low + 1 >= size:
+            return set(range((size - 1) // BUCKET_SIZE + 1))
+        low %= size
+        high %= size
+        if low <= high:
+            return set(range(low // BUCKET_SIZE, high // BUCKET_SIZE + 1))
+        return set(range(low // BUCKET_SIZE, (size - 1) // BUCKET_SIZE + 1)).union(
+            range(high // BUCKET_SIZE + 1)
+        )
+
+    def _offset_to(
+        self, pos: Tuple[int, int], cell: Tuple[int, int], radius: int
+    ) -> Optional[Tuple[int, int]]:
+        """
+        The (dx, dy) from pos to the cell if it is in the square of the given radius
+        (the first one in the order of the square when the grid wraps), else None.
+        """
+        if cell == pos:
+            return None
+        candidates = []
+        for axis, size in ((0, self.width), (1, self.height)):
+            delta = cell[axis] - pos[axis]
+            if self.torus:
+                # The first offset reaching the cell when the square wraps around
+                delta = (delta + radius) % size - radius
+            if not -radius <= delta <= radius:
+                return None
+            candidates.append(delta)
+        return candidates[0], candidates[1]
+
+    def mask(self, pos: Tuple[int, int]) -> NeighborhoodMask:
+        """
+        The Moore neighborhood of pos as bitmasks (see NeighborhoodMask).
+        """
+        robots = wastes = deposit = 0
+        for dx, dy, cell in self._offsets(pos, 1):
+            bit = offset_bit(dx, dy)
+            if cell in self.deposits:
+                deposit |= bit
+            for obj in self.cells.get(cell, ()):
+                if isinstance(obj, WasteAgent):
+                    wastes |= bit
+                else:
+                    robots |= bit
+        return NeighborhoodMask(robots=robots, wastes=wastes, deposit=deposit)
@@ -0,0 +1,143 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from types_1 import AgentColor
+
+
+class Occupancy:
+    """
+    The number of robots on each cell of the grid, in total and by color.
+
+    The counts are kept up to date by the model when a robot is placed or moves, so
+    "is someone else here" and "how crowded is this neighborhood" are answered without
+    reading the content of the cells of the grid.
+    The counts are int arrays indexed [x, y], like the radioactivity of the World: a
+    neighborhood is counted with one sum over a slice, whatever its radius.
+    The grid is used without wrapping: the robots never cross its borders.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.count = np.zeros((width, height), dtype=np.int32)
+        # count_by_color[color.value], one array per color
+        self.count_by_color = np.zeros((len(AgentColor), width, height), dtype=np.int32)
+
+    def place(self, pos: Tuple[int, int], color: AgentColor):
+        x, y = pos
+        self.count[x, y] += 1
+        self.count_by_color[color.value, x, y] += 1
+
+    def remove(self, pos: Tuple[int, int], color: AgentColor):
+        x, y = pos
+        self.count[x, y] -= 1
+        self.count_by_color[color.value, x, y] -= 1
+
+    def move(
+        self, old_pos: Tuple[int, int], new_pos: Tuple[int, int], color: AgentColor
+    ):
+        self.remove(old_pos, color)
+        self.place(new_pos, color)
+
+    def robots_at(
+        self, pos: Tuple[int, int], color: Optional[AgentColor] = None
+    ) -> int:
+        """
+        The number of robots on the cell, of the given color if any.
+        """
+        x, y = pos
+        if color is None:
+            return int(self.count[x, y])
+        return int(self.count_by_color[color.value, x, y])
+
+    def others_at(self, pos: Tuple[int, int]) -> bool:
+        """
+        Whether another robot than the one on the cell is there.
+        """
+        return self.robots_at(pos) > 1
+
+    def robots_around(
+        self,
+        pos: Tuple[int, int],
+        radius: int = 1,
+        color: Optional[AgentColor] = None,
+        include_center: bool = True,
+    ) -> int:
+        """
+        The number of robots in the square of the given radius around the cell
+        (the Moore neighborhood for radius 1), of the given color if any.
+        """
+        counts = self.count if color is None else self.count_by_color[color.value]
+        x, y = pos
+        total = int(
+            counts[
+                max(0, x - radius) : x + radius + 1, max(0, y - radius) : y + radius + 1
+            ].sum()
+        )
+        if not include_center:
+            total -= int(counts[x, y])
+        return total
+
+
+class SparseOccupancy(Occupancy):
+    """
+    The same counts as Occupancy, only for the cells with a robot on them, in dicts
+    keyed by position: the memory grows with the number of robots, not with the area.
+    A neighborhood reads the cells of its square, or the occupied cells if there are
+    fewer, so a large radius costs the number of robots, not the area.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.count: Dict[Tuple[int, int], int] = {}
+        self.count_by_color: Dict[AgentColor, Dict[Tuple[int, int], int]] = {
+            color: {} for color in AgentColor
+        }
+
+    @staticmethod
+    def _add(counts: Dict[Tuple[int, int], int], pos: Tuple[int, int], delta: int):
+        value = counts.get(pos, 0) + delta
+        if value:
+            counts[pos] = value
+        else:
+            del counts[pos]
+
+    def place(self, pos: Tuple[int, int], color: AgentColor):
+        self._add(self.count, pos, 1)
+        self._add(self.count_by_color[color], pos, 1)
+
+    def remove(self, pos: Tuple[int, int], color: AgentColor):
+        self._add(self.count, pos, -1)
+        self._add(self.count_by_color[color], pos, -1)
+
+    def robots_at(
+        self, pos: Tuple[int, int], color: Optional[AgentColor] = None
+    ) -> int:
+        counts = self.count if color is None else self.count_by_color[color]
+        return counts.get(pos, 0)
+
+    def robots_around(
+        self,
+        pos: Tuple[int, int],
+        radius: int = 1,
+        color: Optional[AgentColor] = None,
+        include_center: bool = True,
+    ) -> int:
+        counts = self.count if color is None else self.count_by_color[color]
+        x, y = pos
+        side = 2 * radius + 1
+        total = 0
+        if side * side <= len(counts):
+            for i in range(max(0, x - radius), min(self.width, x + radius + 1)):
+                for j in range(max(0, y - radius), min(self.height, y + radius + 1)):
+                    total += counts.get((i, j), 0)
+        else:
+            # Fewer occupied cells than cells in the square: read the occupied cells
+            for (i, j), value in counts.items():
+                if abs(i - x) <= radius and abs(j - y) <= radius:
+                    total += value
+        if not include_center:
+            total -= counts.get(pos, 0)
+        return total
@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from results_store import MISSING, RunRecorder
+
+
+def default_spool_dir() -> str:
+    """
+    The directory of the spooled runs: the shared memory of the machine if there is one
+    (/dev/shm, so the columns never reach the disk), else the temporary directory.
+    """
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+class SpooledRunRecorder(RunRecorder):
+    """
+    A RunRecorder writing the robots' state into memory-mapped columns, allocated once
+    for max_steps steps in the spool directory of the run, instead of Python lists.
+
+    The columns are .npy files, so another process maps them without copying nor
+    unpickling them (see open_spooled_run). A run stopped before max_steps only uses
+    the first n_rows rows of each column.
+
+    Parameters:
+    - model (NuclearWasteModel): The model observed.
+    - directory (str): The spool directory of the run.
+    - max_steps (int): The maximum number of steps observed.
+    """
+
+    def __init__(self, model, directory: str, max_steps: int):
+        super().__init__(model)
+        self.directory = directory
+        self.n_rows = 0
+        capacity = max_steps * len(self.robots)
+        self.columns = {
+            name: np.lib.format.open_memmap(
+                os.path.join(directory, f"agents.{name}.npy"),
+                mode="w+",
+                dtype=np.int32,
+                shape=(capacity,),
+            )
+            for name in self.columns
+        }
+        # The columns that never change during a run, written as a block at each step
+        self._agent_ids = np.array(
+            [robot.unique_id for robot in self.robots], dtype=np.int32
+        )
+        self._types = np.array(
+            [self._type_codes[type(robot).__name__] for robot in self.robots],
+            dtype=np.int32,
+        )
+        self._colors = np.array(
+            [robot.color.value for robot in self.robots], dtype=np.int32
+        )
+
+    def observe(self, model):
+        rows = slice(self.n_rows, self.n_rows + len(self.robots))
+        columns = self.columns
+        columns["Step"][rows] = model.schedule.steps
+        columns["AgentID"][rows] = self._agent_ids
+        columns["Type"][rows] = self._types
+        columns["Color"][rows] = self._colors
+        positions = [
+            robot.pos if robot.pos is not None else (MISSING, MISSING)
+            for robot in self.robots
+        ]
+        columns["pos_x"][rows] = [pos[0] for pos in positions]
+        columns["pos_y"][rows] = [pos[1] for pos in positions]
+        columns["n_carried"][rows] = [
+            len(robot.percept_temp.wastes) for robot in self.robots
+        ]
+        self.n_rows += len(self.robots)
+
+    def agent_table(self) -> Dict[str, np.ndarray]:
+        return {name: values[: self.n_rows] for name, values in self.columns.items()}
+
+    def flush(self):
+        for values in self.columns.values():
+            values.flush()
+
+
+class SpooledRun(NamedTuple):
+    """
+    The handle of a run spooled by a worker, all the parent receives from it: the
+    tables themselves stay in the files of the spool directory.
+    - n_agent_rows: the rows of the agents table actually written.
+    - memory_summary: the summary of the memory monitor of the model, if any.
+    """
+
+    params: dict
+    seed: int
+    directory: str
+    agent_types: List[str]
+    n_agent_rows: int
+    memory_summary: Optional[dict] = None
+
+
+def spool_tables(directory: str, tables: Dict[str, Dict[str, np.ndarray]]):
+    """
+    Write whole tables (the model table, the utilization...) in the spool directory.
+    """
+    for table, columns in tables.items():
+        for name, values in columns.items():
+            np.save(os.path.join(directory, f"{table}.{name}.npy"), values)
+
+
+def open_spooled_run(run: SpooledRun) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Map the tables of a spooled run, by table then column, read-only and without copy.
+    """
+    tables: Dict[str, Dict[str, np.ndarray]] = {}
+    for entry in sorted(os.listdir(run.directory)):
+        if not entry.endswith(".npy"):
+            continue
+        table, name = entry[: -len(".npy")].split(".", 1)
+        values = np.load(os.path.join(run.directory, entry), mmap_mode="r")
+        if table == "agents":
+            values = values[: run.n_agent_rows]
+        tables.setdefault(table, {})[name] = values
+    return tables
+
+
+def collect_spooled_run(run: SpooledRun, writer) -> str:
+    """
+    Write a spooled run to the results store, remove its spool directory, and return
+    the path of the run in the store.
+    """
+    try:
+        tables = open_spooled_run(run)
+        model_columns = tables.pop("model", {})
+        agent_columns = tables.pop("agents", {})
+        path = writer.write_run(
+            run.params,
+            run.seed,
+            model_columns,
+            agent_columns,
+            agent_types=run.agent_types,
+            tables=tables,
+        )
+        # Drop the maps before removing their files
+        del tables, model_columns, agent_columns
+    finally:
+        discard_spooled_run(run)
+    return path
+
+
+def discard_spooled_run(run: SpooledRun):
+    shutil.rmtree(run.directory, ignore_errors=True)
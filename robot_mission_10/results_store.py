@@ -0,0 +1,350 @@
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from agent import CleaningAgent
+from types_1 import AgentColor
+
+# Code used for a missing color or position in the typed columns.
+MISSING = -1
+
+
+def params_key(params: dict) -> str:
+    """
+    Build the partition name of a parameter point, e.g. "height=10,n_wastes=10,width=12".
+    The keys are sorted so the same parameters always land in the same partition.
+    """
+    params = encode_params(params)
+    return ",".join(f"{key}={params[key]}" for key in sorted(params))
+
+
+def encode_params(params: dict) -> dict:
+    """
+    The parameters as JSON values: the tuples are lists, and the dicts keyed by AgentColor
+    (e.g. arrival_rates) are keyed by the names of the colors. decode_params gives them
+    back, with tuples for the lists.
+    """
+    return {key: _encode_value(value) for key, value in params.items()}
+
+
+def decode_params(params: dict) -> dict:
+    return {key: _decode_value(value) for key, value in params.items()}
+
+
+def _encode_value(value):
+    if isinstance(value, dict):
+        return {
+            key.name if isinstance(key, AgentColor) else key: _encode_value(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(item) for item in value]
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if value and all(key in AgentColor.__members__ for key in value):
+            return {AgentColor[key]: _decode_value(item) for key, item in value.items()}
+        return {key: _decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return tuple(_decode_value(item) for item in value)
+    return value
+
+
+class RunRecorder:
+    """
+    Record the robots' state at each step of a run as typed columns.
+    Like the data collector of the model, observe is called before each step: the rows of
+    Step n are the state after n steps, from 0 to the number of steps minus one.
+
+    The robots are listed once at creation (they are never added nor removed during a run),
+    so observing a step does not scan the radioactivity and waste agents of the schedule.
+    """
+
+    def __init__(self, model):
+        self.robots = [
+            agent for agent in model.schedule.agents if isinstance(agent, CleaningAgent)
+        ]
+        self.types: List[str] = sorted({type(robot).__name__ for robot in self.robots})
+        self._type_codes = {name: code for code, name in enumerate(self.types)}
+        self.columns: Dict[str, list] = {
+            "Step": [],
+            "AgentID": [],
+            "Type": [],
+            "Color": [],
+            "pos_x": [],
+            "pos_y": [],
+            "n_carried": [],
+        }
+
+    def observe(self, model):
+        step = model.schedule.steps
+        columns = self.columns
+        for robot in self.robots:
+            columns["Step"].append(step)
+            columns["AgentID"].append(robot.unique_id)
+            columns["Type"].append(self._type_codes[type(robot).__name__])
+            columns["Color"].append(robot.color.value)
+            pos = robot.pos if robot.pos is not None else (MISSING, MISSING)
+            columns["pos_x"].append(pos[0])
+            columns["pos_y"].append(pos[1])
+            columns["n_carried"].append(len(robot.percept_temp.wastes))
+
+    def agent_table(self) -> Dict[str, np.ndarray]:
+        return {
+            name: np.asarray(values, dtype=np.int32)
+            for name, values in self.columns.items()
+        }
+
+
+def model_table(model) -> Dict[str, np.ndarray]:
+    """
+    Convert the model reporters of the data collector into typed columns, one row per step.
+    The data collector collects at the start of each step, so the row of Step n is the
+    state after n steps, as in the agent table of RunRecorder.
+    """
+    model_vars = model.datacollector.model_vars
+    n_rows = len(next(iter(model_vars.values()), []))
+    table = {"Step": np.arange(n_rows, dtype=np.int32)}
+    for name, values in model_vars.items():
+        table[name] = np.asarray(values)
+    return table
+
+
+def run_tables(model) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    The other tables of a finished run: the time each robot spent in each state
+    ("utilization") if the model tracked it, the heatmaps of the cells if the model accumulated them
+    ("heatmaps"), the stagnation of the run if it was watched ("stagnation"), and the
+    throughput of a run with waste arrivals ("throughput", "steady_state" and
+    "deposit_ages", see ThroughputMonitor.tables).
+    """
+    tables = {}
+    if model.utilization is not None:
+        tables["utilization"] = model.utilization.table()
+    if model.heatmaps is not None:
+        tables["heatmaps"] = model.heatmaps.arrays(model.schedule.steps)
+    if model.stagnation is not None:
+        tables["stagnation"] = model.stagnation.table()
+    if model.throughput is not None:
+        tables.update(model.throughput.tables())
+    return tables
+
+
+class ResultsWriter:
+    """
+    Write each run as its own partition, as soon as the run is finished.
+
+    Layout:
+        <root>/<params_key>/params.json     the typed parameters of the partition
+        <root>/<params_key>/seed=<seed>.npz one compressed file per run (compress=True)
+        <root>/<params_key>/seed=<seed>/    one .npy file per column (compress=False),
+                                            which can be memory-mapped by the loader
+    """
+
+    def __init__(self, root: str, compress: bool = True):
+        self.root = root
+        self.compress = compress
+        os.makedirs(root, exist_ok=True)
+
+    def write_run(
+        self,
+        params: dict,
+        seed,
+        model_columns: Dict[str, np.ndarray],
+        agent_columns: Dict[str, np.ndarray],
+        agent_types: Optional[List[str]] = None,
+        tables: Optional[Dict[str, Dict[str, np.ndarray]]] = None,
+    ) -> str:
+        """
+        Write one run and return the path of its partition.
+        `tables` are other tables of the run, by name (e.g. "utilization").
+        """
+        partition = os.path.join(self.root, params_key(params))
+        os.makedirs(partition, exist_ok=True)
+        _write_json(
+            os.path.join(partition, "params.json"),
+            {"params": encode_params(params), "agent_types": agent_types or []},
+        )
+
+        arrays = {f"model.{name}": values for name, values in model_columns.items()}
+        arrays.update(
+            {f"agents.{name}": values for name, values in agent_columns.items()}
+        )
+        for table, columns in (tables or {}).items():
+            arrays.update(
+                {f"{table}.{name}": values for name, values in columns.items()}
+            )
+
+        if self.compress:
+            path = os.path.join(partition, f"seed={seed}.npz")
+            tmp_path = path + ".tmp.npz"
+            np.savez_compressed(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+        else:
+            path = os.path.join(partition, f"seed={seed}")
+            os.makedirs(path, exist_ok=True)
+            for name, values in arrays.items():
+                np.save(os.path.join(path, name + ".npy"), values)
+        return path
+
+    def write_model(self, params: dict, seed, model, recorder: RunRecorder) -> str:
+        """
+        Write a finished model run, with the robots' states observed by the recorder,
+        and the other tables of the run (see run_tables).
+        """
+        return self.write_run(
+            params,
+            seed,
+            model_table(model),
+            recorder.agent_table(),
+            agent_types=recorder.types,
+            tables=run_tables(model),
+        )
+
+
+def _write_json(path: str, content: dict):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(content, f, default=str)
+    os.replace(tmp_path, path)
+
+
+class RunResult:
+    """
+    A stored run. Columns are read from disk only when accessed.
+    """
+
+    def __init__(self, params: dict, seed, path: str, agent_types: List[str]):
+        self.params = params
+        self.seed = seed
+        self.path = path
+        self.agent_types = agent_types
+
+    def column(self, table: str, name: str, mmap: bool = False) -> np.ndarray:
+        """
+        Read one column of a table ("model", "agents", or one of run_tables).
+        Memory-mapping is only possible for runs written without compression.
+        """
+        member = f"{table}.{name}"
+        if os.path.isdir(self.path):
+            return np.load(
+                os.path.join(self.path, member + ".npy"),
+                mmap_mode="r" if mmap else None,
+            )
+        with np.load(self.path) as npz:
+            return npz[member]
+
+    def column_names(self, table: str) -> List[str]:
+        if os.path.isdir(self.path):
+            members = sorted(name[: -len(".npy")] for name in os.listdir(self.path))
+        else:
+            with np.load(self.path) as npz:
+                members = list(npz.files)
+        prefix = table + "."
+        return [name[len(prefix) :] for name in members if name.startswith(prefix)]
+
+    def table(
+        self, table: str, columns: Optional[List[str]] = None, mmap: bool = False
+    ) -> Dict[str, np.ndarray]:
+        if columns is None:
+            columns = self.column_names(table)
+        if os.path.isdir(self.path):
+            return {name: self.column(table, name, mmap) for name in columns}
+        # Only the requested members of the archive are decompressed
+        with np.load(self.path) as npz:
+            return {name: npz[f"{table}.{name}"] for name in columns}
+
+
+class AnyOf:
+    """
+    A value of a load_runs filter matching any of the given values, e.g.
+    where={"strategy": AnyOf(1, 3)}. Any other value, a list or a tuple included, is
+    matched as a whole.
+    """
+
+    def __init__(self, *values):
+        self.values = values
+
+
+Predicate = Union[Dict[str, object], Callable[[dict], bool]]
+
+
+def _matches(stored: dict, where: Optional[Predicate]) -> bool:
+    """
+    Whether the parameters of a partition, as stored (see encode_params), match `where`.
+    The values of `where` are encoded the same way, so a tuple matches the stored list.
+    """
+    if where is None:
+        return True
+    if callable(where):
+        return where(decode_params(stored))
+    for key, expected in where.items():
+        value = stored.get(key)
+        if isinstance(expected, AnyOf):
+            if all(value != _encode_value(option) for option in expected.values):
+                return False
+        elif value != _encode_value(expected):
+            return False
+    return True
+
+
+def _seed_of(entry: str):
+    seed = entry[len("seed=") :]
+    if seed.endswith(".npz"):
+        seed = seed[: -len(".npz")]
+    return int(seed) if seed.lstrip("-").isdigit() else seed
+
+
+def load_runs(root: str, where: Optional[Predicate] = None) -> Iterator[RunResult]:
+    """
+    Iterate over the stored runs whose parameters match `where`.
+
+    :param root: The directory given to the ResultsWriter.
+    :param where: Either a dict of parameter values (AnyOf(...) matches any of its
+        values), or a function taking the parameters and returning a bool.
+        Partitions are filtered on their params.json, without opening the run files.
+    """
+    if not os.path.isdir(root):
+        return
+    for partition in sorted(os.listdir(root)):
+        meta_path = os.path.join(root, partition, "params.json")
+        if not os.path.isfile(meta_path):
+            continue
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if not _matches(meta["params"], where):
+            continue
+        params = decode_params(meta["params"])
+        for entry in sorted(os.listdir(os.path.join(root, partition))):
+            if not entry.startswith("seed=") or entry.endswith(".tmp.npz"):
+                continue
+            yield RunResult(
+                params=params,
+                seed=_seed_of(entry),
+                path=os.path.join(root, partition, entry),
+                agent_types=meta["agent_types"],
+            )
+
+
+def to_dataframe(runs, table: str = "model", columns: Optional[List[str]] = None):
+    """
+    Concatenate the given runs into one pandas DataFrame, with a RunId column,
+    the seed and the parameters of each run.
+    """
+    import pandas as pd
+
+    frames = []
+    for run_id, run in enumerate(runs):
+        frame = pd.DataFrame(run.table(table, columns))
+        frame.insert(0, "RunId", run_id)
+        frame["seed"] = run.seed
+        for key, value in run.params.items():
+            frame[key] = value
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
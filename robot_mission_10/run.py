@@ -1,8 +1,5 @@
-import mesa
-import pandas as pd
-import matplotlib.pyplot as plt
-
-from model import NuclearWasteModel
+from results_store import ResultsWriter, load_runs, to_dataframe
+from sweep import run_adaptive_sweep, run_sweep
 
 params = {  # These are the parameters that will be passed to the model
     "width": 60,
@@ -26,74 +23,95 @@ params = {  # These are the parameters that will be passed to the model
 #     "strategy": 3,
 # }
 
-results = mesa.batch_run(
-    NuclearWasteModel,
-    parameters=params,
-    iterations=10,
-    max_steps=1500,
-    number_processes=1,
-    data_collection_period=1,
-    display_progress=True,
-)
-results_df = pd.DataFrame(results)
-results_df = results_df[results_df["Type"] != "RadioactivityAgent"]
-results_df = results_df[results_df["Type"] != "WasteAgent"]
 
+def plot_results(df, params):
+    """
+    Plot the remaining accessible wastes of each run, and their average.
+    matplotlib is only imported here, so the simulation workers never load it.
+    """
+    import matplotlib.pyplot as plt
 
-save_path = "without-communication/results.csv"
-results_df.to_csv(save_path)
-print(f"Results saved at {save_path}")
+    grouped = df.groupby("Step")["accessible_remaining_wastes"].agg(["mean", "std"])
+    plt.figure(figsize=(10, 6))
 
+    for run_id in df["RunId"].unique():
+        subset = df[df["RunId"] == run_id]
+        plt.plot(
+            subset["Step"],
+            subset["accessible_remaining_wastes"],
+            # label=f"Run {run_id} Remaining Waste",
+        )
 
-df = results_df
-grouped = df.groupby("Step")["accessible_remaining_wastes"].agg(["mean", "std"])
-plt.figure(figsize=(10, 6))
+    nb_runs = len(df[df["accessible_remaining_wastes"] == 0]["RunId"].unique())
+    print(f"Number of runs that reached the end: {nb_runs}/{df['RunId'].nunique()}")
 
-for run_id in df["RunId"].unique():
-    subset = df[df["RunId"] == run_id]
     plt.plot(
-        subset["Step"],
-        subset["accessible_remaining_wastes"],
-        # label=f"Run {run_id} Remaining Waste",
+        grouped.index,
+        grouped["mean"],
+        label="Average Remaining Waste",
+        color="black",
+        linestyle="--",
+    )
+    plt.title(
+        "Strategy 3 : Evolution of Remaining Waste over Steps on grid 60x50 (Pattern Improved)"
+    )
+    plt.xlabel("Step")
+    plt.ylabel("Waste Remaining")
+    plt.legend()
+    plt.grid(True)
+
+    # Adding text annotation for parameters
+    params_text = "\n".join(f"{key}: {value}" for key, value in params.items())
+    params_text = f"Parameters:\n{params_text}"
+    plt.annotate(
+        params_text,
+        xy=(0.7, 0.68),
+        xycoords="axes fraction",
+        fontsize=8,
+        bbox=dict(boxstyle="round,pad=0.3", edgecolor="gray", facecolor="whitesmoke"),
     )
 
-nb_runs = len(df[df["accessible_remaining_wastes"] == 0]["RunId"].unique())
-print(f"Number of runs that reached the end: {nb_runs}/{df['RunId'].nunique()}")
-
-plt.plot(
-    grouped.index,
-    grouped["mean"],
-    label="Average Remaining Waste",
-    color="black",
-    linestyle="--",
-)
-plt.title(
-    "Strategy 3 : Evolution of Remaining Waste over Steps on grid 60x50 (Pattern Improved)"
-)
-plt.xlabel("Step")
-plt.ylabel("Waste Remaining")
-plt.legend()
-plt.grid(True)
-
-
-# Adding text annotation for parameters
-params_text = "\n".join(f"{key}: {value}" for key, value in params.items())
-params_text = f"Parameters:\n{params_text}"
-plt.annotate(
-    params_text,
-    xy=(0.7, 0.68),
-    xycoords="axes fraction",
-    fontsize=8,
-    bbox=dict(boxstyle="round,pad=0.3", edgecolor="gray", facecolor="whitesmoke"),
-)
-
-# Add a comment about the number of runs that reached the end
-plt.annotate(
-    f"Number of finished runs: {nb_runs}/{df['RunId'].nunique()}",
-    xy=(0.7, 0.6),
-    xycoords="axes fraction",
-    fontsize=8,
-    bbox=dict(boxstyle="round,pad=0.3", edgecolor="gray", facecolor="whitesmoke"),
-)
-
-plt.show()
+    # Add a comment about the number of runs that reached the end
+    plt.annotate(
+        f"Number of finished runs: {nb_runs}/{df['RunId'].nunique()}",
+        xy=(0.7, 0.6),
+        xycoords="axes fraction",
+        fontsize=8,
+        bbox=dict(boxstyle="round,pad=0.3", edgecolor="gray", facecolor="whitesmoke"),
+    )
+
+    plt.show()
+
+
+def main():
+    # If True, each parameter point is run until the 95% confidence interval of its completion
+    # step is narrower than 50 steps (or 50 runs), instead of a fixed number of iterations.
+    adaptive = False
+
+    results_path = "without-communication/results"
+    writer = ResultsWriter(results_path)
+    if adaptive:
+        summaries = run_adaptive_sweep(
+            params,
+            writer,
+            metric="completion_step",
+            target_width=50,
+            max_runs_per_point=50,
+            max_steps=1500,
+        )
+        for summary in summaries:
+            print(summary)
+    else:
+        run_sweep(params, writer, iterations=10, max_steps=1500)
+    print(f"Results saved at {results_path}")
+
+    df = to_dataframe(
+        load_runs(results_path, where=params),
+        table="model",
+        columns=["Step", "accessible_remaining_wastes"],
+    )
+    plot_results(df, params)
+
+
+if __name__ == "__main__":
+    main()
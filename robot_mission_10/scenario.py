@@ -0,0 +1,243 @@
+"""
+Scenarios: worlds saved on disk, to run every engine and strategy on the same instances.
+
+A scenario is a directory of arrays, which are memory-mapped and read in bulk:
+    scenario.json       the size of the grid, the zones and deposits, the terrain kind
+    radioactivity.npy   float64 [x, y], the radioactivity of each cell (dense worlds)
+    waste_pos.npy       int32 (n_wastes, 2), waste_color.npy int8 (AgentColor values)
+    robot_pos.npy       int32 (n_robots, 2), robot_color.npy int8 (AgentColor values)
+A sparse world keeps the seed of its TerrainField in scenario.json instead of the array.
+A loaded world reads the arrays in place: its radioactivity is the memory-mapped array and
+its wastes an EntityArray, so a large scenario is not copied into Python lists.
+
+`python scenario.py generate <root>` writes the stress scenarios (STRESS_SCENARIOS).
+"""
+
+import json
+import os
+import random
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from geometry import ZoneGeometry
+from types_1 import AgentColor
+from world import TerrainField, World, generate_world
+
+SCENARIO_FORMAT = 1
+
+# name: (width, height, robots per zone, wastes, sparse)
+STRESS_SCENARIOS = {
+    "dense-100": (100, 100, 10, 300, False),
+    "dense-300": (300, 300, 30, 2000, False),
+    "dense-1000": (1000, 1000, 50, 10000, False),
+    "sparse-10000": (10000, 10000, 5, 50, True),
+}
+
+
+def save_scenario(path: str, world: World, geometry: Optional[ZoneGeometry] = None):
+    """
+    Write the world as a scenario directory (see the module docstring).
+
+    :param geometry: The zones and deposits the world was drawn with, if not the default
+        ones; models loading the scenario use them.
+    """
+    os.makedirs(path, exist_ok=True)
+    if geometry is None:
+        geometry = ZoneGeometry(world.width, world.height)
+    meta: Dict[str, Any] = {
+        "format": SCENARIO_FORMAT,
+        "width": world.width,
+        "height": world.height,
+        "zone_widths": [
+            geometry.bounds[AgentColor.GREEN][1],
+            geometry.bounds[AgentColor.YELLOW][1]
+            - geometry.bounds[AgentColor.YELLOW][0],
+        ],
+        "deposits": [list(cell) for cell in geometry.deposits],
+    }
+    if isinstance(world.radioactivity, TerrainField):
+        meta["terrain"] = {"kind": "field", "seed": world.radioactivity.seed}
+    else:
+        meta["terrain"] = {"kind": "array"}
+        np.save(
+            os.path.join(path, "radioactivity.npy"),
+            np.asarray(world.radioactivity, dtype=np.float64),
+        )
+
+    robots = [
+        (pos, color) for color in AgentColor for pos in world.robots.get(color, [])
+    ]
+    for name, entities in (("waste", world.wastes), ("robot", robots)):
+        np.save(
+            os.path.join(path, f"{name}_pos.npy"),
+            np.array([pos for pos, _ in entities], dtype=np.int32).reshape(-1, 2),
+        )
+        np.save(
+            os.path.join(path, f"{name}_color.npy"),
+            np.array([color.value for _, color in entities], dtype=np.int8),
+        )
+
+    tmp_path = os.path.join(path, "scenario.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(path, "scenario.json"))
+
+
+def read_scenario_meta(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, "scenario.json")) as f:
+        meta = json.load(f)
+    if meta.get("format") != SCENARIO_FORMAT:
+        raise ValueError(f"Unknown scenario format {meta.get('format')} in {path}.")
+    return meta
+
+
+class EntityArray(Sequence):
+    """
+    The (position, color) of the wastes or robots of a scenario, or only their positions
+    if colors is None, read from the arrays when an element is accessed.
+
+    The arrays are the memory-mapped ones of the scenario: they are iterated a chunk at a
+    time, and a slice is a view, so the entities are never all held as Python objects.
+    """
+
+    CHUNK = 4096
+
+    def __init__(self, positions: np.ndarray, colors: Optional[np.ndarray] = None):
+        self.positions = positions
+        self.colors = colors
+
+    def __len__(self) -> int:
+        return self.positions.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            colors = None if self.colors is None else self.colors[index]
+            return EntityArray(self.positions[index], colors)
+        x, y = self.positions[index]
+        pos = (int(x), int(y))
+        if self.colors is None:
+            return pos
+        return pos, AgentColor(int(self.colors[index]))
+
+    def __iter__(self) -> Iterator:
+        for start in range(0, len(self), self.CHUNK):
+            positions = self.positions[start : start + self.CHUNK].tolist()
+            if self.colors is None:
+                yield from map(tuple, positions)
+            else:
+                colors = self.colors[start : start + self.CHUNK].tolist()
+                for (x, y), color in zip(positions, colors):
+                    yield (x, y), AgentColor(color)
+
+
+def _load_arrays(path: str, name: str) -> Tuple[np.ndarray, np.ndarray]:
+    positions = np.load(os.path.join(path, f"{name}_pos.npy"), mmap_mode="r")
+    colors = np.load(os.path.join(path, f"{name}_color.npy"), mmap_mode="r")
+    return positions, colors
+
+
+def load_scenario(path: str) -> World:
+    """
+    Read the world of a scenario. The arrays are memory-mapped and read in place.
+    """
+    meta = read_scenario_meta(path)
+    width, height = meta["width"], meta["height"]
+    geometry = scenario_geometry(meta)
+    if meta["terrain"]["kind"] == "field":
+        radioactivity = TerrainField(
+            width,
+            height,
+            geometry.bounds,
+            geometry.deposits,
+            meta["terrain"]["seed"],
+        )
+    else:
+        array = np.load(os.path.join(path, "radioactivity.npy"), mmap_mode="r")
+        if array.shape != (width, height):
+            raise ValueError(
+                f"The radioactivity of {path} is {array.shape}, not {(width, height)}."
+            )
+        radioactivity = array
+
+    positions, colors = _load_arrays(path, "robot")
+    robots = {
+        color: EntityArray(positions[np.flatnonzero(colors == color.value)])
+        for color in AgentColor
+    }
+    wastes = EntityArray(*_load_arrays(path, "waste"))
+    return World(width, height, radioactivity, wastes, robots)
+
+
+def scenario_geometry(meta: Dict[str, Any]) -> ZoneGeometry:
+    return ZoneGeometry(
+        meta["width"],
+        meta["height"],
+        tuple(meta["zone_widths"]),
+        [tuple(cell) for cell in meta["deposits"]],
+    )
+
+
+def scenario_params(path: str) -> Dict[str, Any]:
+    """
+    The model parameters of the scenario (size, fleet, wastes, sparse, and the zones and
+    deposits if they are not the default ones), to be completed with the strategy and
+    the tuning knobs.
+    """
+    meta = read_scenario_meta(path)
+    colors = np.load(os.path.join(path, "robot_color.npy"), mmap_mode="r")
+    n_wastes = np.load(os.path.join(path, "waste_color.npy"), mmap_mode="r").shape[0]
+    geometry = scenario_geometry(meta)
+    default = ZoneGeometry(meta["width"], meta["height"])
+    params = {
+        "width": meta["width"],
+        "height": meta["height"],
+        "n_green_agents": int((colors == AgentColor.GREEN.value).sum()),
+        "n_yellow_agents": int((colors == AgentColor.YELLOW.value).sum()),
+        "n_red_agents": int((colors == AgentColor.RED.value).sum()),
+        "n_wastes": int(n_wastes),
+        "sparse": meta["terrain"]["kind"] == "field",
+    }
+    if geometry.bounds != default.bounds:
+        params["zone_widths"] = tuple(meta["zone_widths"])
+    if geometry.deposits != default.deposits:
+        params["deposits"] = geometry.deposits
+    return params
+
+
+def generate_scenarios(
+    root: str,
+    scenarios: Optional[Dict[str, Tuple[int, int, int, int, bool]]] = None,
+    seed: int = 0,
+) -> List[str]:
+    """
+    Draw and save the stress scenarios (STRESS_SCENARIOS by default) in root, one
+    directory per name, and return their paths.
+    """
+    scenarios = STRESS_SCENARIOS if scenarios is None else scenarios
+    paths = []
+    for name, (width, height, n_agents, n_wastes, sparse) in scenarios.items():
+        world = generate_world(
+            width,
+            height,
+            n_agents,
+            n_agents,
+            n_agents,
+            n_wastes,
+            random.Random(seed),
+            sparse=sparse,
+        )
+        path = os.path.join(root, name)
+        save_scenario(path, world)
+        paths.append(path)
+        print(f"Scenario {name}: {world} saved at {path}")
+    return paths
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "generate":
+        generate_scenarios(sys.argv[2])
+    else:
+        print("Usage: python scenario.py generate <root>")
+        sys.exit(1)
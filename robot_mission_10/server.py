@@ -3,6 +3,7 @@ from mesa.visualization.modules import CanvasGrid, ChartModule
 from mesa.visualization.ModularVisualization import ModularServer
 
 from model import NuclearWasteModel
+from strategies import available_strategies
 from object import WasteAgent, RadioactivityAgent
 from agent import CleaningAgent
 from types_1 import AgentColor, DEPOSIT_RADIOACTIVITY
@@ -112,7 +113,7 @@ model_params = {
     "strategy": mesa.visualization.Choice(
         "Strategy",
         value=3,
-        choices=[1, 3],
+        choices=available_strategies(),
     ),
 }
 
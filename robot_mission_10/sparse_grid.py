@@ -0,0 +1,72 @@
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from mesa import Agent
+
+
+class SparseGrid:
+    """
+    A grid holding only the cells with an agent on them, in a dict keyed by position.
+
+    It has the part of the MultiGrid interface used by the model (place_agent,
+    move_agent, remove_agent, get_cell_list_contents, coord_iter), with the same
+    semantics: the agents of a cell are kept in the order they arrived, and the pos of
+    an agent is set when it is placed and None once removed. An empty cell costs
+    nothing, so its memory grows with the number of agents, not with the area: with a
+    sparse model, the terrain is not made of agents (see world.TerrainField).
+
+    Parameters:
+    - width (int), height (int): The size of the grid.
+    - torus (bool): Whether the positions wrap around the borders, like MultiGrid.
+    """
+
+    def __init__(self, width: int, height: int, torus: bool):
+        self.width = width
+        self.height = height
+        self.torus = torus
+        self.cells: Dict[Tuple[int, int], List[Agent]] = {}
+
+    def out_of_bounds(self, pos: Tuple[int, int]) -> bool:
+        x, y = pos
+        return x < 0 or x >= self.width or y < 0 or y >= self.height
+
+    def torus_adj(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        if not self.out_of_bounds(pos):
+            return pos
+        if not self.torus:
+            raise Exception("Point out of bounds, and space non-toroidal.")
+        return pos[0] % self.width, pos[1] % self.height
+
+    def place_agent(self, agent: Agent, pos: Tuple[int, int]):
+        cell = self.cells.setdefault(pos, [])
+        if agent.pos is None or agent not in cell:
+            cell.append(agent)
+            agent.pos = pos
+
+    def remove_agent(self, agent: Agent):
+        cell = self.cells[agent.pos]
+        cell.remove(agent)
+        if not cell:
+            del self.cells[agent.pos]
+        agent.pos = None
+
+    def move_agent(self, agent: Agent, pos: Tuple[int, int]):
+        pos = self.torus_adj(pos)
+        self.remove_agent(agent)
+        self.place_agent(agent, pos)
+
+    def is_cell_empty(self, pos: Tuple[int, int]) -> bool:
+        return pos not in self.cells
+
+    def get_cell_list_contents(
+        self, cell_list: Iterable[Tuple[int, int]]
+    ) -> List[Agent]:
+        if len(cell_list) == 2 and not isinstance(cell_list[0], tuple):
+            cell_list = [cell_list]
+        return [agent for pos in cell_list for agent in self.cells.get(pos, ())]
+
+    def coord_iter(self) -> Iterator[Tuple[List[Agent], Tuple[int, int]]]:
+        """
+        The occupied cells and their position, in the order of MultiGrid.coord_iter.
+        """
+        for pos in sorted(self.cells):
+            yield self.cells[pos], pos
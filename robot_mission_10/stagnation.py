@@ -0,0 +1,148 @@
+import enum
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from results_store import MISSING
+
+
+class StagnationReason(enum.Enum):
+    """
+    Why a run stopped making progress (no merge nor deposit during the window):
+    - LIVELOCK: the robots came back to a state they were in since the last progress,
+        they are going round in a cycle (e.g. between two hand-off cells).
+    - IDLE: no robot moved.
+    - STALL: the robots move without coming back to the same state, but without
+        progress either (e.g. a random walk with a waste that cannot be dropped).
+    """
+
+    LIVELOCK = 1
+    IDLE = 2
+    STALL = 3
+
+
+class Stagnation(NamedTuple):
+    """
+    A detected stagnation: the step it was detected at, its reason, the step of the last
+    progress, the length of the cycle of a livelock (None otherwise) and the accessible
+    wastes left then (0 when only the unaccessible wastes are left).
+    """
+
+    step: int
+    reason: StagnationReason
+    last_progress: int
+    period: Optional[int]
+    accessible_remaining: int
+
+    def describe(self) -> str:
+        description = (
+            f"{self.reason.name.lower()} at step {self.step}, "
+            f"no merge nor deposit since step {self.last_progress}"
+        )
+        if self.period is not None:
+            description += f", cycle of {self.period} steps"
+        if self.accessible_remaining == 0:
+            description += ", only unaccessible wastes left"
+        return description
+
+
+class StagnationDetector:
+    """
+    Detect the runs that stopped making progress, from two signals observed at each step:
+    - the waste events: the merges and deposits (WasteAccounting.progress), which cannot
+        be undone, unlike the picks and drops of a robot going back and forth.
+    - the state of the robots (position and number of wastes carried of each robot, and
+        the wastes on the ground of each color), kept as a hash per step since the last
+        progress.
+
+    A run stagnates when there is no progress during `window` steps. The reason is then
+    IDLE if no robot moved during the window (their state repeats at each step), LIVELOCK
+    if the current state was already seen since the last progress, else STALL. The first stagnation is kept in
+    `stagnation`; the model stops the run on it if asked to.
+
+    Parameters:
+    - robots (List[CleaningAgent]): The robots of the model.
+    - window (int): The number of steps without progress before a stagnation.
+    """
+
+    def __init__(self, robots, window: int = 200):
+        self.robots = list(robots)
+        self.window = window
+        self.stagnation: Optional[Stagnation] = None
+        self._last_progress = -1
+        self._last_progress_step = 0
+        self._last_move_step = 0
+        self._positions = [robot.pos for robot in self.robots]
+        # The last step each state was seen at, since the last progress
+        self._seen: Dict[int, int] = {}
+
+    def _state(self, model) -> int:
+        return hash(
+            (
+                tuple(
+                    (robot.pos, len(robot.percept_temp.wastes)) for robot in self.robots
+                ),
+                tuple(model.wastes.on_ground.values()),
+            )
+        )
+
+    def observe(self, model) -> Optional[Stagnation]:
+        """
+        Observe the model after a step. Return the stagnation if it is detected at this
+        step, else None.
+        """
+        if self.stagnation is not None:
+            return None
+        step = model.schedule.steps
+        progress = model.wastes.progress
+        if progress != self._last_progress:
+            self._last_progress = progress
+            self._last_progress_step = step
+            self._seen.clear()
+
+        positions = [robot.pos for robot in self.robots]
+        if positions != self._positions:
+            self._positions = positions
+            self._last_move_step = step
+
+        state = self._state(model)
+        previous = self._seen.get(state)
+        self._seen[state] = step
+        if step - self._last_progress_step < self.window:
+            return None
+
+        if step - self._last_move_step >= self.window:
+            reason, period = StagnationReason.IDLE, None
+        elif previous is not None:
+            reason, period = StagnationReason.LIVELOCK, step - previous
+        else:
+            reason, period = StagnationReason.STALL, None
+        self.stagnation = Stagnation(
+            step=step,
+            reason=reason,
+            last_progress=self._last_progress_step,
+            period=period,
+            accessible_remaining=model.accessible_remaining_wastes,
+        )
+        return self.stagnation
+
+    def table(self) -> Dict[str, np.ndarray]:
+        """
+        The stagnation as a one-row table of the results store (MISSING if none).
+        """
+        stagnation = self.stagnation
+        if stagnation is None:
+            values = [MISSING] * 5
+        else:
+            values = [
+                stagnation.step,
+                stagnation.reason.value,
+                stagnation.last_progress,
+                MISSING if stagnation.period is None else stagnation.period,
+                stagnation.accessible_remaining,
+            ]
+        names = ("step", "reason", "last_progress", "period", "accessible_remaining")
+        return {
+            name: np.array([value], dtype=np.int32)
+            for name, value in zip(names, values)
+        }
@@ -0,0 +1,111 @@
+import importlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class StrategySpec:
+    """
+    A registered strategy. The module of the agents is only imported when the strategy
+    is selected, so a process only loads the strategies it runs.
+
+    Parameters:
+    - strategy_id: The value of the `strategy` parameter of the model.
+    - module (str): The module defining the agents of the strategy.
+    - add_agents (str): The function of the module that adds the agents to the environment,
+        with the signature of agent.add_agents_template.
+    - parameters (Tuple[str]): The model parameters that the strategy reads.
+    - search_space (Callable): Given the model parameters, the values of the strategy
+        parameters to search when tuning it (see tuning.py).
+    """
+
+    def __init__(
+        self,
+        strategy_id,
+        module: str,
+        add_agents: str,
+        parameters: Tuple[str, ...] = (),
+        search_space: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    ):
+        self.strategy_id = strategy_id
+        self.module = module
+        self.add_agents = add_agents
+        self.parameters = parameters
+        self.search_space = search_space
+
+    def load(self) -> Callable:
+        module = importlib.import_module(self.module)
+        return getattr(module, self.add_agents)
+
+
+STRATEGIES: Dict[Any, StrategySpec] = {}
+
+
+def register_strategy(
+    strategy_id,
+    module: str,
+    add_agents: str,
+    parameters: Tuple[str, ...] = (),
+    search_space: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+):
+    """
+    Register a strategy, without importing it.
+    """
+    STRATEGIES[strategy_id] = StrategySpec(
+        strategy_id, module, add_agents, parameters, search_space
+    )
+
+
+def available_strategies() -> List:
+    return list(STRATEGIES)
+
+
+def get_strategy(strategy_id) -> StrategySpec:
+    """
+    Return the spec of the strategy, or raise a ValueError if it is not registered.
+    """
+    spec = STRATEGIES.get(strategy_id)
+    if spec is None:
+        raise ValueError(
+            f"Unknown strategy {strategy_id!r}. Available strategies: {available_strategies()}"
+        )
+    return spec
+
+
+def load_strategy(strategy_id) -> Callable:
+    """
+    Import the module of the strategy and return its function adding the agents.
+    """
+    return get_strategy(strategy_id).load()
+
+
+def _strategy_1_search_space(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {"upper_agent_proportion": (0.0, 1.0)}
+
+
+def _strategy_3_search_space(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "step_between_checking": (1, params["height"] * params["width"] // 3),
+        "deposit_row": list(range(1, params["height"])),
+    }
+
+
+register_strategy(
+    1,
+    "agent_strat_1",
+    "add_agents_strat_1",
+    parameters=("upper_agent_proportion",),
+    search_space=_strategy_1_search_space,
+)
+register_strategy(
+    3,
+    "agent_strat_3",
+    "add_agents_strat_3",
+    parameters=(
+        "step_between_checking",
+        "deposit_row",
+        "handoff_notifications",
+        "zone_widths",
+        "deposits",
+        "handoff_rows",
+    ),
+    search_space=_strategy_3_search_space,
+)
@@ -0,0 +1,289 @@
+import functools
+import itertools
+import statistics
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from model import NuclearWasteModel
+from result_spool import (
+    SpooledRun,
+    SpooledRunRecorder,
+    collect_spooled_run,
+    default_spool_dir,
+    spool_tables,
+)
+from results_store import ResultsWriter, RunRecorder, model_table, run_tables
+
+
+def make_parameter_points(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Expand the parameters into every combination, like mesa.batch_run does:
+    a list (or any iterable that is not a string nor a dict) is swept, any other value
+    is fixed. A dict (e.g. arrival_rates) is one value, a list of dicts is swept.
+    """
+    parameter_list = []
+    for param, values in params.items():
+        if isinstance(values, (str, dict)):
+            all_values = [(param, values)]
+        else:
+            try:
+                all_values = [(param, value) for value in values]
+            except TypeError:
+                all_values = [(param, values)]
+        parameter_list.append(all_values)
+    return [dict(kwargs) for kwargs in itertools.product(*parameter_list)]
+
+
+def run_single(
+    params: Dict[str, Any],
+    seed,
+    max_steps: int,
+    recorder_cls=RunRecorder,
+    stop_when_finished: bool = False,
+):
+    """
+    Run one model until it stops or reaches max_steps.
+    If stop_when_finished, also stop as soon as all the accessible wastes are cleaned.
+    Return the finished model and the recorder that observed it.
+    """
+    # The recorder observes the robots, the data collector only keeps the model table.
+    # Both see the state before each step, so their rows of a Step are the same state.
+    model = NuclearWasteModel(**{"collect_agents": False, **params}, seed=seed)
+    recorder = recorder_cls(model)
+    while model.running and model.schedule.steps < max_steps:
+        recorder.observe(model)
+        model.step()
+        if stop_when_finished and model.is_finished > 0:
+            break
+    return model, recorder
+
+
+def spool_run(
+    params: Dict[str, Any], seed, max_steps: int, spool_dir: str
+) -> SpooledRun:
+    """
+    Run one model in a worker of a parallel sweep, with its tables written in a new
+    directory of spool_dir, and return the handle of the run (see result_spool).
+    """
+    directory = tempfile.mkdtemp(prefix="run-", dir=spool_dir)
+    model, recorder = run_single(
+        params,
+        seed,
+        max_steps,
+        recorder_cls=functools.partial(
+            SpooledRunRecorder, directory=directory, max_steps=max_steps
+        ),
+    )
+    recorder.flush()
+    spool_tables(directory, {"model": model_table(model), **run_tables(model)})
+    return SpooledRun(
+        params=params,
+        seed=seed,
+        directory=directory,
+        agent_types=recorder.types,
+        n_agent_rows=recorder.n_rows,
+        memory_summary=model.memory.summary() if model.memory is not None else None,
+    )
+
+
+def _spool_run(task) -> SpooledRun:
+    return spool_run(*task)
+
+
+def run_sweep(
+    params: Dict[str, Any],
+    writer: ResultsWriter,
+    iterations: int = 10,
+    max_steps: int = 1500,
+    first_seed: int = 0,
+    number_processes: int = 1,
+    spool_dir: Optional[str] = None,
+):
+    """
+    Run every parameter point `iterations` times and write each run to the results store
+    as soon as it is finished, so an interrupted sweep keeps the runs already done.
+
+    With several processes, the workers do not send their tables back: each run is
+    written in memory-mapped columns in spool_dir (default_spool_dir if None), and only
+    its handle is sent to this process, which writes the columns to the store from the
+    maps and removes them.
+    """
+    tasks = [
+        (point, seed)
+        for point in make_parameter_points(params)
+        for seed in range(first_seed, first_seed + iterations)
+    ]
+    if number_processes == 1:
+        for point, seed in tasks:
+            model, recorder = run_single(point, seed, max_steps)
+            path = writer.write_model(point, seed, model, recorder)
+            print(f"Run {point} (seed={seed}) saved at {path}")
+            if model.memory is not None:
+                from memory import format_summary
+
+                print(format_summary(model.memory.summary()))
+        return
+
+    spool_dir = spool_dir or default_spool_dir()
+    with ProcessPoolExecutor(max_workers=number_processes) as executor:
+        runs = executor.map(
+            _spool_run,
+            [(point, seed, max_steps, spool_dir) for point, seed in tasks],
+        )
+        for run in runs:
+            path = collect_spooled_run(run, writer)
+            print(f"Run {run.params} (seed={run.seed}) saved at {path}")
+            if run.memory_summary is not None:
+                from memory import format_summary
+
+                print(format_summary(run.memory_summary))
+
+
+def completion_step(model, max_steps: int) -> int:
+    """
+    The step at which all the accessible wastes were cleaned.
+    A run that did not finish counts as max_steps (the value is censored at the horizon).
+    """
+    if model.is_finished == 0:
+        return max_steps
+    return model.schedule.steps - model.is_finished + 1
+
+
+def remaining_wastes(model, max_steps: int) -> int:
+    """
+    The accessible wastes left at the end of the run.
+    """
+    return model.accessible_remaining_wastes
+
+
+METRICS = {
+    "completion_step": completion_step,
+    "remaining_wastes": remaining_wastes,
+}
+# The metrics known as soon as the wastes are cleaned: the accessible wastes left stay 0
+# once they are all cleaned, so their runs stop there.
+COMPLETION_METRICS = ("completion_step", "remaining_wastes")
+
+
+def t_quantile(confidence: float, df: int) -> float:
+    """
+    Two-sided quantile of the Student distribution, with the Cornish-Fisher expansion
+    around the normal quantile (precise enough from 2 degrees of freedom).
+    """
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    return (
+        z
+        + (z**3 + z) / (4 * df)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * df**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * df**3)
+    )
+
+
+def confidence_interval(values: List[float], confidence: float = 0.95):
+    """
+    Return the mean and the half width of the confidence interval of the mean.
+    """
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return mean, float("inf")
+    half_width = (
+        t_quantile(confidence, len(values) - 1)
+        * statistics.stdev(values)
+        / (len(values) ** 0.5)
+    )
+    return mean, half_width
+
+
+class ReplicationState:
+    """
+    The runs already done for one parameter point of an adaptive sweep.
+    """
+
+    def __init__(self, params: Dict[str, Any], first_seed: int):
+        self.params = params
+        self.next_seed = first_seed
+        self.values: List[float] = []
+
+    def interval(self, confidence: float):
+        return confidence_interval(self.values, confidence)
+
+    def summary(self, confidence: float, target_width: float) -> Dict[str, Any]:
+        mean, half_width = self.interval(confidence)
+        return {
+            **self.params,
+            "n_runs": len(self.values),
+            "mean": mean,
+            "ci_low": mean - half_width,
+            "ci_high": mean + half_width,
+            "converged": 2 * half_width <= target_width,
+        }
+
+
+def run_adaptive_sweep(
+    params: Dict[str, Any],
+    writer: Optional[ResultsWriter] = None,
+    metric: str = "completion_step",
+    target_width: float = 50,
+    confidence: float = 0.95,
+    min_runs: int = 3,
+    max_runs_per_point: int = 50,
+    budget: Optional[int] = None,
+    max_steps: int = 1500,
+    first_seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Run each parameter point until the confidence interval of the metric is narrower
+    than target_width, instead of a fixed number of iterations.
+
+    Every point first gets min_runs runs. Then each new run goes to the point whose
+    interval is the widest, so noisy configurations get the runs and stable ones stop
+    early. The sweep stops when every point has converged, has max_runs_per_point runs,
+    or when the total number of runs reaches the budget. Each run stops as soon as its
+    wastes are cleaned (see COMPLETION_METRICS).
+
+    :param metric: "completion_step" (censored at max_steps) or "remaining_wastes" at the horizon.
+    :param target_width: The full width of the confidence interval to reach, in the unit of the metric.
+    :return: One summary per parameter point: parameters, n_runs, mean, ci_low, ci_high, converged.
+    """
+    measure = METRICS[metric]
+    stop_when_finished = metric in COMPLETION_METRICS
+    states = [
+        ReplicationState(point, first_seed) for point in make_parameter_points(params)
+    ]
+    n_runs = 0
+
+    def run_next(state: ReplicationState):
+        seed = state.next_seed
+        state.next_seed += 1
+        model, recorder = run_single(
+            state.params, seed, max_steps, stop_when_finished=stop_when_finished
+        )
+        state.values.append(measure(model, max_steps))
+        if writer is not None:
+            writer.write_model(state.params, seed, model, recorder)
+
+    def has_budget():
+        return budget is None or n_runs < budget
+
+    for _ in range(min_runs):
+        for state in states:
+            if not has_budget():
+                break
+            run_next(state)
+            n_runs += 1
+
+    while has_budget():
+        candidates = [
+            state
+            for state in states
+            if len(state.values) < max_runs_per_point
+            and 2 * state.interval(confidence)[1] > target_width
+        ]
+        if not candidates:
+            break
+        noisiest = max(candidates, key=lambda state: state.interval(confidence)[1])
+        run_next(noisiest)
+        n_runs += 1
+
+    return [state.summary(confidence, target_width) for state in states]
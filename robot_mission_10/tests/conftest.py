@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules of the simulation import each other by name, from their directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,81 @@
+import contextlib
+import io
+from collections import Counter
+
+import numpy as np
+
+from arrivals import STEADY_STATE_METRICS, ThroughputMonitor, mser_truncation
+from model import NuclearWasteModel
+from results_store import MISSING
+from types_1 import AgentColor
+
+WARMUP = 60
+
+
+def synthetic_monitor(n_steps=600):
+    """
+    A backlog falling from 100 to 20 during the WARMUP first steps, then noisy around 20,
+    with one red waste deposited every 4 steps, each 12 steps after it arrived.
+    """
+    rng = np.random.default_rng(0)
+    monitor = ThroughputMonitor()
+    transient = np.linspace(100, 20, WARMUP, endpoint=False)
+    noise = 20 + rng.integers(-1, 2, max(n_steps - WARMUP, 0))
+    monitor.backlog = [*transient.round().astype(int), *noise][:n_steps]
+    for step in range(1, n_steps + 1):
+        if step % 4 == 0:
+            monitor.arrive(step, AgentColor.RED, step - 12)
+            monitor.deposit(step, step)
+        deposited = step // 4
+        monitor.deposited.append(deposited)
+        monitor.arrived_units.append(4 * deposited)
+        monitor.deposited_units.append(4 * deposited)
+    return monitor
+
+
+def test_mser_drops_the_transient():
+    monitor = synthetic_monitor()
+    warmup = mser_truncation(monitor.backlog)
+    assert WARMUP <= warmup <= WARMUP + 10
+
+    summary = monitor.steady_state()
+    assert summary["warmup"] == warmup
+    assert abs(summary["deposits_per_100_steps"] - 25) < 0.5
+    assert (
+        summary["arrival_units_per_100_steps"] == summary["deposit_units_per_100_steps"]
+    )
+    assert abs(summary["backlog_mean"] - 20) < 1
+    assert abs(summary["backlog_slope_per_100_steps"]) < 0.5
+    assert summary["age_mean"] == summary["age_p90"] == 12
+
+
+def test_an_unfinished_warmup_has_every_metric_missing():
+    monitor = synthetic_monitor(n_steps=20)
+    summary = monitor.steady_state(warmup=19)
+    assert set(summary) == {"warmup", "steps", *STEADY_STATE_METRICS}
+    assert all(summary[name] == MISSING for name in STEADY_STATE_METRICS)
+    assert summary.keys() == synthetic_monitor().steady_state().keys()
+
+
+def test_deposits_are_stamped_with_the_row_that_counts_them():
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = NuclearWasteModel(
+            4,
+            3,
+            3,
+            20,
+            30,
+            20,
+            strategy=3,
+            seed=0,
+            arrival_rates={AgentColor.GREEN: 0.05},
+        )
+        for _ in range(600):
+            model.step()
+    monitor = model.throughput
+    stamps = Counter(step for step, _ in monitor.ages)
+    assert stamps
+    # The deposits of the step s are counted from the row s - 1 of the throughput table
+    deposited = [0, *monitor.deposited]
+    for step in range(1, len(monitor.deposited) + 1):
+        assert deposited[step] - deposited[step - 1] == stamps.get(step, 0)
@@ -0,0 +1,39 @@
+import contextlib
+import io
+import random
+
+from compare import paired_differences, run_on_world
+from geometry import ZoneGeometry
+from world import generate_world
+
+PARAMS = dict(
+    width=20,
+    height=12,
+    n_green_agents=3,
+    n_yellow_agents=2,
+    n_red_agents=2,
+    n_wastes=15,
+)
+
+
+def test_a_strategy_compared_with_itself_has_no_difference():
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for seed in range(4):
+            world = generate_world(
+                *PARAMS.values(),
+                random.Random(seed),
+                ZoneGeometry(PARAMS["width"], PARAMS["height"]),
+            )
+            # The second run is on the world left by the first one
+            for label in ("baseline", "candidate"):
+                result = run_on_world(PARAMS, 3, seed, world, 1500)
+                results.append({**result, "strategy": label})
+
+    report = paired_differences(results, "baseline")
+
+    assert any(result["finished"] for result in results)
+    for difference in report["candidate"].values():
+        assert difference["n_pairs"] == 4
+        assert difference["mean_difference"] == 0
+        assert difference["ci_low"] == difference["ci_high"] == 0
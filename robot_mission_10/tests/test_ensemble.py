@@ -0,0 +1,49 @@
+import contextlib
+import io
+
+import pytest
+
+from ensemble import Ensemble
+from sweep import completion_step, run_single
+
+PARAMS = dict(
+    width=20,
+    height=12,
+    n_green_agents=3,
+    n_yellow_agents=2,
+    n_red_agents=2,
+    n_wastes=15,
+    strategy=3,
+)
+
+
+@pytest.mark.parametrize("max_steps", [60, 1500])
+def test_ensemble_matches_run_single(max_steps):
+    # With 60 steps most worlds are stopped before they finish
+    seeds = list(range(6))
+    ensemble = Ensemble(PARAMS, seeds)
+    steps = ensemble.run(max_steps).tolist()
+    remaining = ensemble.accessible_remaining_wastes.tolist()
+
+    expected_steps, expected_remaining = [], []
+    for seed in seeds:
+        with contextlib.redirect_stdout(io.StringIO()):
+            model, _ = run_single(PARAMS, seed, max_steps, stop_when_finished=True)
+        expected_steps.append(completion_step(model, max_steps))
+        expected_remaining.append(model.accessible_remaining_wastes)
+
+    assert steps == expected_steps
+    assert remaining == expected_remaining
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"strategy": 1},
+        {"scheduler": "zones"},
+        {"sparse": True, "scheduler": "zones"},
+    ],
+)
+def test_ensemble_rejects_what_it_does_not_implement(params):
+    with pytest.raises(ValueError):
+        Ensemble({**PARAMS, **params}, [0, 1])
@@ -0,0 +1,43 @@
+import contextlib
+import io
+import random
+
+import pytest
+
+from compare import compare_strategies
+from model import NuclearWasteModel
+from world import generate_world
+
+PARAMS = {
+    "width": 12,
+    "height": 10,
+    "n_green_agents": 1,
+    "n_yellow_agents": 1,
+    "n_red_agents": 1,
+    "n_wastes": 10,
+}
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"zone_widths": (2, 2)}, {"sparse": True, "scheduler": "zones"}],
+)
+def test_compare_draws_the_worlds_of_the_models(params):
+    with contextlib.redirect_stdout(io.StringIO()):
+        results, _ = compare_strategies(
+            {**PARAMS, **params}, strategies=(3,), seeds=range(2), max_steps=50
+        )
+    assert len(results) == 2
+
+
+@pytest.mark.parametrize("params", [{"zone_widths": (2, 2)}, {"deposits": [(11, 0)]}])
+def test_a_world_of_other_zones_or_deposits_is_rejected(params):
+    world = generate_world(12, 10, 1, 1, 1, 10, random.Random(0))
+    with pytest.raises(ValueError):
+        NuclearWasteModel(**PARAMS, **params, strategy=3, world=world)
+
+
+def test_strategy_1_rejects_custom_zones_and_deposits():
+    for params in ({"zone_widths": (5, 5)}, {"deposits": [(11, 0)]}):
+        with pytest.raises(ValueError):
+            NuclearWasteModel(**PARAMS, **params, strategy=1)
@@ -0,0 +1,42 @@
+import contextlib
+import io
+
+import pytest
+
+from golden import (
+    GOLDEN_CASES,
+    GOLDEN_SEEDS,
+    compare_runs,
+    first_divergence,
+    load_golden,
+    make_factory,
+    record,
+)
+from results_store import params_key
+
+# The agent records of the data collector are not part of the trajectories
+FACTORY = make_factory({"collect_agents": False})
+
+
+@pytest.mark.parametrize("seed", GOLDEN_SEEDS)
+@pytest.mark.parametrize("params", GOLDEN_CASES, ids=params_key)
+def test_golden_trajectory(params, seed):
+    golden = load_golden(params, seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        trajectory = record(FACTORY(params, seed), len(golden) - 1)
+    assert first_divergence(golden, trajectory) is None
+
+
+def test_divergence_is_reported_at_its_step():
+    params = GOLDEN_CASES[0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        divergence = compare_runs(
+            params,
+            0,
+            50,
+            lambda params, seed: FACTORY(params, seed + 1),
+            reference=FACTORY,
+        )
+    assert divergence is not None
+    step, diff = divergence
+    assert step == 0 and "robots" in diff
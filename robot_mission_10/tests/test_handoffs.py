@@ -0,0 +1,81 @@
+import contextlib
+import io
+from types import SimpleNamespace
+
+from agent_strat_3 import handoff_row
+from handoffs import HandoffBoard
+from sweep import run_single
+from tuning import NoRecorder
+from types_1 import AgentColor
+from utilization import RobotState
+
+PARAMS = {
+    "width": 30,
+    "height": 20,
+    "n_green_agents": 5,
+    "n_yellow_agents": 3,
+    "n_red_agents": 3,
+    "n_wastes": 30,
+    "strategy": 3,
+}
+
+
+def polling_share(handoff_notifications: bool) -> float:
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, _ = run_single(
+            {
+                **PARAMS,
+                "handoff_notifications": handoff_notifications,
+                "track_utilization": True,
+            },
+            0,
+            1000,
+            NoRecorder,
+        )
+    tracker = model.utilization
+    steps = tracker.state_steps[tracker.colors != AgentColor.GREEN.value]
+    return steps[:, RobotState.POLLING.value].sum() / steps.sum()
+
+
+def test_notified_robots_only_poll_when_a_waste_waits():
+    # Patrolling past step_between_checking is not polling when the robots are notified
+    assert polling_share(True) < 0.1
+    assert polling_share(True) < polling_share(False)
+
+
+def subscribed_robot(board, unique_id, pos, cell):
+    robot = SimpleNamespace(
+        unique_id=unique_id, pos=pos, model=SimpleNamespace(handoffs=board)
+    )
+    board.subscribe(robot, cell, AgentColor.YELLOW)
+    return robot
+
+
+def test_a_dropped_waste_is_claimed_once():
+    board = HandoffBoard()
+    cell = (9, 19)
+    first = subscribed_robot(board, 1, (12, 19), cell)
+    second = subscribed_robot(board, 2, (15, 10), cell)
+    board.land(cell, AgentColor.YELLOW)
+    # Another color on the cell is not for these robots
+    board.land(cell, AgentColor.RED)
+
+    assert handoff_row(first, True, False) == cell[1]
+    assert handoff_row(second, True, False) is None
+    assert handoff_row(first, True, False) == cell[1]
+    assert (board.notifications, board.trips) == (1, 1)
+
+
+def test_a_robot_taking_a_waste_on_its_way_gives_up_its_claim():
+    board = HandoffBoard()
+    cell = (9, 19)
+    first = subscribed_robot(board, 1, (12, 19), cell)
+    second = subscribed_robot(board, 2, (15, 10), cell)
+    board.land(cell, AgentColor.YELLOW)
+    handoff_row(first, True, False)
+
+    # Its hands are no longer empty: the claim goes back to the board
+    assert handoff_row(first, False, False) is None
+    assert first.unique_id not in board.claims
+    assert handoff_row(second, True, False) == cell[1]
+    assert board.trips == 2
@@ -0,0 +1,51 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from agent import CleaningAgent
+from heatmaps import merge_heatmaps, top_cells
+from model import NuclearWasteModel
+from object import WasteAgent
+
+
+@pytest.mark.parametrize("strategy", [1, 3])
+def test_heatmaps_match_the_positions_of_each_step(strategy):
+    width, height = 15, 10
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = NuclearWasteModel(
+            2, 2, 2, 15, width, height, strategy=strategy, seed=0, heatmaps=True
+        )
+        robots = [
+            agent for agent in model.schedule.agents if isinstance(agent, CleaningAgent)
+        ]
+        visits = np.zeros((width, height), dtype=np.int64)
+        dwell = np.zeros((width, height), dtype=np.int64)
+        waste_wait = np.zeros((width, height), dtype=np.int64)
+        for _ in range(150):
+            before = [robot.pos for robot in robots]
+            model.step()
+            # The time on a cell counts the states after each step
+            for old_pos, robot in zip(before, robots):
+                dwell[robot.pos] += 1
+                if robot.pos != old_pos:
+                    visits[robot.pos] += 1
+            for content, pos in model.grid.coord_iter():
+                waste_wait[pos] += sum(isinstance(obj, WasteAgent) for obj in content)
+
+    arrays = model.heatmaps.arrays(model.schedule.steps)
+    assert (arrays["visits"] == visits).all()
+    assert (arrays["dwell"] == dwell).all()
+    assert (arrays["waste_wait"] == waste_wait).all()
+    assert arrays["dwell"].sum() == 150 * len(robots)
+
+
+def test_merged_heatmaps_add_up():
+    first = {"visits": np.array([[1, 0], [2, 5]])}
+    second = {"visits": np.array([[0, 2], [1, 1]])}
+    merged = merge_heatmaps([first, second])
+    assert merged["visits"].tolist() == [[1, 2], [3, 6]]
+    assert top_cells(merged["visits"], 2) == [((1, 1), 6), ((1, 0), 3)]
+    with pytest.raises(ValueError):
+        merge_heatmaps([first, {"visits": np.zeros((3, 2))}])
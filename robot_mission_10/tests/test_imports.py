@@ -0,0 +1,9 @@
+import pytest
+
+from benchmark_import import FORBIDDEN_MODULES, HEADLESS_MODULES, LAZY_MODULES, measure
+
+
+@pytest.mark.parametrize("module", HEADLESS_MODULES)
+def test_headless_import_loads_no_optional_part(module):
+    _, loaded = measure(module)
+    assert not set(loaded) & set(LAZY_MODULES + FORBIDDEN_MODULES)
@@ -0,0 +1,51 @@
+import contextlib
+import io
+import sys
+
+from memory import SUBSYSTEMS, deep_size
+from model import NuclearWasteModel
+
+
+def run(steps, **params):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        model = NuclearWasteModel(
+            2, 2, 2, 10, 15, 10, strategy=3, seed=0, collect_agents=False, **params
+        )
+        for _ in range(steps):
+            model.step()
+    return model, output.getvalue()
+
+
+def test_shared_objects_are_counted_once():
+    shared = tuple(range(100, 200))
+    size, count = deep_size([shared])
+    holder = [shared, shared]
+    assert deep_size([shared, shared]) == (size, count)
+    assert deep_size([holder]) == (sys.getsizeof(holder) + size, count + 1)
+
+
+def test_monitor_samples_every_few_steps():
+    model, _ = run(35, memory_every=10)
+    monitor = model.memory
+    assert [step for step, _ in monitor.samples] == [0, 10, 20, 30]
+
+    # Between two samples, the columns repeat the last one
+    table = model.datacollector.get_model_vars_dataframe()
+    for name in SUBSYSTEMS:
+        column = table[f"memory_{name}"].tolist()
+        assert len(set(column[:10])) == 1
+        assert column[10] == monitor.samples[1][1][name][0]
+    assert table["memory_total"].iloc[-1] == sum(
+        size for size, _ in monitor.samples[-1][1].values()
+    )
+
+    # The robots' knowledge keeps every percept and action
+    summary = monitor.summary()
+    assert summary["knowledge"]["bytes_per_step"] > 0
+    assert summary["knowledge"]["bytes_peak"] == summary["knowledge"]["bytes_end"]
+
+
+def test_budget_is_reported_once():
+    _, output = run(35, memory_every=10, memory_budgets={"knowledge": 1})
+    assert output.count("Memory of knowledge over budget") == 1
@@ -0,0 +1,48 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from neighbors import NeighborIndex
+from types_1 import AgentColor, Neighboring, NeighboringType
+
+
+def square(index, pos, radius):
+    """
+    The occupied cells of the square around pos, read cell by cell.
+    """
+    out = []
+    for _, _, cell in index._offsets(pos, radius):
+        if cell in index.deposits:
+            out.append(Neighboring(cell, NeighboringType.DEPOSIT, None))
+        for robot in index.cells.get(cell, ()):
+            out.append(Neighboring(cell, NeighboringType.AGENT, robot.color))
+    return tuple(out)
+
+
+@pytest.mark.parametrize("torus", [False, True])
+def test_sparse_surroundings_match_the_square(torus):
+    rng = random.Random(0)
+    width, height = 100, 70
+    index = NeighborIndex(width, height, torus, deposits=[(99, 69), (50, 0)])
+    robots = []
+    for i in range(40):
+        robot = SimpleNamespace(color=AgentColor(i % 3))
+        pos = (rng.randrange(width), rng.randrange(height))
+        index.place(robot, pos)
+        robots.append((robot, pos))
+    for step in range(200):
+        k = rng.randrange(len(robots))
+        robot, pos = robots[k]
+        new_pos = (rng.randrange(width), rng.randrange(height))
+        index.move(robot, pos, new_pos)
+        robots[k] = (robot, new_pos)
+
+        pos = (rng.randrange(width), rng.randrange(height))
+        radius = rng.choice([1, 2, 9, 20, 40, 60])
+        assert index.neighborhood(pos, radius) == [
+            cell for _, _, cell in index._offsets(pos, radius)
+        ]
+        assert index.surroundings(pos, radius) == square(index, pos, radius)
+    assert sum(len(cells) for cells in index._buckets.values()) == len(index.cells)
+    assert set(index._entries) <= set(index.cells) | index.deposits
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from occupancy import Occupancy, SparseOccupancy
+from types_1 import AgentColor
+
+
+def brute_force(robots, pos, radius, color, include_center):
+    x, y = pos
+    return sum(
+        1
+        for (i, j), robot_color in robots
+        if abs(i - x) <= radius
+        and abs(j - y) <= radius
+        and (color is None or robot_color == color)
+        and (include_center or (i, j) != pos)
+    )
+
+
+@pytest.mark.parametrize("occupancy_cls", [Occupancy, SparseOccupancy])
+def test_robots_around_counts_the_robots_of_the_square(occupancy_cls):
+    rng = random.Random(0)
+    width, height = 30, 20
+    occupancy = occupancy_cls(width, height)
+    robots = []
+    for _ in range(40):
+        robot = (
+            (rng.randrange(width), rng.randrange(height)),
+            rng.choice(list(AgentColor)),
+        )
+        occupancy.place(*robot)
+        robots.append(robot)
+    # Move some robots, some of them twice on the same cell
+    for index in range(0, 39, 3):
+        pos, color = robots[index]
+        new_pos = robots[index + 1][0]
+        occupancy.move(pos, new_pos, color)
+        robots[index] = (new_pos, color)
+
+    for _ in range(200):
+        pos = (rng.randrange(width), rng.randrange(height))
+        radius = rng.choice([0, 1, 2, 5, 40])
+        color = rng.choice([None, *AgentColor])
+        include_center = rng.random() < 0.5
+        assert occupancy.robots_around(
+            pos, radius, color, include_center
+        ) == brute_force(robots, pos, radius, color, include_center)
+        assert occupancy.robots_at(pos, color) == brute_force(
+            robots, pos, 0, color, True
+        )
@@ -0,0 +1,48 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+
+from result_spool import collect_spooled_run
+from results_store import ResultsWriter, load_runs
+from sweep import run_single, spool_run
+
+PARAMS = {
+    "strategy": 3,
+    "width": 15,
+    "height": 10,
+    "n_green_agents": 2,
+    "n_yellow_agents": 2,
+    "n_red_agents": 2,
+    "n_wastes": 10,
+    "track_utilization": True,
+}
+
+
+def tables(run):
+    return {table: run.table(table) for table in ("model", "agents", "utilization")}
+
+
+def test_spooled_run_is_stored_like_a_direct_run(tmp_path):
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    with contextlib.redirect_stdout(io.StringIO()):
+        spooled = spool_run(PARAMS, 0, 50, str(spool_dir))
+        collect_spooled_run(spooled, ResultsWriter(str(tmp_path / "spooled")))
+        model, recorder = run_single(PARAMS, 0, 50)
+    ResultsWriter(str(tmp_path / "direct")).write_model(PARAMS, 0, model, recorder)
+
+    # The spool directory of the run is removed once it is in the store
+    assert os.listdir(spool_dir) == []
+    (spooled_run,) = load_runs(str(tmp_path / "spooled"))
+    (direct_run,) = load_runs(str(tmp_path / "direct"))
+    assert spooled_run.params == direct_run.params
+    assert spooled_run.agent_types == direct_run.agent_types
+
+    spooled_tables, direct_tables = tables(spooled_run), tables(direct_run)
+    assert len(spooled_tables["agents"]["Step"]) == 50 * 6
+    for table, columns in direct_tables.items():
+        assert spooled_tables[table].keys() == columns.keys(), table
+        for name, values in columns.items():
+            assert np.array_equal(spooled_tables[table][name], values), (table, name)
@@ -0,0 +1,93 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from agent import CleaningAgent
+from model import NuclearWasteModel
+from results_store import AnyOf, ResultsWriter, load_runs, model_table
+from sweep import run_single, run_sweep
+from types_1 import AgentColor
+
+PARAMS = {
+    "strategy": 3,
+    "width": 30,
+    "height": 20,
+    "n_green_agents": 4,
+    "n_yellow_agents": 2,
+    "n_red_agents": 2,
+    "n_wastes": 10,
+}
+
+
+def sweep(tmp_path, params, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_sweep(params, ResultsWriter(str(tmp_path)), **kwargs)
+    return list(load_runs(str(tmp_path)))
+
+
+@pytest.mark.parametrize("number_processes", [1, 2])
+def test_arrival_rates_round_trip_with_the_throughput(tmp_path, number_processes):
+    rates = {AgentColor.GREEN: 0.05}
+    (run,) = sweep(
+        tmp_path,
+        {**PARAMS, "arrival_rates": rates},
+        iterations=1,
+        max_steps=200,
+        number_processes=number_processes,
+    )
+    assert run.params["arrival_rates"] == rates
+    assert len(run.table("throughput")["backlog"]) == 200
+    assert run.table("steady_state")["steps"][0] > 0
+    assert list(load_runs(str(tmp_path), where={"arrival_rates": rates})) != []
+
+
+def test_tuple_params_are_filtered_as_a_whole(tmp_path):
+    runs = sweep(
+        tmp_path,
+        {**PARAMS, "zone_widths": [(5, 5), (10, 10)], "handoff_rows": [(19, 9)]},
+        iterations=1,
+        max_steps=20,
+    )
+    assert len(runs) == 2
+    root = str(tmp_path)
+    (run,) = load_runs(root, where={"zone_widths": (5, 5)})
+    assert run.params["zone_widths"] == (5, 5)
+    assert run.params["handoff_rows"] == (19, 9)
+    assert len(list(load_runs(root, where={"zone_widths": [10, 10]}))) == 1
+    assert len(list(load_runs(root, where={"handoff_rows": (19, 9)}))) == 2
+    assert (
+        len(list(load_runs(root, where={"zone_widths": AnyOf((5, 5), (10, 10))}))) == 2
+    )
+    assert list(load_runs(root, where={"zone_widths": AnyOf(5, 10)})) == []
+
+
+def test_headless_runs_do_not_collect_the_agents():
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, recorder = run_single(PARAMS, 0, 20)
+    assert model.datacollector._agent_records == {}
+    assert len(recorder.agent_table()["Step"]) == 20 * 8
+
+
+def test_model_and_agent_tables_have_the_same_steps():
+    with contextlib.redirect_stdout(io.StringIO()):
+        model, recorder = run_single(PARAMS, 0, 20)
+        initial = NuclearWasteModel(**PARAMS, seed=0)
+    agents = recorder.agent_table()
+    steps = model_table(model)["Step"]
+    assert steps.tolist() == list(range(20))
+    assert np.unique(agents["Step"]).tolist() == steps.tolist()
+    # Step 0 is the state before the first step
+    first = agents["Step"] == 0
+    robots = {
+        robot.unique_id: robot.pos
+        for robot in initial.schedule.agents
+        if isinstance(robot, CleaningAgent)
+    }
+    assert {
+        agent_id: (x, y)
+        for agent_id, x, y in zip(
+            agents["AgentID"][first], agents["pos_x"][first], agents["pos_y"][first]
+        )
+    } == robots
@@ -0,0 +1,59 @@
+import contextlib
+import io
+import random
+
+import numpy as np
+import pytest
+
+from geometry import ZoneGeometry
+from golden import snapshot
+from model import NuclearWasteModel
+from scenario import load_scenario, save_scenario, scenario_params
+from world import generate_world
+
+FLEET = dict(n_green_agents=2, n_yellow_agents=2, n_red_agents=2, n_wastes=12)
+
+
+def trajectory(model, steps=150):
+    states = []
+    for _ in range(steps):
+        model.step()
+        states.append(snapshot(model))
+    return states
+
+
+@pytest.mark.parametrize(
+    "strategy, width, height, zone_widths, sparse, scheduler",
+    [
+        (1, 18, 10, None, False, "random"),
+        (3, 18, 10, None, False, "random"),
+        (3, 24, 12, (10, 6), True, "zones"),
+    ],
+)
+def test_loaded_scenario_gives_the_same_trajectory(
+    tmp_path, strategy, width, height, zone_widths, sparse, scheduler
+):
+    geometry = ZoneGeometry(width, height, zone_widths)
+    world = generate_world(
+        width, height, *FLEET.values(), random.Random(0), geometry, sparse=sparse
+    )
+    path = str(tmp_path / "scenario")
+    save_scenario(path, world, geometry)
+
+    loaded = load_scenario(path)
+    if not sparse:
+        # The radioactivity is read in place from the file
+        assert isinstance(loaded.radioactivity, np.memmap)
+    params = {"width": width, "height": height, **FLEET, "sparse": sparse}
+    if zone_widths is not None:
+        params["zone_widths"] = zone_widths
+    assert scenario_params(path) == params
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        reference = NuclearWasteModel(
+            **params, strategy=strategy, seed=0, scheduler=scheduler, world=world
+        )
+        from_file = NuclearWasteModel.from_scenario(
+            path, strategy=strategy, seed=0, scheduler=scheduler
+        )
+        assert trajectory(from_file) == trajectory(reference)
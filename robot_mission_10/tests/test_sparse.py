@@ -0,0 +1,39 @@
+import contextlib
+import io
+
+import pytest
+
+from memory import memory_report
+from model import NuclearWasteModel
+
+# The parts of a sparse model that must not grow with the number of steps: the robots'
+# knowledge and the model table of the data collector keep one entry per step.
+BOUNDED = ("grid", "schedule", "registries")
+
+
+@pytest.mark.parametrize("strategy", [1, 3])
+def test_long_sparse_run_has_bounded_memory(strategy):
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = NuclearWasteModel(
+            5,
+            5,
+            5,
+            50,
+            10000,
+            10000,
+            strategy=strategy,
+            seed=0,
+            sparse=True,
+            scheduler="zones",
+            collect_agents=False,
+        )
+        for _ in range(500):
+            model.step()
+        start = memory_report(model)
+        for _ in range(1500):
+            model.step()
+        end = memory_report(model)
+
+    for name in BOUNDED:
+        assert end[name][0] < 256 * 1024, name
+        assert end[name][0] - start[name][0] < 16 * 1024, name
@@ -0,0 +1,67 @@
+import contextlib
+import io
+import itertools
+
+import pytest
+
+from agent import CleaningAgent
+from model import NuclearWasteModel
+from stagnation import StagnationReason
+from types_1 import Action
+
+WINDOW = 50
+
+
+def forced_run(actions):
+    """
+    Run a model whose robots repeat the given actions, until it stops on a stagnation.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        model = NuclearWasteModel(
+            2,
+            2,
+            2,
+            10,
+            15,
+            10,
+            strategy=3,
+            seed=0,
+            stagnation_window=WINDOW,
+            stop_on_stagnation=True,
+        )
+        for robot in model.schedule.agents:
+            if isinstance(robot, CleaningAgent):
+                robot.deliberate = itertools.cycle(actions).__next__
+        while model.running and model.schedule.steps < 10 * WINDOW:
+            model.step()
+    return model, output.getvalue()
+
+
+@pytest.mark.parametrize(
+    "actions, reason, period",
+    [
+        ([Action.STAY], StagnationReason.IDLE, None),
+        ([Action.LEFT, Action.RIGHT], StagnationReason.LIVELOCK, 2),
+        (
+            [Action.UP, Action.RIGHT, Action.DOWN, Action.LEFT],
+            StagnationReason.LIVELOCK,
+            4,
+        ),
+    ],
+)
+def test_forced_stagnation_stops_the_run_with_its_reason(actions, reason, period):
+    model, output = forced_run(actions)
+    stagnation = model.stagnation.stagnation
+
+    assert not model.running
+    assert stagnation.reason == reason
+    assert stagnation.period == period
+    # The first step is the last progress, nothing happens after it
+    assert stagnation.last_progress == 1
+    assert model.schedule.steps == stagnation.step == 1 + WINDOW
+    assert f"No progress: {stagnation.describe()}." in output
+
+    table = model.stagnation.table()
+    assert table["reason"][0] == reason.value
+    assert table["step"][0] == stagnation.step
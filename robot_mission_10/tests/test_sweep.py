@@ -0,0 +1,68 @@
+import pytest
+
+import sweep
+
+# The values of the metric of each point, by seed
+VALUES = {
+    "stable": [100, 100, 100, 100, 100, 100],
+    "noisy": [100, 300, 50, 250, 80, 320, 90, 310, 60, 280],
+}
+
+
+@pytest.fixture
+def stub_runs(monkeypatch):
+    """
+    Replace the runs of the sweep by the values of VALUES, and record the runs done.
+    """
+    runs = []
+
+    def run_single(params, seed, max_steps, stop_when_finished=False):
+        runs.append((params["point"], seed, stop_when_finished))
+        return (params["point"], seed), None
+
+    def measure(run, max_steps):
+        point, seed = run
+        return VALUES[point][seed]
+
+    monkeypatch.setattr(sweep, "run_single", run_single)
+    monkeypatch.setitem(sweep.METRICS, "completion_step", measure)
+    return runs
+
+
+def adaptive_sweep(**kwargs):
+    summaries = sweep.run_adaptive_sweep(
+        {"point": ["stable", "noisy"]}, target_width=200, **kwargs
+    )
+    return {summary["point"]: summary for summary in summaries}
+
+
+def test_converged_points_stop_after_min_runs(stub_runs):
+    summaries = adaptive_sweep(min_runs=3, max_runs_per_point=10)
+
+    assert summaries["stable"]["n_runs"] == 3
+    assert summaries["stable"]["converged"]
+    # The noisy point gets runs until its interval is narrower than the target
+    assert summaries["noisy"]["converged"]
+    assert 3 < summaries["noisy"]["n_runs"] < 10
+    assert all(stop_when_finished for _, _, stop_when_finished in stub_runs)
+
+
+def test_noisy_point_stops_at_max_runs_per_point(stub_runs):
+    summaries = sweep.run_adaptive_sweep(
+        {"point": ["stable", "noisy"]},
+        target_width=10,
+        min_runs=2,
+        max_runs_per_point=5,
+    )
+
+    assert [summary["n_runs"] for summary in summaries] == [2, 5]
+    assert [summary["converged"] for summary in summaries] == [True, False]
+
+
+def test_budget_bounds_the_runs(stub_runs):
+    summaries = adaptive_sweep(min_runs=3, budget=4)
+
+    assert len(stub_runs) == 4
+    # The min_runs go to every point in turn, before the budget is spent
+    assert [point for point, _, _ in stub_runs] == ["stable", "noisy"] * 2
+    assert summaries["stable"]["n_runs"] == summaries["noisy"]["n_runs"] == 2
@@ -0,0 +1,72 @@
+import contextlib
+import io
+from collections import Counter
+
+import pytest
+
+from agent import CleaningAgent
+from model import NuclearWasteModel
+from object import WasteAgent
+from types_1 import AgentColor
+from waste_accounting import WasteAccounting, calculate_unaccessible_accessible_wastes
+
+# The number of green wastes a waste of each color was merged from
+UNITS = {AgentColor.GREEN: 1, AgentColor.YELLOW: 2, AgentColor.RED: 4}
+
+
+def units(accounting: WasteAccounting) -> int:
+    return (
+        sum(UNITS[color] * accounting.remaining(color) for color in AgentColor)
+        + UNITS[AgentColor.RED] * accounting.deposited
+    )
+
+
+def scan(model):
+    """
+    The wastes on the grid and in the robots' hands, by color.
+    """
+    on_ground = Counter(
+        obj.color
+        for content, _ in model.grid.coord_iter()
+        for obj in content
+        if isinstance(obj, WasteAgent)
+    )
+    carried = Counter(
+        waste.color
+        for robot in model.schedule.agents
+        if isinstance(robot, CleaningAgent)
+        for waste in robot.percept_temp.wastes
+    )
+    return on_ground, carried
+
+
+@pytest.mark.parametrize("strategy", [1, 3])
+def test_merges_keep_the_units_and_the_unaccessible_wastes(strategy):
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = NuclearWasteModel(2, 2, 2, 15, 15, 10, strategy=strategy, seed=0)
+        accounting = model.wastes
+        initial_units = units(accounting)
+        unaccessible = accounting.unaccessible
+        for _ in range(300):
+            model.step()
+            assert units(accounting) == initial_units
+            assert accounting.unaccessible == unaccessible
+            on_ground, carried = scan(model)
+            for color in AgentColor:
+                assert accounting.on_ground[color] == on_ground[color]
+                assert accounting.carried[color] == carried[color]
+    assert accounting.merged > 0
+
+
+def test_a_merge_does_not_change_the_unaccessible_wastes():
+    unaccessible = calculate_unaccessible_accessible_wastes
+    for n_green in range(20):
+        for n_yellow in range(20):
+            if n_green >= 2:
+                assert unaccessible(n_green, n_yellow) == unaccessible(
+                    n_green - 2, n_yellow + 1
+                )
+            if n_yellow >= 2:
+                assert unaccessible(n_green, n_yellow) == unaccessible(
+                    n_green, n_yellow - 2
+                )
@@ -0,0 +1,37 @@
+import contextlib
+import io
+
+import pytest
+
+from agent import CleaningAgent
+from model import NuclearWasteModel
+from object import WasteAgent
+from waste_store import WasteState
+
+
+@pytest.mark.parametrize("strategy", [1, 3])
+def test_store_holds_the_wastes_on_the_grid_and_in_hand(strategy):
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = NuclearWasteModel(2, 2, 2, 15, 15, 10, strategy=strategy, seed=0)
+        for _ in range(400):
+            model.step()
+    store = model.waste_store
+
+    on_grid = {
+        obj.unique_id
+        for content, _ in model.grid.coord_iter()
+        for obj in content
+        if isinstance(obj, WasteAgent)
+    }
+    in_hand = {
+        waste.unique_id
+        for robot in model.schedule.agents
+        if isinstance(robot, CleaningAgent)
+        for waste in robot.percept_temp.wastes
+    }
+    # Some wastes were merged and deposited during the run
+    assert model.wastes.deposited > 0
+    assert store.count(WasteState.ON_GROUND) == len(on_grid)
+    assert store.count(WasteState.CARRIED) == len(in_hand)
+    assert set(store.wastes) == on_grid | in_hand
+    assert set(store.picked) == in_hand
@@ -0,0 +1,57 @@
+import contextlib
+import io
+import random
+
+import pytest
+
+from golden import snapshot
+from model import NuclearWasteModel
+from world import World, generate_world
+
+PARAMS = {
+    "width": 60,
+    "height": 40,
+    "n_green_agents": 10,
+    "n_yellow_agents": 10,
+    "n_red_agents": 10,
+    "n_wastes": 100,
+    "scheduler": "zones",
+}
+
+
+def state(model):
+    """
+    The snapshot of the model without the object ids, which count the radioactivity
+    agents of a dense model: the robots in the order of their ids, the wastes on the
+    ground by position.
+    """
+    taken = snapshot(model)
+    robots = sorted(taken["robots"], key=int)
+    counters = dict(taken["counters"], obj_id=None)
+    return (
+        [taken["robots"][robot] for robot in robots],
+        [len(taken["carried"][robot]) for robot in robots],
+        sorted(taken["wastes"].values()),
+        counters,
+    )
+
+
+def trajectory(strategy: int, steps: int = 100, **params):
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = NuclearWasteModel(**{**PARAMS, **params}, strategy=strategy, seed=0)
+        states = [state(model)]
+        for _ in range(steps):
+            model.step()
+            states.append(state(model))
+    return states
+
+
+@pytest.mark.parametrize("strategy", [1, 3])
+def test_sparse_and_dense_models_give_the_same_run(strategy):
+    sparse = generate_world(60, 40, 10, 10, 10, 100, random.Random(0), sparse=True)
+    field = sparse.radioactivity
+    terrain = [[field.at((x, y)) for y in range(40)] for x in range(60)]
+    dense = World(60, 40, terrain, sparse.wastes, sparse.robots)
+    reference = trajectory(strategy, world=dense)
+    assert trajectory(strategy, world=sparse, sparse=True) == reference
+    assert trajectory(strategy, world=dense) == reference
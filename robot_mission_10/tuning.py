@@ -0,0 +1,260 @@
+import math
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from sweep import completion_step, run_single
+from results_store import RunRecorder
+from strategies import get_strategy
+from ensemble import run_ensemble
+
+
+def default_search_space(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The tuning knobs of the strategy of the parameters, and the values to search,
+    as registered with the strategy.
+    A list is a set of choices, a (low, high) tuple a range (int or float).
+    """
+    spec = get_strategy(params.get("strategy", 1))
+    if spec.search_space is None:
+        return {}
+    return spec.search_space(params)
+
+
+class NoRecorder(RunRecorder):
+    """
+    A recorder that observes nothing, for runs where only the final metrics matter.
+    """
+
+    def __init__(self, model):
+        pass
+
+    def observe(self, model):
+        pass
+
+
+def sample_configuration(space: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    configuration = {}
+    for name, values in space.items():
+        if isinstance(values, tuple):
+            low, high = values
+            if isinstance(low, int) and isinstance(high, int):
+                configuration[name] = rng.randint(low, high)
+            else:
+                configuration[name] = rng.uniform(low, high)
+        else:
+            configuration[name] = rng.choice(list(values))
+    return configuration
+
+
+def evaluate_run(task) -> int:
+    """
+    Run one candidate configuration on one seed and return its completion step.
+    The run stops as soon as the wastes are cleaned, the following steps would not change it.
+    """
+    params, configuration, seed, max_steps = task
+    model, _ = run_single(
+        {**params, **configuration},
+        seed,
+        max_steps,
+        recorder_cls=NoRecorder,
+        stop_when_finished=True,
+    )
+    return completion_step(model, max_steps)
+
+
+def evaluate_ensemble(task) -> List[int]:
+    """
+    Run configurations of strategy 3, each on one seed, all at once with the ensemble
+    engine, and return their completion steps (as evaluate_run).
+    """
+    params, configurations, seeds, max_steps = task
+    return run_ensemble(params, seeds, max_steps, configurations)
+
+
+class Candidate:
+    """
+    A configuration of the search and the completion steps of its runs.
+    """
+
+    def __init__(self, configuration: Dict[str, Any]):
+        self.configuration = configuration
+        self.completion_steps: List[int] = []
+
+    @property
+    def score(self) -> float:
+        if not self.completion_steps:
+            return math.inf
+        return statistics.fmean(self.completion_steps)
+
+    def __str__(self) -> str:
+        return f"Candidate({self.configuration}, runs={len(self.completion_steps)}, score={self.score})"
+
+
+def _evaluate(
+    candidates: List[Candidate],
+    params,
+    seeds,
+    max_steps,
+    executor,
+    ensemble=False,
+    number_processes=1,
+):
+    """
+    Run every candidate on the seeds it has not run yet. The seeds are the same for all
+    the candidates, so they are compared on the same worlds.
+    With ensemble, all these runs are split in one ensemble per process.
+    """
+    runs = []
+    for candidate in candidates:
+        for seed in seeds[len(candidate.completion_steps) :]:
+            runs.append((candidate, seed))
+    if not runs:
+        return
+
+    if ensemble:
+        # Contiguous chunks, so the runs of a candidate stay in the order of the seeds
+        chunk_size = math.ceil(len(runs) / max(1, number_processes))
+        chunks = [
+            runs[start : start + chunk_size]
+            for start in range(0, len(runs), chunk_size)
+        ]
+        tasks = [
+            (
+                params,
+                [candidate.configuration for candidate, _ in chunk],
+                [seed for _, seed in chunk],
+                max_steps,
+            )
+            for chunk in chunks
+        ]
+        if executor is None:
+            results = map(evaluate_ensemble, tasks)
+        else:
+            results = executor.map(evaluate_ensemble, tasks)
+        results = [steps for chunk_steps in results for steps in chunk_steps]
+    else:
+        tasks = [
+            (params, candidate.configuration, seed, max_steps)
+            for candidate, seed in runs
+        ]
+        if executor is None:
+            results = map(evaluate_run, tasks)
+        else:
+            results = executor.map(evaluate_run, tasks)
+
+    for (candidate, _), steps in zip(runs, results):
+        candidate.completion_steps.append(steps)
+
+
+def successive_halving(
+    params: Dict[str, Any],
+    space: Optional[Dict[str, Any]] = None,
+    n_candidates: int = 27,
+    min_seeds: int = 1,
+    eta: int = 3,
+    max_steps: int = 1500,
+    number_processes: int = 1,
+    search_seed: int = 0,
+    ensemble: bool = False,
+):
+    """
+    Search the configuration of the tuning knobs that minimizes the mean completion step.
+
+    n_candidates random configurations run on min_seeds seeds. Only the best 1/eta of them
+    are kept, and run on eta times more seeds, until one candidate is left. The bad
+    candidates are stopped early, and most of the runs go to the promising ones.
+    With eta=1 (or n_candidates=1) it is a plain random search with min_seeds seeds.
+
+    :param params: The fixed parameters of the model (grid size, robots, wastes, strategy).
+    :param space: The knobs to search. If None, the knobs of the strategy (see default_search_space).
+    :param ensemble: Strategy 3 only, run the candidates and seeds of each round together
+        with the ensemble engine (ensemble.py), with the same completion steps.
+    :return: The best candidate, and all the candidates sorted by score.
+    """
+    if space is None:
+        space = default_search_space(params)
+    rng = random.Random(search_seed)
+    candidates = [
+        Candidate(sample_configuration(space, rng)) for _ in range(n_candidates)
+    ]
+    all_candidates = list(candidates)
+
+    executor = (
+        ProcessPoolExecutor(max_workers=number_processes)
+        if number_processes > 1
+        else None
+    )
+    try:
+        n_seeds = min_seeds
+        while True:
+            _evaluate(
+                candidates,
+                params,
+                list(range(n_seeds)),
+                max_steps,
+                executor,
+                ensemble,
+                number_processes,
+            )
+            candidates.sort(key=lambda candidate: candidate.score)
+            print(
+                f"{len(candidates)} candidates on {n_seeds} seeds, best: {candidates[0]}"
+            )
+            if len(candidates) == 1 or eta <= 1:
+                break
+            candidates = candidates[: max(1, len(candidates) // eta)]
+            n_seeds *= eta
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    all_candidates.sort(
+        key=lambda candidate: (-len(candidate.completion_steps), candidate.score)
+    )
+    return candidates[0], all_candidates
+
+
+def random_search(
+    params: Dict[str, Any],
+    space: Optional[Dict[str, Any]] = None,
+    n_candidates: int = 20,
+    seeds: int = 5,
+    max_steps: int = 1500,
+    number_processes: int = 1,
+    search_seed: int = 0,
+    ensemble: bool = False,
+):
+    """
+    Run n_candidates random configurations on the same seeds and return the best one,
+    and all the candidates sorted by score.
+    """
+    return successive_halving(
+        params,
+        space,
+        n_candidates=n_candidates,
+        min_seeds=seeds,
+        eta=1,
+        max_steps=max_steps,
+        number_processes=number_processes,
+        search_seed=search_seed,
+        ensemble=ensemble,
+    )
+
+
+if __name__ == "__main__":
+    params = {
+        "width": 12,
+        "height": 10,
+        "n_green_agents": 1,
+        "n_yellow_agents": 1,
+        "n_red_agents": 1,
+        "n_wastes": 10,
+        "max_wastes_handed": 2,
+        "strategy": 3,
+    }
+    best, _ = successive_halving(
+        params, n_candidates=27, max_steps=1000, number_processes=4, ensemble=True
+    )
+    print(f"Best configuration: {best}")
@@ -1,5 +1,5 @@
 import enum
-from typing import Dict, List, TypedDict, Tuple, Optional
+from typing import Dict, List, NamedTuple, TypedDict, Tuple, Optional
 from mesa import Agent, Model
 
 # The radioactivity of the deposit zone.
@@ -66,24 +66,30 @@ class NeighboringType(enum.Enum):
     AGENT = 3
 
 
-class Neighboring(TypedDict):
+class Neighboring(NamedTuple):
     pos: Tuple[int, int]
     type: NeighboringType
-    color: Optional[AgentColor]
+    agentColor: Optional[AgentColor]
 
 
-class Percept(TypedDict):
+class Percept(NamedTuple):
+    """
+    What an agent perceives after an action.
+    Percepts are immutable tuples: they are shared between the knowledge of the agent
+    and the environment, and a new percept is built when something changes.
+    """
+
     radiactivity: float
-    wastes: List[WasteAgent]
+    wastes: Tuple[WasteAgent, ...]
     pos: Tuple[int, int]
     other_on_pos: bool
     waste_on_pos: Optional[AgentColor]
-    surrounding: List[Neighboring]
+    surrounding: Tuple[Neighboring, ...]
 
     def __str__(self) -> str:
         wastes_str = ", ".join(str(waste) for waste in self.wastes)
         surrounding_str = ", ".join(
-            f"Neighboring(pos={n.pos}, type={n.type}, color={n.color})"
+            f"Neighboring(pos={n.pos}, type={n.type}, color={n.agentColor})"
             for n in self.surrounding
         )
         return (
@@ -104,21 +110,15 @@ class Knowledge(TypedDict):
     go_back: bool
 
 
-class PickedWastes:
-    def __init__(self, agentId: int, wasteId: int, wasteColor: AgentColor):
-        self.agentId = agentId
-        self.wasteId = wasteId
-        self.wasteColor = wasteColor
+class PickedWastes(NamedTuple):
+    agentId: int
+    wasteId: int
+    wasteColor: AgentColor
 
     def __str__(self) -> str:
         return f"PickedWastes(agentId={self.agentId}, wasteId={self.wasteId}, wasteColor={self.wasteColor})"
 
 
-def find_picked_waste_by_id(
-    waste_id: int, picked_wastes_list: List[PickedWastes]
-) -> Optional[PickedWastes]: ...
-
-
 class CleaningAgent(Agent):
     def __init__(self, unique_id: int, color: AgentColor, x_max: int, model): ...
 
@@ -159,8 +159,12 @@ class NuclearWasteModel(Model):
 
     def is_on_waste(self, pos) -> AgentColor: ...
 
+    def move_robot(self, agent: CleaningAgent, pos): ...
+
     def others_on_pos(self, agent: CleaningAgent) -> bool: ...
 
+    def robots_around(self, pos, radius=1, color=None) -> int: ...
+
     def get_radioactivity(self, pos): ...
 
     def get_who_picked_waste(self, waste_id: int) -> int: ...
@@ -175,4 +179,6 @@ class NuclearWasteModel(Model):
         self, waste_id1: int, waste_id2: int, agent_id: int, pos: tuple[int, int]
     ) -> WasteAgent: ...
 
-    def indicate_surroundings(self, pos: Tuple[int, int]) -> List[Neighboring]: ...
+    def indicate_surroundings(
+        self, pos: Tuple[int, int], radius: int = 1
+    ) -> Tuple[Neighboring, ...]: ...
@@ -0,0 +1,169 @@
+import enum
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+
+from types_1 import Action, AgentColor, Percept
+
+MOVES = (Action.LEFT, Action.RIGHT, Action.UP, Action.DOWN)
+HANDLING_ACTIONS = (Action.TAKE, Action.DROP, Action.MERGE)
+
+
+class RobotState(enum.Enum):
+    """
+    What a robot is doing at a step.
+    - PATROLLING: the default move of the strategy, looking for wastes.
+    - CARRYING: moving with a waste in hand, to a deposit.
+    - POLLING: going to the deposit of the previous zone to look for a waste (strategy 3,
+        once step_between_checking patrol steps are done, with empty hands, or with the
+        hand-off notifications, when a waste waits there for the robot).
+    - GOING_BACK: going back to the position left to carry or poll (knowledge["go_back"]).
+    - HANDLING: taking, dropping or merging wastes.
+    - IDLE: staying on its cell.
+    """
+
+    PATROLLING = 0
+    CARRYING = 1
+    POLLING = 2
+    GOING_BACK = 3
+    HANDLING = 4
+    IDLE = 5
+
+
+class StepContext(NamedTuple):
+    """
+    What a robot knows before it decides its action, which gives the state of the step.
+    """
+
+    pos: Tuple[int, int]
+    percept: Percept
+    polling: bool
+    going_back: bool
+
+
+def classify_state(action: Action, context: StepContext) -> RobotState:
+    """
+    The state of the robot for the action it chose, from what it knew before deciding.
+    The first matching state wins, in the order of the decisions of the strategies:
+    an action on the wastes, then carrying, polling, going back and patrolling.
+    """
+    if action in HANDLING_ACTIONS:
+        return RobotState.HANDLING
+    if action == Action.STAY:
+        return RobotState.IDLE
+    if context.percept.wastes:
+        return RobotState.CARRYING
+    if context.polling:
+        return RobotState.POLLING
+    if context.going_back:
+        return RobotState.GOING_BACK
+    return RobotState.PATROLLING
+
+
+class UtilizationTracker:
+    """
+    Count, for each robot, the steps spent in each RobotState, the moves blocked by the
+    border of its area (stays_in_area), and the actions on wastes that did nothing
+    (nothing to take, nothing to drop, nothing to merge).
+
+    The robots are listed once at creation, the counts are rows of arrays indexed by
+    robot, so recording a step is a few increments.
+
+    Parameters:
+    - robots (List[CleaningAgent]): The robots of the model.
+    """
+
+    def __init__(self, robots):
+        self.agent_ids = np.array([robot.unique_id for robot in robots], dtype=np.int32)
+        self.colors = np.array([robot.color.value for robot in robots], dtype=np.int32)
+        self._rows = {robot.unique_id: row for row, robot in enumerate(robots)}
+        self.state_steps = np.zeros((len(robots), len(RobotState)), dtype=np.int64)
+        self.wasted_moves = np.zeros(len(robots), dtype=np.int64)
+        self.rejected = np.zeros((len(robots), len(HANDLING_ACTIONS)), dtype=np.int64)
+
+    def context(self, robot) -> StepContext:
+        """
+        What the robot knows before it decides its action (see StepContext).
+        """
+        board = robot.model.handoffs
+        if board is not None:
+            # The robots only go to the deposits when notified, not after a number of steps
+            polling = board.has_work(robot)
+        else:
+            step_between_checking = robot.knowledge.get("step_between_checking")
+            polling = (
+                step_between_checking is not None
+                and robot.step_count >= step_between_checking
+            )
+        return StepContext(
+            pos=robot.pos,
+            percept=robot.percept_temp,
+            polling=polling,
+            going_back=robot.knowledge["go_back"],
+        )
+
+    def record(self, robot, action: Action, context: StepContext, after: Percept):
+        """
+        Count one step of the robot, from its context before deciding (see context)
+        and its percept after the action.
+        """
+        row = self._rows[robot.unique_id]
+        self.state_steps[row, classify_state(action, context).value] += 1
+        before = context.percept
+        if action in MOVES:
+            if robot.pos == context.pos:
+                self.wasted_moves[row] += 1
+        elif action == Action.TAKE:
+            if len(after.wastes) <= len(before.wastes):
+                self.rejected[row, 0] += 1
+        elif action == Action.DROP:
+            if len(after.wastes) >= len(before.wastes):
+                self.rejected[row, 1] += 1
+        elif action == Action.MERGE:
+            if after.wastes == before.wastes:
+                self.rejected[row, 2] += 1
+
+    def table(self) -> Dict[str, np.ndarray]:
+        """
+        One row per robot: its id, color, steps in each state, wasted moves and
+        rejected actions.
+        """
+        table = {"AgentID": self.agent_ids, "Color": self.colors}
+        for state in RobotState:
+            table[f"steps_{state.name.lower()}"] = self.state_steps[:, state.value]
+        table["wasted_moves"] = self.wasted_moves
+        for column, action in enumerate(HANDLING_ACTIONS):
+            table[f"rejected_{action.name.lower()}"] = self.rejected[:, column]
+        return table
+
+    def by_color(self) -> Dict[AgentColor, Dict[str, int]]:
+        """
+        The counts of the table summed over the robots of each color.
+        """
+        table = self.table()
+        summary = {}
+        for color in AgentColor:
+            rows = self.colors == color.value
+            if not rows.any():
+                continue
+            summary[color] = {
+                name: int(values[rows].sum())
+                for name, values in table.items()
+                if name not in ("AgentID", "Color")
+            }
+        return summary
+
+    def shares(self) -> Dict[AgentColor, Dict[str, float]]:
+        """
+        The share of the robot-steps of each color spent in each state.
+        """
+        shares = {}
+        for color, counts in self.by_color().items():
+            total = sum(counts[f"steps_{state.name.lower()}"] for state in RobotState)
+            shares[color] = {
+                state.name.lower(): (
+                    counts[f"steps_{state.name.lower()}"] / total if total else 0.0
+                )
+                for state in RobotState
+            }
+        return shares
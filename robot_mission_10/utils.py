@@ -1,134 +1,82 @@
-from typing import List
-import random
-
-from types_1 import (
-    AgentColor,
-    DEPOSIT_RADIOACTIVITY,
-    PickedWastes,
-)
+from typing import Optional
 
 from object import RadioactivityAgent, WasteAgent
-from agent_strat_1 import add_agents_strat_1
-from agent_strat_3 import add_agents_strat_3
+from strategies import load_strategy
+from world import TerrainField, World, generate_world, terrain_columns
 
 
-def find_picked_waste_by_id(waste_id: int, picked_wastes_list: List[PickedWastes]):
+def initialize_terrain(environment, world: World):
     """
-    Find a PickedWastes object in a list by its wasteId.
-
-    :param waste_id: The wasteId to search for.
-    :param picked_wastes_list: The list of PickedWastes objects.
-    :return: The PickedWastes object with the matching wasteId, or None if not found.
+    Place a radioactivity agent on each cell of the grid, with the radioactivity of the world.
     """
-    for picked_waste in picked_wastes_list:
-        if picked_waste.wasteId == waste_id:
-            return picked_waste
-    return None
-
-
-def initialize_zone(start_x, end_x, radioactivity_range, environment, current_id):
-    for i in range(start_x, end_x):
-        for j in range(environment.grid.height):
-            # Put deposit zone on the top right corner
-            if i == environment.grid.width - 1 and j == environment.grid.height - 1:
-                a = RadioactivityAgent(current_id, DEPOSIT_RADIOACTIVITY, environment)
-            else:
-                a = RadioactivityAgent(
-                    current_id, random.uniform(*radioactivity_range), environment
-                )
+    for i, column in enumerate(terrain_columns(world.radioactivity)):
+        for j, value in enumerate(column):
+            a = RadioactivityAgent(environment.obj_id, value, environment)
             environment.schedule.add(a)
             environment.grid.place_agent(a, (i, j))
-            current_id += 1
-    return current_id
+            environment.obj_id += 1
 
 
-def initialize_wastes(environment):
+def spawn_waste(environment, pos, waste_color) -> WasteAgent:
     """
-    Initialize the wastes in the environment.
+    Create a new waste on the ground at the given position.
     """
-    for _ in range(environment.num_wastes):
-        environment.obj_id += 1
-        waste_color = random.choices(
-            [AgentColor.GREEN, AgentColor.YELLOW, AgentColor.RED],
-            weights=[0.4, 0.3, 0.3],
-        )[0]
-        if waste_color == AgentColor.GREEN:
-            x = environment.random.randrange(environment.grid.width // 3)
-            environment.green_wastes_remaining += 1
-        elif waste_color == AgentColor.YELLOW:
-            x = environment.random.randrange(
-                environment.grid.width // 3, 2 * environment.grid.width // 3
-            )
-            environment.yellow_wastes_remaining += 1
-        else:  # AgentColor.RED
-            x = environment.random.randrange(
-                2 * environment.grid.width // 3, environment.grid.width
-            )
-            environment.red_wastes_remaining += 1
-        y = environment.random.randrange(environment.grid.height)
-        waste = WasteAgent(
-            unique_id=environment.obj_id, color=waste_color, model=environment
-        )
-        environment.schedule.add(waste)
-        environment.grid.place_agent(waste, (x, y))
-
-
-def calculate_unaccessible_accessible_wastes(n_green_wastes, n_yellow_wastes) -> int:
-    unaccessible_total_wastes = 0
-    unaccessible_yellow_wastes = n_yellow_wastes % 2
-
-    # If there is one yellow waste unaccessible, it will be accessible if there are two green wastes for it
-    if unaccessible_yellow_wastes == 1 and n_green_wastes >= 2:
-        unaccessible_yellow_wastes = 0
-        n_green_wastes -= 2
+    environment.obj_id += 1
+    waste = WasteAgent(
+        unique_id=environment.obj_id, color=waste_color, model=environment
+    )
+    environment.grid.place_agent(waste, pos)
+    environment.waste_store.add(waste)
+    environment.wastes.spawn(waste_color)
+    return waste
 
-    unaccessible_green_wastes = n_green_wastes % 4
-    if unaccessible_green_wastes >= 2:
-        unaccessible_green_wastes -= 2
-        unaccessible_yellow_wastes += 1
 
-    unaccessible_total_wastes += unaccessible_yellow_wastes + unaccessible_green_wastes
-    return unaccessible_total_wastes
+def initialize_wastes(environment, world: World):
+    """
+    Initialize the wastes in the environment.
+    """
+    for pos, waste_color in world.wastes:
+        spawn_waste(environment, pos, waste_color)
 
 
 def init_agents(
-    environment, n_green_agents, n_yellow_agents, n_red_agents, n_wastes, strategy=1
+    environment,
+    n_green_agents,
+    n_yellow_agents,
+    n_red_agents,
+    n_wastes,
+    strategy=1,
+    world: Optional[World] = None,
 ):
-
-    width_third = environment.grid.width // 3
+    """
+    Build the environment from the given world, or from a new random one.
+    The random world is drawn before the robots are created, so for a given seed,
+    every strategy starts from the same world.
+    """
+    if world is None:
+        world = generate_world(
+            environment.grid.width,
+            environment.grid.height,
+            n_green_agents,
+            n_yellow_agents,
+            n_red_agents,
+            n_wastes,
+            environment.random,
+            environment.geometry,
+            sparse=environment.sparse,
+        )
 
     # Zone 1 (West): radioactivity from 0 to 0.33
-    environment.obj_id = initialize_zone(
-        0, width_third, (0, 0.33), environment, environment.obj_id
-    )
-
     # Zone 2 (Middle): radioactivity from 0.33 to 0.66
-    environment.obj_id = initialize_zone(
-        width_third, 2 * width_third, (0.33, 0.66), environment, environment.obj_id
-    )
-
     # Zone 3 (East): radioactivity from 0.66 to 1
-    environment.obj_id = initialize_zone(
-        2 * width_third,
-        environment.grid.width,
-        (0.66, 0.99),
-        environment,
-        environment.obj_id,
-    )
+    if isinstance(world.radioactivity, TerrainField):
+        # A sparse world: the radioactivity is read from the field, no agent per cell
+        environment.terrain = world.radioactivity
+    else:
+        initialize_terrain(environment, world)
 
     # Add the wastes
-    initialize_wastes(environment)
-    environment.accessible_remaining_wastes = (
-        n_wastes
-        - calculate_unaccessible_accessible_wastes(
-            environment.green_wastes_remaining,
-            environment.yellow_wastes_remaining,
-        )
-    )
+    initialize_wastes(environment, world)
     # Add the cleaning agents
-    if strategy == 1:
-        add_agents_strat_1(environment, n_green_agents, n_yellow_agents, n_red_agents)
-    elif strategy == 3:
-        add_agents_strat_3(environment, n_green_agents, n_yellow_agents, n_red_agents)
-    else:  ## Implement other strategies
-        add_agents_strat_1(environment, n_green_agents, n_yellow_agents, n_red_agents)
+    add_agents = load_strategy(strategy)
+    add_agents(environment, world.robots)
@@ -0,0 +1,98 @@
+from typing import Dict
+
+from types_1 import AgentColor
+
+# The color obtained by merging two wastes of the key color.
+MERGED_COLOR = {
+    AgentColor.GREEN: AgentColor.YELLOW,
+    AgentColor.YELLOW: AgentColor.RED,
+}
+
+
+def calculate_unaccessible_accessible_wastes(n_green_wastes, n_yellow_wastes) -> int:
+    unaccessible_total_wastes = 0
+    unaccessible_yellow_wastes = n_yellow_wastes % 2
+
+    # If there is one yellow waste unaccessible, it will be accessible if there are two green wastes for it
+    if unaccessible_yellow_wastes == 1 and n_green_wastes >= 2:
+        unaccessible_yellow_wastes = 0
+        n_green_wastes -= 2
+
+    unaccessible_green_wastes = n_green_wastes % 4
+    if unaccessible_green_wastes >= 2:
+        unaccessible_green_wastes -= 2
+        unaccessible_yellow_wastes += 1
+
+    unaccessible_total_wastes += unaccessible_yellow_wastes + unaccessible_green_wastes
+    return unaccessible_total_wastes
+
+
+class WasteAccounting:
+    """
+    Count the wastes of each color on the ground, carried by a robot, and deposited.
+
+    The model calls one method per waste event (spawn, pick, drop, merge, deposit),
+    each one updates a few counters, so the counts never need a scan of the grid.
+
+    The number of unaccessible wastes only depends on the number of green and yellow
+    wastes left, and a merge does not change it (2 green -> 1 yellow, 2 yellow -> 1 red),
+    so the accessible remaining wastes are also known in O(1).
+    """
+
+    def __init__(self):
+        self.on_ground: Dict[AgentColor, int] = {color: 0 for color in AgentColor}
+        self.carried: Dict[AgentColor, int] = {color: 0 for color in AgentColor}
+        self.deposited = 0
+        # The merges and deposits, the events that cannot be undone
+        self.merged = 0
+
+    def spawn(self, color: AgentColor):
+        self.on_ground[color] += 1
+
+    def pick(self, color: AgentColor):
+        self.on_ground[color] -= 1
+        self.carried[color] += 1
+
+    def drop(self, color: AgentColor):
+        self.carried[color] -= 1
+        self.on_ground[color] += 1
+
+    def merge(self, color: AgentColor) -> AgentColor:
+        """
+        Two carried wastes of the given color become one carried waste of the next color.
+        Return the color of the merged waste.
+        """
+        merged_color = MERGED_COLOR[color]
+        self.carried[color] -= 2
+        self.carried[merged_color] += 1
+        self.merged += 1
+        return merged_color
+
+    def deposit(self, color: AgentColor):
+        self.carried[color] -= 1
+        self.deposited += 1
+
+    @property
+    def progress(self) -> int:
+        """
+        The number of merges and deposits so far: each one brings the run closer to its
+        end, unlike a pick or a drop, which a robot can undo.
+        """
+        return self.merged + self.deposited
+
+    def remaining(self, color: AgentColor) -> int:
+        return self.on_ground[color] + self.carried[color]
+
+    @property
+    def total_remaining(self) -> int:
+        return sum(self.on_ground.values()) + sum(self.carried.values())
+
+    @property
+    def unaccessible(self) -> int:
+        return calculate_unaccessible_accessible_wastes(
+            self.remaining(AgentColor.GREEN), self.remaining(AgentColor.YELLOW)
+        )
+
+    @property
+    def accessible_remaining(self) -> int:
+        return self.total_remaining - self.unaccessible
@@ -0,0 +1,97 @@
+import enum
+from collections import defaultdict
+from typing import Dict, Optional
+
+from object import WasteAgent
+from types_1 import AgentColor, PickedWastes
+
+
+class WasteState(enum.Enum):
+    ON_GROUND = 0
+    CARRIED = 1
+
+
+class WasteStore:
+    """
+    Every waste on the ground or carried, with its state and the agent carrying it.
+
+    A waste keeps the same WasteAgent during all its life: it is removed from the grid
+    when picked and placed back when dropped, but never recreated, so dropping a waste
+    does not allocate nor register a new Mesa agent. The wastes are not in the schedule
+    (they do nothing at each step), only on the grid when they are on the ground.
+    A deposited or merged waste is forgotten, so the store does not grow with the
+    number of wastes cleaned during a run.
+    """
+
+    def __init__(self):
+        self.wastes: Dict[int, WasteAgent] = {}
+        self.states: Dict[int, WasteState] = {}
+        # The carried wastes, by waste id
+        self.picked: Dict[int, PickedWastes] = {}
+        # The number of wastes carried by each agent, by agent id
+        self.n_carried: Dict[int, int] = defaultdict(int)
+
+    def add(self, waste: WasteAgent, state: WasteState = WasteState.ON_GROUND):
+        self.wastes[waste.unique_id] = waste
+        self.states[waste.unique_id] = state
+
+    def get(self, waste_id: int) -> Optional[WasteAgent]:
+        return self.wastes.get(waste_id)
+
+    def carried(self, waste_id: int) -> Optional[PickedWastes]:
+        """
+        Return the PickedWastes record of the waste, or None if it is not carried.
+        """
+        return self.picked.get(waste_id)
+
+    def pick(self, waste_id: int, agent_id: int) -> PickedWastes:
+        waste = self.wastes[waste_id]
+        picked_waste = PickedWastes(
+            agentId=agent_id, wasteId=waste_id, wasteColor=waste.color
+        )
+        self.picked[waste_id] = picked_waste
+        self.n_carried[agent_id] += 1
+        self.states[waste_id] = WasteState.CARRIED
+        return picked_waste
+
+    def _release(self, waste_id: int):
+        picked_waste = self.picked.pop(waste_id)
+        self.n_carried[picked_waste.agentId] -= 1
+
+    def _forget(self, waste_id: int):
+        self._release(waste_id)
+        del self.wastes[waste_id]
+        del self.states[waste_id]
+
+    def drop(self, waste_id: int) -> WasteAgent:
+        """
+        The waste goes back on the ground. Return its WasteAgent, to place it on the grid.
+        """
+        self._release(waste_id)
+        self.states[waste_id] = WasteState.ON_GROUND
+        return self.wastes[waste_id]
+
+    def deposit(self, waste_id: int):
+        self._forget(waste_id)
+
+    def merge(
+        self, waste_id1: int, waste_id2: int, merged_waste: WasteAgent, agent_id: int
+    ) -> PickedWastes:
+        """
+        The two carried wastes disappear, and the agent carries the merged waste instead.
+        """
+        self._forget(waste_id1)
+        self._forget(waste_id2)
+        self.add(merged_waste, WasteState.CARRIED)
+        return self.pick(merged_waste.unique_id, agent_id)
+
+    def count(self, state: WasteState, color: Optional[AgentColor] = None) -> int:
+        """
+        Count the wastes in the given state (scans the store, for checks and reports only).
+        """
+        return sum(
+            1
+            for waste_id, waste_state in self.states.items()
+            if waste_state == state
+            and (color is None or self.wastes[waste_id].color == color)
+        )
@@ -0,0 +1,195 @@
+import bisect
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+from types_1 import AgentColor, DEPOSIT_RADIOACTIVITY
+
+# Radioactivity range of each zone, from West to East.
+ZONE_RADIOACTIVITY = {
+    AgentColor.GREEN: (0, 0.33),
+    AgentColor.YELLOW: (0.33, 0.66),
+    AgentColor.RED: (0.66, 0.99),
+}
+
+# Probability of each color for a new waste.
+WASTE_COLOR_WEIGHTS = {
+    AgentColor.GREEN: 0.4,
+    AgentColor.YELLOW: 0.3,
+    AgentColor.RED: 0.3,
+}
+
+
+def zone_bounds(width: int) -> Dict[AgentColor, Tuple[int, int]]:
+    """
+    The columns [x_min, x_max) of each zone, the same as the areas allowed to the robots.
+    """
+    return {
+        AgentColor.GREEN: (0, width // 3),
+        AgentColor.YELLOW: (width // 3, 2 * width // 3),
+        AgentColor.RED: (2 * width // 3, width),
+    }
+
+
+_MASK_64 = (1 << 64) - 1
+
+
+def _mix_64(z: int) -> int:
+    """
+    The splitmix64 finalizer: a well spread 64-bit hash of z.
+    """
+    z = (z + 0x9E3779B97F4A7C15) & _MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK_64
+    return z ^ (z >> 31)
+
+
+class TerrainField:
+    """
+    The radioactivity of the cells, computed when a cell is read instead of stored.
+
+    The radioactivity of a cell is drawn uniformly in the range of its zone, like in
+    generate_world, from a hash of the seed and the position: it is the same each time
+    the cell is read, and only the zones and the deposits are kept, whatever the size
+    of the grid.
+
+    Parameters:
+    - width (int), height (int): The size of the grid.
+    - bounds (Dict[AgentColor, Tuple[int, int]]): The columns [x_min, x_max) of each zone.
+    - deposits (Sequence[Tuple[int, int]]): The deposit cells.
+    - seed (int): The seed of the field.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        bounds: Dict[AgentColor, Tuple[int, int]],
+        deposits: Sequence[Tuple[int, int]],
+        seed: int,
+    ):
+        self.width = width
+        self.height = height
+        self.bounds = dict(bounds)
+        self.deposits = frozenset(deposits)
+        self.seed = seed
+        zones = sorted((x_min, color) for color, (x_min, _) in bounds.items())
+        self._zone_starts = [x_min for x_min, _ in zones]
+        self._zone_ranges = [ZONE_RADIOACTIVITY[color] for _, color in zones]
+
+    def at(self, pos: Tuple[int, int]) -> float:
+        if pos in self.deposits:
+            return DEPOSIT_RADIOACTIVITY
+        x, y = pos
+        low, high = self._zone_ranges[bisect.bisect_right(self._zone_starts, x) - 1]
+        u = _mix_64(self.seed ^ _mix_64(x * self.height + y)) / 2**64
+        return low + (high - low) * u
+
+
+def terrain_columns(radioactivity) -> Iterator[List[float]]:
+    """
+    The radioactivity of each column of a dense world, from West to East, as lists: the
+    array of a loaded scenario is read a column at a time.
+    """
+    for column in radioactivity:
+        yield column.tolist() if hasattr(column, "tolist") else column
+
+
+class World:
+    """
+    The initial state of an environment, independent of the strategy of the robots:
+    the radioactivity of each cell, the wastes and the start positions of the robots.
+
+    Two models built from the same World start from exactly the same layout,
+    which is what is needed to compare strategies on paired runs.
+
+    Parameters:
+    - width (int), height (int): The size of the grid.
+    - radioactivity (List[List[float]] or TerrainField): radioactivity[x][y] of each cell,
+        or the field computing it for a sparse world. A loaded scenario gives the array of
+        its file instead of lists.
+    - wastes (Sequence[Tuple[Tuple[int, int], AgentColor]]): The position and color of each waste.
+    - robots (Dict[AgentColor, Sequence[Tuple[int, int]]]): The start positions of the robots of each color.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        radioactivity: Union[List[List[float]], TerrainField],
+        wastes: List[Tuple[Tuple[int, int], AgentColor]],
+        robots: Dict[AgentColor, List[Tuple[int, int]]],
+    ):
+        self.width = width
+        self.height = height
+        self.radioactivity = radioactivity
+        self.wastes = wastes
+        self.robots = robots
+
+    def __str__(self) -> str:
+        n_robots = {color.name: len(starts) for color, starts in self.robots.items()}
+        return f"World(width={self.width}, height={self.height}, wastes={len(self.wastes)}, robots={n_robots})"
+
+
+def generate_world(
+    width: int,
+    height: int,
+    n_green_agents: int,
+    n_yellow_agents: int,
+    n_red_agents: int,
+    n_wastes: int,
+    rng,
+    geometry=None,
+    sparse: bool = False,
+) -> World:
+    """
+    Draw a random world with the given random generator (a random.Random).
+
+    The deposit zone is on the top right corner. Each waste is in the zone of its color,
+    and each robot starts in the zone of its color.
+    With a geometry.ZoneGeometry, its zones and deposit cells are used instead; the
+    default geometry draws the same world.
+    A sparse world has a TerrainField instead of the radioactivity of each cell, with its
+    seed drawn in place of the cells: the wastes and the robots are not the same as in
+    the dense world of the same random generator.
+    """
+    if geometry is None:
+        bounds = zone_bounds(width)
+        deposits = [(width - 1, height - 1)]
+    else:
+        bounds = geometry.bounds
+        deposits = geometry.deposits
+
+    if sparse:
+        radioactivity = TerrainField(
+            width, height, bounds, deposits, rng.getrandbits(64)
+        )
+    else:
+        radioactivity = [[0.0] * height for _ in range(width)]
+        for color in (AgentColor.GREEN, AgentColor.YELLOW, AgentColor.RED):
+            x_min, x_max = bounds[color]
+            for x in range(x_min, x_max):
+                for y in range(height):
+                    radioactivity[x][y] = rng.uniform(*ZONE_RADIOACTIVITY[color])
+        for x, y in deposits:
+            radioactivity[x][y] = DEPOSIT_RADIOACTIVITY
+
+    wastes = []
+    for _ in range(n_wastes):
+        color = rng.choices(
+            list(WASTE_COLOR_WEIGHTS), weights=list(WASTE_COLOR_WEIGHTS.values())
+        )[0]
+        x = rng.randrange(*bounds[color])
+        y = rng.randrange(height)
+        wastes.append(((x, y), color))
+
+    robots = {}
+    for color, n_agents in (
+        (AgentColor.GREEN, n_green_agents),
+        (AgentColor.YELLOW, n_yellow_agents),
+        (AgentColor.RED, n_red_agents),
+    ):
+        robots[color] = [
+            (rng.randrange(*bounds[color]), rng.randrange(height))
+            for _ in range(n_agents)
+        ]
+
+    return World(width, height, radioactivity, wastes, robots)
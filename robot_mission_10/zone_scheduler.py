@@ -0,0 +1,80 @@
+import random
+from typing import List, Optional, Tuple
+
+from mesa.time import BaseScheduler
+
+from agent import CleaningAgent
+
+
+class ZonePartitionedActivation(BaseScheduler):
+    """
+    A scheduler that steps the robots zone by zone, for very large worlds.
+
+    A robot reads and changes at most its cell and the cells next to it. A robot whose
+    cell and neighbors are all in the same zone is an interior robot: the interior
+    robots of two zones touch disjoint cells. Each step has two phases:
+    1. The interior robots of each zone, zone by zone, in a random order drawn by the
+       generator of the zone.
+    2. The border robots (next to another zone, where the deposits of the hand-offs
+       are), one at a time, zone by zone from West to East, then by unique_id.
+    So a waste dropped on a hand-off cell during a step is seen by the robots of the
+    next zone in phase 2.
+
+    Only the robots are stepped. The radioactivity agents stay in the schedule, but are
+    not shuffled at each step, which is most of the cost of RandomActivation on a large
+    grid (one agent per cell).
+
+    Parameters:
+    - model (NuclearWasteModel): The model, its geometry gives the zones (see geometry.ZoneGeometry).
+    """
+
+    def __init__(self, model):
+        super().__init__(model)
+        self.robots: List[CleaningAgent] = []
+        self.zones: List[Tuple[int, int]] = sorted(model.geometry.bounds.values())
+        # Drawn at the first step, so the world is drawn before (see init_agents)
+        self.zone_rngs: Optional[List[random.Random]] = None
+
+    def add(self, agent) -> None:
+        super().add(agent)
+        if isinstance(agent, CleaningAgent):
+            self.robots.append(agent)
+
+    def zone_of(self, x: int) -> int:
+        for zone, (x_min, x_max) in enumerate(self.zones):
+            if x_min <= x < x_max:
+                return zone
+        raise ValueError(f"Column {x} is out of the grid.")
+
+    def partition(self):
+        """
+        Return the interior robots of each zone, and the border robots in their order.
+        """
+        interiors = [[] for _ in self.zones]
+        borders = []
+        for robot in self.robots:
+            x = robot.pos[0]
+            zone = self.zone_of(x)
+            x_min, x_max = self.zones[zone]
+            if x_min + 1 <= x <= x_max - 2:
+                interiors[zone].append(robot)
+            else:
+                borders.append((zone, robot.unique_id, robot))
+        borders.sort(key=lambda border: border[:2])
+        return interiors, [robot for _, _, robot in borders]
+
+    def step(self) -> None:
+        if self.zone_rngs is None:
+            self.zone_rngs = [
+                random.Random(self.model.random.getrandbits(64)) for _ in self.zones
+            ]
+        interiors, borders = self.partition()
+        for zone, robots in enumerate(interiors):
+            self.zone_rngs[zone].shuffle(robots)
+            for robot in robots:
+                robot.step()
+        for robot in borders:
+            robot.step()
+
+        self.steps += 1
+        self.time += 1